@@ -4,8 +4,11 @@ User and account models for UzAgro Platform.
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from apps.core.localization import Translation
 from apps.core.models import TimestampedModel
 
+NAME = Translation('name')
+
 
 class Region(TimestampedModel):
     """
@@ -43,7 +46,7 @@ class Region(TimestampedModel):
     
     def get_name(self, lang='ru'):
         """Get name in specified language."""
-        return getattr(self, f'name_{lang}', self.name_ru)
+        return NAME.get(self, lang)
 
 
 class User(AbstractUser):
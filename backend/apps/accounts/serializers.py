@@ -5,6 +5,7 @@ Serializers for accounts app.
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.db.models import Q
+from apps.core.localization import get_language
 from .models import Region, BusinessProfile
 
 User = get_user_model()
@@ -24,11 +25,7 @@ class RegionSerializer(serializers.ModelSerializer):
     
     def get_name(self, obj):
         """Get name in request language."""
-        request = self.context.get('request')
-        lang = 'ru'
-        if request:
-            lang = request.headers.get('Accept-Language', 'ru')[:2]
-        return obj.get_name(lang)
+        return obj.get_name(get_language(self.context.get('request')))
 
 
 class BusinessProfileSerializer(serializers.ModelSerializer):
@@ -2,9 +2,17 @@
 Admin configuration for catalog app.
 """
 
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .importer import get_format, import_products, read_rows
 from .models import Category, Brand, Product, ProductImage, ProductDocument
 
+IMPORT_ERRORS_SHOWN = 20
+
 
 class ProductImageInline(admin.TabularInline):
     model = ProductImage
@@ -16,6 +24,16 @@ class ProductDocumentInline(admin.TabularInline):
     extra = 1
 
 
+class ProductImportForm(forms.Form):
+    file = forms.FileField(label='Файл', help_text='CSV, XLSX или NDJSON; товары обновляются по артикулу (sku)')
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if get_format(file.name) is None:
+            raise forms.ValidationError('Поддерживаются файлы .csv, .xlsx и .ndjson')
+        return file
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name_ru', 'slug', 'parent', 'order', 'is_active']
@@ -103,6 +121,40 @@ class ProductAdmin(admin.ModelAdmin):
     
     inlines = [ProductImageInline, ProductDocumentInline]
 
+    def get_urls(self):
+        return [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_view),
+                name='catalog_product_import',
+            ),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            return redirect('admin:catalog_product_changelist')
+        form = ProductImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            result = import_products(read_rows(upload.file, get_format(upload.name)))
+            self.message_user(
+                request,
+                f'Импорт завершён: создано {result.created}, обновлено {result.updated}, '
+                f'ошибок {len(result.errors)}',
+                messages.WARNING if result.errors else messages.SUCCESS,
+            )
+            for line, message in result.errors[:IMPORT_ERRORS_SHOWN]:
+                self.message_user(request, f'Строка {line}: {message}', messages.ERROR)
+            return redirect('admin:catalog_product_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Импорт товаров',
+            'form': form,
+        }
+        return TemplateResponse(request, 'admin/catalog/product/import.html', context)
+
 
 @admin.register(ProductImage)
 class ProductImageAdmin(admin.ModelAdmin):
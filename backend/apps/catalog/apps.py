@@ -9,3 +9,6 @@ class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.catalog'
     verbose_name = 'Каталог'
+
+    def ready(self):
+        from . import signals  # noqa: F401
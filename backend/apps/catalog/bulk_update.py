@@ -0,0 +1,170 @@
+"""
+Batch price and stock updates (`POST /api/v1/products/bulk-update/`).
+
+A batch is a list of `{sku, <field>: value, ...}` rows for the fields in
+UPDATE_FIELDS. Every row is validated first; if any is invalid, nothing is
+written. Otherwise the current values are read (and locked) in chunks, the
+rows that actually change are written in one transaction with
+`UPDATE ... FROM (VALUES ...)` statements (`bulk_update()` on other
+databases: its CASE expressions are slow to build for thousands of rows),
+and the catalog cache version is bumped once for the whole batch. The
+result is a diff of what changed.
+
+    result = apply_updates([{'sku': 'YTO-904', 'base_price_usd': '9500'}])
+    result.changes   # [{'sku': 'YTO-904', 'changes': {'base_price_usd': {'old': ..., 'new': ...}}}]
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import bump_version
+from .featured import get_featured_ids, refresh_featured
+from .importer import IMPORT_FIELDS, ProductImporter
+from .models import Product
+
+UPDATE_FIELDS = ('base_price_usd', 'retail_price_usd', 'wholesale_price_usd', 'stock_quantity', 'stock_status')
+MAX_ROWS = 10000
+CHUNK_SIZE = 2000
+
+
+class BulkUpdateError(Exception):
+    """The batch was rejected; `errors` is [{index, sku, errors}]."""
+
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} invalid rows')
+        self.errors = errors
+
+
+@dataclass
+class BulkUpdateResult:
+    updated: int = 0
+    unchanged: int = 0
+    not_found: list = field(default_factory=list)
+    changes: list = field(default_factory=list)  # [{sku, changes: {field: {old, new}}}]
+    dry_run: bool = False
+
+
+def clean_rows(rows):
+    """{sku: {field: value}} from raw rows. Raises BulkUpdateError."""
+    if not isinstance(rows, list) or not rows:
+        raise BulkUpdateError([{'index': None, 'sku': None, 'errors': ['Ожидается непустой список строк']}])
+    if len(rows) > MAX_ROWS:
+        raise BulkUpdateError([{'index': None, 'sku': None, 'errors': [f'Не больше {MAX_ROWS} строк за раз']}])
+
+    cleaned, errors = {}, []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({'index': index, 'sku': None, 'errors': ['Ожидается объект']})
+            continue
+        sku = str(row.get('sku') or '').strip()
+        values, row_errors = {}, []
+        for name, value in row.items():
+            if name == 'sku':
+                continue
+            if name not in UPDATE_FIELDS:
+                row_errors.append(f'{name}: неизвестное поле')
+                continue
+            model_field = IMPORT_FIELDS[name]
+            try:
+                value = ProductImporter.clean(model_field, value)
+            except ValidationError as e:
+                row_errors.append(f"{name}: {'; '.join(e.messages)}")
+                continue
+            if isinstance(value, Decimal):
+                value = value.quantize(Decimal(1).scaleb(-model_field.decimal_places))  # as stored, for the diff
+            values[name] = value
+        if not sku:
+            row_errors.append('Нет артикула (sku)')
+        elif sku in cleaned:
+            row_errors.append('Артикул повторяется в пакете')
+        elif not values and not row_errors:
+            row_errors.append('Нет полей для обновления')
+        if row_errors:
+            errors.append({'index': index, 'sku': sku or None, 'errors': row_errors})
+        else:
+            cleaned[sku] = values
+    if errors:
+        raise BulkUpdateError(errors)
+    return cleaned
+
+
+def update_products(products, fields):
+    """Write `fields` and updated_at of loaded products."""
+    fields = [*fields, 'updated_at']
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        Product.objects.bulk_update(products, fields, batch_size=1000)
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(Product._meta.db_table)
+    columns = [Product._meta.pk, *(Product._meta.get_field(name) for name in fields)]
+    # VALUES columns are named column1, column2... on both databases
+    assignments = ', '.join(f'{qn(f.column)} = v.column{i}' for i, f in enumerate(columns[1:], 2))
+    if connection.vendor == 'postgresql':
+        # Untyped parameters (NULLs above all) would make the VALUES columns text
+        row = '({})'.format(', '.join(f'CAST(%s AS {f.db_type(connection)})' for f in columns))
+    else:
+        row = '({})'.format(', '.join(['%s'] * len(columns)))
+    batch_size = connection.ops.bulk_batch_size(columns, products)
+    with connection.cursor() as cursor:
+        for start in range(0, len(products), batch_size):
+            batch = products[start:start + batch_size]
+            cursor.execute(
+                f'UPDATE {table} SET {assignments} '
+                f'FROM (VALUES {", ".join([row] * len(batch))}) AS v '
+                f'WHERE {table}.{qn(columns[0].column)} = v.column1',
+                [f.get_db_prep_save(getattr(product, f.attname), connection) for product in batch for f in columns],
+            )
+
+
+def apply_updates(rows, dry_run=False):
+    """Validate and apply a batch; see the module docstring. Raises BulkUpdateError."""
+    updates = clean_rows(rows)
+    fields = [name for name in UPDATE_FIELDS if any(name in values for values in updates.values())]
+    result = BulkUpdateResult(dry_run=dry_run)
+    skus = list(updates)
+    now = timezone.now()
+    changed_ids = []
+
+    with transaction.atomic():
+        for start in range(0, len(skus), CHUNK_SIZE):
+            chunk = skus[start:start + CHUNK_SIZE]
+            queryset = Product.objects.filter(sku__in=chunk).order_by().only('sku', *fields)
+            if not dry_run:
+                queryset = queryset.select_for_update()  # no concurrent edit between the diff and the write
+            products = {product.sku: product for product in queryset}
+
+            changed = []
+            for sku in chunk:
+                product = products.get(sku)
+                if product is None:
+                    result.not_found.append(sku)
+                    continue
+                diff = {}
+                for name, value in updates[sku].items():
+                    old = getattr(product, name)
+                    if old != value:
+                        diff[name] = {'old': old, 'new': value}
+                        setattr(product, name, value)
+                if diff:
+                    product.updated_at = now  # bulk writes skip auto_now
+                    changed.append(product)
+                    result.changes.append({'sku': sku, 'changes': diff})
+                else:
+                    result.unchanged += 1
+
+            if changed and not dry_run:
+                update_products(changed, fields)
+            changed_ids.extend(product.pk for product in changed)
+        result.updated = len(changed_ids)
+
+    if changed_ids and not dry_run:
+        # Once per batch; bulk writes send no post_save signals
+        bump_version('products')
+        if set(changed_ids) & set(get_featured_ids('products')):
+            refresh_featured('products')
+    return result
@@ -0,0 +1,202 @@
+"""
+Versioned cache namespaces for catalog data.
+
+Each namespace ('categories', 'brands', 'products') has a version counter in
+the cache. Cache keys embed the current version, so bumping the counter
+invalidates every key in the namespace at once without scanning the cache.
+Counters are bumped from model signals (see signals.py).
+
+Also provides `cache_catalog_response`, a response cache for anonymous
+catalog listings, and `conditional_catalog_response`, ETag / Last-Modified
+validators with 304 responses.
+"""
+
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from apps.core.localization import get_language
+from .pricing import PricingContext
+
+VERSION_KEY = 'catalog:version:{namespace}'
+MODIFIED_KEY = 'catalog:modified:{namespace}'
+
+
+def get_version(namespace):
+    """Get the current version of a namespace (starts at 1)."""
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(namespace):
+    """Invalidate every key of a namespace."""
+    cache.set(MODIFIED_KEY.format(namespace=namespace), time.time(), timeout=None)
+    key = VERSION_KEY.format(namespace=namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Counter expired or was never created
+        cache.add(key, 2, timeout=None)
+        return cache.get(key, 2)
+
+
+def make_key(namespace, *parts):
+    """Build a cache key bound to the current namespace version."""
+    version = get_version(namespace)
+    return ':'.join(['catalog', namespace, f'v{version}', *[str(p) for p in parts]])
+
+
+def get_versions(namespaces):
+    """Get versions of several namespaces, e.g. 'p3.c7'."""
+    return '.'.join(f'{ns[0]}{get_version(ns)}' for ns in namespaces)
+
+
+def get_last_modified(namespaces):
+    """
+    Unix time of the last change to any of the namespaces, recorded by
+    bump_version(). Unknown (e.g. after a cache flush) counts as now:
+    clients refetch once rather than keep a stale copy.
+    """
+    keys = [MODIFIED_KEY.format(namespace=ns) for ns in namespaces]
+    modified = cache.get_many(keys)
+    for key in keys:
+        if key not in modified:
+            cache.add(key, time.time(), timeout=None)
+            modified[key] = cache.get(key, time.time())
+    return max(modified.values())
+
+
+def normalize_query_params(query_params, ignored=()):
+    """Sorted (key, sorted values) pairs, so equivalent query strings match."""
+    return sorted(
+        (key, sorted(query_params.getlist(key)))
+        for key in query_params
+        if key not in ignored
+    )
+
+
+def get_request_language(request):
+    """Language the catalog serializers will render for this request."""
+    return get_language(request)
+
+
+def get_pricing_visibility(request):
+    """Pricing variant of the payload: the user's pricing tier."""
+    return PricingContext.for_request(request).tier
+
+
+def get_request_digest(request):
+    """Hash of what a catalog payload depends on: path, params, language, pricing."""
+    raw = json.dumps([
+        request.get_host(),
+        request.path,
+        normalize_query_params(request.query_params),
+        get_request_language(request),
+        get_pricing_visibility(request),
+    ])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def get_query_cache_key(name, request, namespaces, ignored=()):
+    """
+    Cache key for data that depends on the query params and language only
+    (not on the user), e.g. facet counts.
+    """
+    raw = json.dumps([
+        normalize_query_params(request.query_params, ignored),
+        get_request_language(request),
+    ])
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return f'catalog:{name}:{get_versions(namespaces)}:{digest}'
+
+
+def get_response_cache_key(request, namespaces):
+    """Cache key for a catalog response: path, params, language, pricing."""
+    return f'catalog:response:{get_versions(namespaces)}:{get_request_digest(request)}'
+
+
+def cache_catalog_response(*namespaces, timeout=None):
+    """
+    Cache an anonymous GET response of a viewset action.
+
+    `namespaces` lists the catalog namespaces the payload depends on; a
+    change to any of them invalidates the cached response. Authenticated
+    requests are never cached.
+
+    Usage:
+        @cache_catalog_response('products', 'categories', 'brands')
+        def list(self, request, *args, **kwargs): ...
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return view_method(self, request, *args, **kwargs)
+
+            key = get_response_cache_key(request, namespaces)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(
+                    key,
+                    response.data,
+                    timeout if timeout is not None else settings.CATALOG_CACHE_TIMEOUT
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_catalog_response(*namespaces):
+    """
+    ETag / Last-Modified validators for a catalog GET action, and 304
+    responses to `If-None-Match` / `If-Modified-Since`.
+
+    Validators come from the request digest, the namespace versions and
+    their last change time, so a conditional hit costs a few cache reads:
+    no queries and no serialization. They differ per language and pricing
+    tier, like the payload. Last-Modified is never later than now, and is
+    left out while the last change is in the current second.
+
+    Usage (outermost, so a 304 skips the response cache as well):
+        @conditional_catalog_response('products', 'categories', 'brands')
+        @cache_catalog_response('products', 'categories', 'brands')
+        def list(self, request, *args, **kwargs): ...
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            last_modified = get_last_modified(namespaces)
+            # Change time guards against versions restarting after a cache flush
+            raw = f'{get_request_digest(request)}:{get_versions(namespaces)}:{last_modified}'
+            etag = quote_etag(hashlib.sha1(raw.encode('utf-8')).hexdigest())
+            # Last-Modified has one-second precision: while the last change is in
+            # the current second, a later one would keep the value, so none is sent
+            # (and If-Modified-Since is not answered) until that second is over
+            last_modified = int(last_modified) if int(last_modified) < int(time.time()) else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                if last_modified is not None:
+                    response['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, ['Accept-Language', 'Authorization', 'Cookie'])
+            return response
+        return wrapper
+    return decorator
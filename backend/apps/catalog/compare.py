@@ -0,0 +1,113 @@
+"""
+Specification matrix for product comparison.
+
+`build_spec_matrix()` aligns the specifications of the compared products:
+one row per spec key (union, in first-seen order) with the values in
+product order, None where a product lacks the spec. Numeric values are
+converted to the first unit given for the spec when the units are
+compatible (мм/см/м, кг/т, л.с./кВт), and `differs` flags rows
+whose values are not all equal.
+"""
+
+from .models import parse_spec_number
+
+# Spec labels; unknown keys are title-cased
+SPEC_LABELS = {
+    'horsepower': {'ru': 'Мощность', 'uz': 'Quvvat', 'en': 'Power'},
+    'engine_type': {'ru': 'Двигатель', 'uz': 'Dvigatel', 'en': 'Engine'},
+    'transmission': {'ru': 'КПП', 'uz': 'Uzatma', 'en': 'Transmission'},
+    'fuel_capacity': {'ru': 'Топливный бак', 'uz': "Yoqilg'i sig'imi", 'en': 'Fuel Tank'},
+    'working_width': {'ru': 'Рабочая ширина', 'uz': 'Ish kengligi', 'en': 'Working Width'},
+    'weight': {'ru': 'Вес', 'uz': "Og'irlik", 'en': 'Weight'},
+}
+
+# Spellings of the same unit
+UNIT_ALIASES = {
+    'hp': 'л.с.', 'лс': 'л.с.', 'л. с.': 'л.с.',
+    'kw': 'кВт', 'квт': 'кВт',
+    'mm': 'мм', 'cm': 'см', 'm': 'м',
+    'kg': 'кг', 't': 'т', 'тн': 'т',
+    'l': 'л', 'литр': 'л',
+}
+
+# unit -> (base unit, units of base per unit)
+UNIT_SCALES = {
+    'мм': ('м', 0.001), 'см': ('м', 0.01), 'м': ('м', 1.0),
+    'кг': ('кг', 1.0), 'т': ('кг', 1000.0),
+    'л.с.': ('л.с.', 1.0), 'кВт': ('л.с.', 1.35962),
+}
+
+
+def spec_label(key, lang):
+    """Label of a spec key in `lang`."""
+    return SPEC_LABELS.get(key, {}).get(lang, key.replace('_', ' ').title())
+
+
+def normalize_unit(unit):
+    unit = str(unit or '').strip()
+    return UNIT_ALIASES.get(unit.lower(), unit)
+
+
+def convert(number, unit, target):
+    """`number` in `unit` expressed in `target`, or None if incompatible."""
+    if unit == target or not unit:
+        return number
+    source, target_scale = UNIT_SCALES.get(unit), UNIT_SCALES.get(target)
+    if source is None or target_scale is None or source[0] != target_scale[0]:
+        return None
+    return number * source[1] / target_scale[1]
+
+
+def _number(value):
+    value = round(value, 4)
+    return int(value) if value.is_integer() else value
+
+
+def _text(value, unit):
+    return f"{'' if value is None else value} {unit}".strip()
+
+
+def build_spec_matrix(specifications, lang='ru'):
+    """Aligned spec rows for a list of Product.specifications dicts."""
+    parsed = []
+    keys = {}
+    for specs in specifications:
+        cells = {}
+        for key, spec in (specs or {}).items():
+            value, unit = (spec.get('value'), spec.get('unit')) if isinstance(spec, dict) else (spec, '')
+            cells[key] = (value, parse_spec_number(value), normalize_unit(unit))
+            # The row unit is the first unit given for the spec
+            if not keys.get(key):
+                keys[key] = cells[key][2]
+        parsed.append(cells)
+
+    rows = []
+    for key, unit in keys.items():
+        values = []
+        numeric = True
+        for cells in parsed:
+            if key not in cells:
+                values.append(None)
+                continue
+            value, number, cell_unit = cells[key]
+            converted = convert(number, cell_unit, unit) if number is not None else None
+            if converted is None:
+                numeric = False
+                values.append(_text(value, cell_unit))
+            else:
+                values.append(_number(converted))
+        if not numeric:
+            # Mixed or text row: render every value with its own unit
+            values = [
+                value if value is None or isinstance(value, str) else _text(value, unit)
+                for value in values
+            ]
+        distinct = {value.casefold() if isinstance(value, str) else value for value in values}
+        rows.append({
+            'key': key,
+            'label': spec_label(key, lang),
+            'unit': unit if numeric else '',
+            'values': values,
+            'differs': len(distinct) > 1,
+        })
+    return rows
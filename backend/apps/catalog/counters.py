@@ -0,0 +1,110 @@
+"""
+Write-behind buffer for product view counts.
+
+Detail views do not write to the database: `record_view()` increments a
+counter in the cache (atomic INCR), and `flush_view_counts()` (run
+periodically by `manage.py flush_view_counts`) adds the buffered counts to
+`Product.view_count` with `F()` updates, one UPDATE per distinct count.
+
+Counters live in generations. A flush starts a new generation, waits a
+moment for requests that already read the old one, then drains every
+closed generation, so increments never race with the flush.
+
+Views are written at most once. Each batch of counters is removed from the
+cache before its UPDATEs run. A flush that fails midway loses the views of
+that batch instead of counting them twice, and the next run flushes the
+rest of the generation.
+"""
+
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import Product
+
+GENERATION_KEY = 'catalog:views:generation'
+FLUSHED_KEY = 'catalog:views:flushed'
+# Buffered counts are dropped if no flush runs for this long
+BUFFER_TIMEOUT = 60 * 60 * 24
+BATCH_SIZE = 1000
+
+
+def _key(generation, *parts):
+    return ':'.join(['catalog:views', f'g{generation}', *[str(p) for p in parts]])
+
+
+def _incr(key, timeout):
+    """Atomic increment that creates the counter at 1."""
+    if cache.add(key, 1, timeout=timeout):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(key, 1, timeout=timeout)
+        return 1
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def record_view(product_id):
+    """Count one view of a product (no database access)."""
+    generation = get_generation()
+    if _incr(_key(generation, product_id), BUFFER_TIMEOUT) == 1:
+        # First view in this generation: register the product for the flush
+        slot = _incr(_key(generation, 'slots'), BUFFER_TIMEOUT)
+        cache.set(_key(generation, 'slot', slot), product_id, BUFFER_TIMEOUT)
+
+
+def flush_view_counts(grace=1.0):
+    """
+    Write buffered view counts to the database.
+    Returns the number of views written.
+    """
+    try:
+        current = cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 2, timeout=None)
+        current = cache.get(GENERATION_KEY, 2)
+    if grace:
+        time.sleep(grace)
+
+    flushed = cache.get(FLUSHED_KEY, 0)
+    # Generation counter lost (cache restart): it restarted at 1
+    first = flushed + 1 if flushed < current else 1
+    total = 0
+    for generation in range(first, current):
+        total += _flush_generation(generation)
+        cache.set(FLUSHED_KEY, generation, timeout=None)
+    return total
+
+
+def _flush_generation(generation):
+    slots = cache.get(_key(generation, 'slots'), 0)
+    total = 0
+    for start in range(1, slots + 1, BATCH_SIZE):
+        slot_keys = [_key(generation, 'slot', n) for n in range(start, min(start + BATCH_SIZE, slots + 1))]
+        product_ids = list(cache.get_many(slot_keys).values())
+        count_keys = {_key(generation, pk): pk for pk in product_ids}
+        counts = cache.get_many(list(count_keys))
+
+        # Claimed before writing: a retry must not apply these counts again
+        cache.delete_many(slot_keys + list(count_keys))
+
+        by_count = defaultdict(list)
+        for key, count in counts.items():
+            by_count[count].append(count_keys[key])
+        for count, pks in by_count.items():
+            # update() skips signals: views do not invalidate catalog caches
+            Product.objects.filter(pk__in=pks).update(view_count=F('view_count') + count)
+            total += count * len(pks)
+    cache.delete(_key(generation, 'slots'))
+    return total
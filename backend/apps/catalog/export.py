@@ -0,0 +1,96 @@
+"""
+Catalog export for dealers (`/api/v1/products/export/<format>/` and
+`manage.py export_catalog`).
+
+Rows are read with `values_list().iterator()` (a server-side cursor on
+PostgreSQL) and written one chunk at a time, so memory stays flat however
+large the catalog is. Prices are those of the requesting user's tier.
+
+    rows = export_rows(queryset, PricingContext.for_request(request), 'ru')
+    response = StreamingHttpResponse(stream_csv(rows), content_type=CONTENT_TYPES['csv'])
+
+CSV and NDJSON are generated while the response is sent. XLSX is a zip
+archive, so it is written to a temporary file first (openpyxl write-only
+mode) and sent from there.
+"""
+
+import csv
+import json
+import tempfile
+
+from apps.core.localization import Translation
+from .models import Product
+from .serializers import PRICING_SOURCES
+
+CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+HEADER = (
+    'sku', 'slug', 'name', 'category', 'brand', 'product_type',
+    'price_usd', 'price_uzs', 'stock_status', 'stock_quantity', 'main_image',
+)
+
+NAME = Translation('name')
+SOURCE_COLUMNS = (
+    'sku', 'slug', *NAME.fields, 'category__slug', 'brand__slug', 'product_type',
+    *PRICING_SOURCES, 'stock_status', 'stock_quantity', 'main_image',
+)
+
+
+def export_rows(queryset, pricing, lang, request=None, chunk_size=CHUNK_SIZE):
+    """Yield one tuple per product, in HEADER order."""
+    name = NAME.getter(lang)
+    list_pricing = pricing.list_pricing
+    storage = Product._meta.get_field('main_image').storage
+    absolute = request.build_absolute_uri if request is not None else str
+    rows = queryset.values_list(*SOURCE_COLUMNS, named=True).iterator(chunk_size=chunk_size)
+    for row in rows:
+        price = list_pricing(row)
+        yield (
+            row.sku, row.slug, name(row), row.category__slug, row.brand__slug, row.product_type,
+            price['price_usd'], price['price_uzs'], row.stock_status, row.stock_quantity,
+            absolute(storage.url(row.main_image)) if row.main_image else None,
+        )
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield '﻿'  # BOM, so Excel opens the file as UTF-8
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(HEADER, row)), ensure_ascii=False) + '\n'
+
+
+def write_xlsx(rows, file=None):
+    """Write the rows as .xlsx to `file` (default: a temporary file), returned at the start."""
+    from openpyxl import Workbook  # optional: only for .xlsx exports
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Products')
+    sheet.append(HEADER)
+    for row in rows:
+        sheet.append(row)
+    file = file or tempfile.TemporaryFile()
+    workbook.save(file)
+    file.seek(0)
+    return file
+
+
+STREAMS = {'csv': stream_csv, 'ndjson': stream_ndjson}
@@ -0,0 +1,122 @@
+"""
+Facet counts for the catalog filter sidebar.
+
+`compute_facets()` takes an already filtered product queryset and returns
+brand, category, product type and stock status counts, a price histogram
+and the range of every numeric spec, in three queries:
+
+1. price bounds and total count (aggregate);
+2. one GROUP BY over (brand, category, type, stock status, price bucket),
+   folded into the individual facets in Python;
+3. per-spec min/max/count, joining product_spec_values.
+"""
+
+from collections import Counter
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, IntegerField, Max, Min, Value
+from django.db.models.functions import Cast, Floor, Least
+
+from .models import Product
+from .serializers import CATEGORY_NAME
+
+PRICE_BUCKETS = 10
+
+
+def get_price_bucket(low, high):
+    """Bucket index expression (0..PRICE_BUCKETS-1) for prices in [low, high]."""
+    if high <= low:
+        return Value(0, output_field=IntegerField())
+    width = (high - low) / PRICE_BUCKETS
+    offset = ExpressionWrapper(
+        (F('base_price_usd') - Value(low)) / Value(width),
+        output_field=DecimalField(max_digits=20, decimal_places=6)
+    )
+    return Least(Cast(Floor(offset), IntegerField()), Value(PRICE_BUCKETS - 1))
+
+
+def compute_facets(queryset, lang='ru'):
+    """Facet payload for a filtered product queryset."""
+    queryset = queryset.order_by()
+    bounds = queryset.aggregate(count=Count('id'), low=Min('base_price_usd'), high=Max('base_price_usd'))
+    facets = {
+        'count': bounds['count'],
+        'brands': [],
+        'categories': [],
+        'product_types': [],
+        'stock_statuses': [],
+        'price': {'min': None, 'max': None, 'histogram': []},
+        'specs': [],
+    }
+    if not bounds['count']:
+        return facets
+
+    low, high = bounds['low'], bounds['high']
+    category_name = CATEGORY_NAME.getter(lang)
+    fields = ('brand__slug', 'brand__name', 'category__slug', *CATEGORY_NAME.fields, 'product_type', 'stock_status')
+    rows = (
+        queryset
+        .values(*fields, bucket=get_price_bucket(low, high))
+        .annotate(products=Count('id'))  # not `count`: a tuple method on named rows
+        .values_list(*fields, 'bucket', 'products', named=True)
+    )
+
+    brands, categories, types, statuses, buckets = Counter(), Counter(), Counter(), Counter(), Counter()
+    brand_names, category_names = {}, {}
+    for row in rows:
+        count = row.products
+        brands[row.brand__slug] += count
+        brand_names[row.brand__slug] = row.brand__name
+        categories[row.category__slug] += count
+        category_names[row.category__slug] = category_name(row)
+        types[row.product_type] += count
+        statuses[row.stock_status] += count
+        buckets[row.bucket] += count
+
+    facets['brands'] = [
+        {'slug': slug, 'name': brand_names[slug], 'count': count}
+        for slug, count in sorted(brands.items(), key=lambda item: (-item[1], brand_names[item[0]]))
+    ]
+    facets['categories'] = [
+        {'slug': slug, 'name': category_names[slug], 'count': count}
+        for slug, count in sorted(categories.items(), key=lambda item: (-item[1], category_names[item[0]]))
+    ]
+    facets['product_types'] = [
+        {'value': value, 'label': label, 'count': types[value]}
+        for value, label in Product.ProductType.choices if types[value]
+    ]
+    facets['stock_statuses'] = [
+        {'value': value, 'label': label, 'count': statuses[value]}
+        for value, label in Product.StockStatus.choices if statuses[value]
+    ]
+
+    width = (high - low) / PRICE_BUCKETS
+    facets['price'] = {
+        'min': float(low),
+        'max': float(high),
+        # Equal-width buckets, empty ones included (a single one if all prices are equal)
+        'histogram': [
+            {'from': float(low + width * bucket), 'to': float(low + width * (bucket + 1)), 'count': buckets[bucket]}
+            for bucket in range(PRICE_BUCKETS if width else 1)
+        ],
+    }
+
+    # Joined rather than a pk__in subquery: search backends may add raw SQL
+    # that only works on the outer query
+    specs = (
+        queryset
+        .filter(spec_values__isnull=False)
+        .values('spec_values__spec_key')
+        .annotate(
+            low=Min('spec_values__numeric_value'), high=Max('spec_values__numeric_value'),
+            unit=Max('spec_values__unit'), count=Count('spec_values__id'),
+        )
+        .order_by('spec_values__spec_key')
+    )
+    facets['specs'] = [
+        {
+            'key': row['spec_values__spec_key'], 'min': row['low'], 'max': row['high'],
+            'unit': row['unit'], 'count': row['count'],
+        }
+        for row in specs
+    ]
+    return facets
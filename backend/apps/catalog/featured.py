@@ -0,0 +1,115 @@
+"""
+Materialized homepage payloads: featured products and featured brands.
+
+The payloads are serialized ahead of time (products in every language)
+and kept in the cache without expiry. Signal handlers drop and rebuild them
+when a featured product, a category or a brand changes
+(see signals.py), and `manage.py warm_catalog_cache` builds them at
+deploy. A request that finds no payload builds one too, but only adds it,
+for CATALOG_CACHE_TIMEOUT: it may have read rows a transaction is about to
+change, and must not replace or outlive the rebuild that follows the commit.
+Requests only add what depends on the request: absolute file URLs and the
+pricing of the user's tier.
+"""
+
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core.localization import LANGUAGE_CODES, get_language
+from .models import Brand, Product
+from .pricing import PricingContext
+from .serializers import PRICING_SOURCES, BrandListSerializer, ProductListRowSerializer, ProductListSerializer
+
+FEATURED_PRODUCTS_LIMIT = 12
+
+FEATURED_KEYS = {
+    'products': 'catalog:featured:products',
+    'brands': 'catalog:featured:brands',
+}
+
+
+def _store(kind, payload, lazy):
+    if lazy:
+        cache.add(FEATURED_KEYS[kind], payload, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    else:
+        cache.set(FEATURED_KEYS[kind], payload, timeout=None)
+
+
+def build_featured_products(lazy=False):
+    """
+    Serialize the featured products in every language; prices are kept raw.
+    `lazy`: built by a request (see the module docstring).
+    """
+    queryset = Product.objects.filter(is_active=True, is_featured=True)
+    rows = list(ProductListRowSerializer().get_rows(queryset)[:FEATURED_PRODUCTS_LIMIT])
+    payload = {
+        'ids': [row.pk for row in rows],
+        'prices': [{field: getattr(row, field) for field in PRICING_SOURCES} for row in rows],
+        'languages': {
+            lang: ProductListRowSerializer(lang=lang).serialize(rows)
+            for lang in LANGUAGE_CODES
+        },
+    }
+    _store('products', payload, lazy)
+    return payload
+
+
+def build_featured_brands(lazy=False):
+    brands = Brand.objects.filter(is_active=True, is_featured=True)
+    payload = {
+        'ids': [brand.pk for brand in brands],
+        'brands': BrandListSerializer(brands, many=True).data,
+    }
+    _store('brands', payload, lazy)
+    return payload
+
+
+BUILDERS = {'products': build_featured_products, 'brands': build_featured_brands}
+
+
+def get_featured_ids(kind):
+    """Ids in the materialized payload (empty if not built)."""
+    payload = cache.get(FEATURED_KEYS[kind])
+    return payload['ids'] if payload else []
+
+
+def refresh_featured(kind):
+    """Drop a payload now and rebuild it once the transaction commits."""
+    cache.delete(FEATURED_KEYS[kind])
+    transaction.on_commit(BUILDERS[kind])
+
+
+def _absolute(request, url):
+    return request.build_absolute_uri(url) if url else url
+
+
+def featured_products(request):
+    """Featured products payload for a request (same shape as ProductListSerializer)."""
+    payload = cache.get(FEATURED_KEYS['products']) or build_featured_products(lazy=True)
+    fields = ProductListSerializer.select_fields(request, ProductListSerializer.Meta.fields)
+    pricing = PricingContext.for_request(request) if 'pricing' in fields else None
+    results = []
+    for item, prices in zip(payload['languages'][get_language(request)], payload['prices']):
+        item = {
+            **item,
+            'category': {**item['category'], 'image': _absolute(request, item['category']['image'])},
+            'brand': {**item['brand'], 'logo': _absolute(request, item['brand']['logo'])},
+            'main_image': _absolute(request, item['main_image']),
+            'pricing': pricing.list_pricing(SimpleNamespace(**prices)) if pricing else None,
+        }
+        results.append({name: item[name] for name in fields})
+    return results
+
+
+def featured_brands(request):
+    """Featured brands payload for a request (same shape as BrandListSerializer)."""
+    payload = cache.get(FEATURED_KEYS['brands']) or build_featured_brands(lazy=True)
+    fields = BrandListSerializer.select_fields(request, BrandListSerializer.Meta.fields)
+    results = []
+    for brand in payload['brands']:
+        brand = {**brand, 'logo': _absolute(request, brand['logo'])}
+        results.append({name: brand[name] for name in fields})
+    return results
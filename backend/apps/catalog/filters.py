@@ -2,18 +2,35 @@
 Filters for catalog app.
 """
 
+import math
+import re
+
 from django_filters import rest_framework as filters
-from .models import Product, Category, Brand
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from .models import Product, Category, Brand, ProductSpecValue
+from .search import get_search_backend
+from .tree import get_subtree_ids
+
+SPEC_RANGE_PARAM = re.compile(r'^spec_(?P<key>\w+?)_(?P<bound>min|max)$')
+
+
+def is_search_truncated(request):
+    """Whether the `search` filter of this request left matches out."""
+    return getattr(getattr(request, '_request', request), 'search_truncated', False)
 
 
 class ProductFilter(filters.FilterSet):
     """
     Filter for product listings.
     Supports filtering by category, brand, price range, stock status, and specs.
+    Any numeric spec can be filtered with `spec_<key>_min` / `spec_<key>_max`
+    (see filter_spec_ranges).
     """
     
     # Basic filters
-    category = filters.CharFilter(field_name='category__slug')
+    category = filters.CharFilter(method='filter_categories')
+    categories = filters.CharFilter(method='filter_categories')
     brand = filters.CharFilter(method='filter_brands')
     product_type = filters.ChoiceFilter(choices=Product.ProductType.choices)
     stock_status = filters.ChoiceFilter(choices=Product.StockStatus.choices)
@@ -26,19 +43,23 @@ class ProductFilter(filters.FilterSet):
     # Search
     search = filters.CharFilter(method='filter_search')
     
-    # Technical specs (dynamic)
-    spec_horsepower_min = filters.NumberFilter(method='filter_spec_range')
-    spec_horsepower_max = filters.NumberFilter(method='filter_spec_range')
-    spec_working_width_min = filters.NumberFilter(method='filter_spec_range')
-    spec_working_width_max = filters.NumberFilter(method='filter_spec_range')
-    
     class Meta:
         model = Product
         fields = [
-            'category', 'brand', 'product_type', 'stock_status',
+            'category', 'categories', 'brand', 'product_type', 'stock_status',
             'is_featured', 'min_price', 'max_price', 'search'
         ]
     
+    def filter_categories(self, queryset, name, value):
+        """
+        Filter by category subtree(s) (comma-separated slugs).
+        A parent category matches products of all its subcategories.
+        """
+        if not value:
+            return queryset
+        slugs = [s.strip() for s in value.split(',') if s.strip()]
+        return queryset.filter(category_id__in=get_subtree_ids(slugs))
+    
     def filter_brands(self, queryset, name, value):
         """Filter by multiple brands (comma-separated slugs)."""
         if not value:
@@ -49,46 +70,61 @@ class ProductFilter(filters.FilterSet):
     def filter_search(self, queryset, name, value):
         """
         Search in product name, SKU, and description.
-        Simple implementation - in production use MeiliSearch.
+        Results are ordered by relevance (see RelevanceOrderingFilter).
+        If the backend capped the matches, `search_truncated` is set on
+        the filterset and on the request (see is_search_truncated).
         """
         if not value:
             return queryset
-        return queryset.filter(
-            models.Q(name_ru__icontains=value) |
-            models.Q(name_uz__icontains=value) |
-            models.Q(name_en__icontains=value) |
-            models.Q(sku__icontains=value) |
-            models.Q(short_description_ru__icontains=value)
-        )
+        queryset = get_search_backend().search_products(queryset, value[:100])
+        if getattr(queryset, 'search_truncated', False):
+            self.search_truncated = True
+            if self.request is not None:
+                getattr(self.request, '_request', self.request).search_truncated = True
+        return queryset
     
-    def filter_spec_range(self, queryset, name, value):
-        """
-        Filter by specification range.
-        Example: spec_horsepower_min=80 -> specifications__horsepower__value >= 80
+    search_truncated = False
+    
+    def filter_queryset(self, queryset):
+        return self.filter_spec_ranges(super().filter_queryset(queryset))
+    
+    def filter_spec_ranges(self, queryset):
         """
-        if not value:
-            return queryset
-        
-        # Parse filter name: spec_horsepower_min -> horsepower, min
-        parts = name.replace('spec_', '').rsplit('_', 1)
-        if len(parts) != 2:
-            return queryset
+        Filter by numeric specification ranges.
+        Example: spec_horsepower_min=80&spec_horsepower_max=150
         
-        spec_key, bound = parts
-        
-        # JSONField filtering with PostgreSQL
-        # For SQLite in dev, this may not work perfectly
-        if bound == 'min':
-            return queryset.filter(
-                **{f'specifications__{spec_key}__value__gte': value}
-            )
-        elif bound == 'max':
-            return queryset.filter(
-                **{f'specifications__{spec_key}__value__lte': value}
-            )
+        Each spec key is one index range scan on product_spec_values
+        (spec_key, numeric_value), joined back as a semi-join.
+        """
+        ranges = {}
+        for param, raw in self.data.items():
+            match = SPEC_RANGE_PARAM.match(param)
+            if not match or raw in ('', None):
+                continue
+            try:
+                value = float(raw)
+            except ValueError:
+                value = math.nan
+            if not math.isfinite(value):
+                raise ValidationError({param: ['Введите число.']})
+            lookup = 'gte' if match['bound'] == 'min' else 'lte'
+            ranges.setdefault(match['key'], {})[f'numeric_value__{lookup}'] = value
         
+        for spec_key, bounds in ranges.items():
+            queryset = queryset.filter(pk__in=ProductSpecValue.objects.filter(
+                spec_key=spec_key, **bounds
+            ).values('product_id'))
         return queryset
 
 
-# Import models for Q objects
-from django.db import models
+class RelevanceOrderingFilter(OrderingFilter):
+    """
+    Ordering filter that keeps search relevance order.
+    When `search` is given without an explicit `ordering`, the default
+    ordering is not applied so results stay ranked by the search backend.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get('search') and not request.query_params.get(self.ordering_param):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
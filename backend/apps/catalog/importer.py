@@ -0,0 +1,293 @@
+"""
+Bulk product import (`manage.py import_catalog` and the admin upload).
+
+Rows are streamed from CSV, XLSX or NDJSON and written in chunks: every
+chunk is validated in Python (category and brand slugs resolved from
+in-memory maps), then upserted by SKU with one
+`INSERT ... ON CONFLICT (sku) DO UPDATE`. Invalid rows are reported with
+their line number and skipped; the rest of the chunk is still written.
+
+Columns are Product field names, with `category` and `brand` given as
+slugs and `specifications` as a JSON object. Only the columns present in
+the file are updated on existing products; `slug` defaults to the
+slugified SKU for new ones.
+
+    result = import_products(read_rows(file, 'csv'))
+    result.created, result.updated, result.errors
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+from django.utils.text import slugify
+
+from .cache import bump_version
+from .featured import refresh_featured
+from .models import Brand, Category, Product, ProductSpecValue
+
+CHUNK_SIZE = 2000
+FORMATS = ('csv', 'xlsx', 'ndjson')
+
+# Product fields that can be imported (besides category/brand slugs)
+EXCLUDED_FIELDS = {'id', 'created_at', 'updated_at', 'search_name', 'search_description', 'view_count'}
+IMPORT_FIELDS = {
+    f.name: f for f in Product._meta.concrete_fields
+    if f.name not in EXCLUDED_FIELDS and not f.is_relation and not isinstance(f, models.FileField)
+}
+# Needed to create a product
+REQUIRED_COLUMNS = ('name_ru', 'base_price_usd', 'category', 'brand')
+# Loaded for existing SKUs: a valid INSERT row and the search keys need them
+KEPT_FIELDS = (
+    'slug', 'name_ru', 'name_uz', 'name_en',
+    'short_description_ru', 'short_description_uz', 'short_description_en',
+    'base_price_usd', 'category_id', 'brand_id',
+)
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'да', '+'}
+FALSE_VALUES = {'0', 'false', 'f', 'no', 'n', 'нет', '-', ''}
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)  # [(line, message)]
+
+    @property
+    def imported(self):
+        return self.created + self.updated
+
+
+def get_format(filename):
+    """Format from a file name ('prices.xlsx' -> 'xlsx'), or None."""
+    extension = filename.rsplit('.', 1)[-1].lower()
+    extension = {'jsonl': 'ndjson'}.get(extension, extension)
+    return extension if extension in FORMATS else None
+
+
+def read_rows(file, file_format):
+    """Yield (line, dict) from a binary file object."""
+    if file_format == 'xlsx':
+        yield from _read_xlsx(file)
+        return
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    if file_format == 'ndjson':
+        for line, raw in enumerate(text, 1):
+            if raw.strip():
+                try:
+                    row = json.loads(raw)
+                except ValueError as e:
+                    row = e
+                yield line, row
+        return
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    # Line 1 is the header
+    for line, row in enumerate(csv.DictReader(text, dialect=dialect), 2):
+        yield line, row
+
+
+def _read_xlsx(file):
+    from openpyxl import load_workbook  # optional: only for .xlsx uploads
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else '' for name in next(rows, ())]
+        for line, values in enumerate(rows, 2):
+            if any(value not in (None, '') for value in values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+class ProductImporter:
+    """Validates rows into Product instances and upserts them chunk by chunk."""
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.categories = dict(Category.objects.values_list('slug', 'pk'))
+        self.brands = dict(Brand.objects.values_list('slug', 'pk'))
+        self.result = ImportResult()
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+        if self.result.imported:
+            bump_version('products')
+            refresh_featured('products')
+        return self.result
+
+    def error(self, line, message):
+        self.result.errors.append((line, message))
+
+    def import_chunk(self, chunk):
+        errors_before = len(self.result.errors)
+        rows = {}  # sku -> (line, product, columns); the last row of a SKU wins
+        for line, row in chunk:
+            try:
+                product, columns = self.build_product(row)
+            except ValidationError as e:
+                self.error(line, '; '.join(e.messages))
+                continue
+            if product.sku in rows:
+                self.error(rows[product.sku][0], f'Артикул {product.sku} повторяется ниже в файле')
+            rows[product.sku] = (line, product, columns)
+
+        existing = {
+            values[0]: values[1:]
+            for values in Product.objects.filter(sku__in=list(rows)).values_list('sku', 'pk', *KEPT_FIELDS)
+        }
+        valid = {}
+        for sku, (line, product, columns) in rows.items():
+            current = existing.get(sku)
+            if current is None:
+                missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+                if missing:
+                    self.error(line, f"Новый товар: нет столбцов {', '.join(missing)}")
+                    continue
+                product.slug = product.slug or slugify(sku)
+            else:
+                # Columns the row leaves out keep their current values
+                for name, value in zip(KEPT_FIELDS, current[1:]):
+                    if name.removesuffix('_id') not in columns:
+                        setattr(product, name, value)
+            product.update_search_keys()  # bulk writes skip save()
+            valid[sku] = (line, product, columns)
+
+        taken = set(
+            Product.objects.filter(slug__in=[product.slug for _, product, _ in valid.values()])
+            .exclude(sku__in=list(valid)).values_list('slug', flat=True)
+        )
+        groups = {}  # rows with the same columns are upserted together
+        for sku, (line, product, columns) in valid.items():
+            if product.slug in taken:
+                self.error(line, f'URL-адрес {product.slug} уже занят')
+                continue
+            taken.add(product.slug)
+            groups.setdefault(columns, []).append((line, product))
+
+        for columns, group in groups.items():
+            saved = self.save_group(group, columns, {sku: values[0] for sku, values in existing.items()})
+            updated = sum(1 for product in saved if product.sku in existing)
+            self.result.updated += updated
+            self.result.created += len(saved) - updated
+        self.result.errors[errors_before:] = sorted(self.result.errors[errors_before:], key=lambda error: error[0])
+
+    def save_group(self, group, columns, pks):
+        """Upsert a group; on a database error, retry row by row. Returns the saved products."""
+        products = [product for line, product in group]
+        try:
+            with transaction.atomic():
+                self.save(products, columns, pks)
+            return products
+        except DatabaseError:
+            saved = []
+            for line, product in group:
+                # Ids returned by the rolled-back upsert are not in the table
+                product.pk = None
+                try:
+                    with transaction.atomic():
+                        self.save([product], columns, pks)
+                except DatabaseError as e:
+                    self.error(line, str(e))
+                else:
+                    saved.append(product)
+            return saved
+
+    def build_product(self, row):
+        """(unsaved Product, frozenset of its columns) for a row."""
+        if isinstance(row, Exception):
+            raise ValidationError(f'Некорректная строка: {row}')
+        if not isinstance(row, dict):
+            raise ValidationError('Ожидается объект')
+        row = {str(key).strip(): value for key, value in row.items() if key}
+        if not str(row.get('slug') or '').strip():
+            row.pop('slug', None)  # generated for new products, kept for existing ones
+        errors = []
+        product = Product()
+        for name, value in row.items():
+            if name in ('category', 'brand'):
+                ids = self.categories if name == 'category' else self.brands
+                slug = str(value or '').strip()
+                if slug in ids:
+                    setattr(product, f'{name}_id', ids[slug])
+                else:
+                    errors.append(f'{Product._meta.get_field(name).verbose_name}: не найдено «{slug}»')
+                continue
+            model_field = IMPORT_FIELDS.get(name)
+            if model_field is None:
+                continue
+            try:
+                setattr(product, model_field.attname, self.clean(model_field, value))
+            except ValidationError as e:
+                errors.append(f"{model_field.verbose_name}: {'; '.join(e.messages)}")
+        if 'sku' not in row:
+            errors.append('Нет артикула (sku)')
+        if errors:
+            raise ValidationError(errors)
+        columns = frozenset(name for name in row if name in IMPORT_FIELDS or name in ('category', 'brand'))
+        return product, columns
+
+    @staticmethod
+    def clean(model_field, value):
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ''):
+            if model_field.null:
+                return None
+            if model_field.has_default():
+                return model_field.get_default()
+        elif model_field.get_internal_type() == 'BooleanField' and not isinstance(value, bool):
+            value = str(value).strip().lower()
+            if value not in TRUE_VALUES | FALSE_VALUES:
+                raise ValidationError('Ожидается да/нет')
+            return value in TRUE_VALUES
+        elif model_field.get_internal_type() == 'DecimalField' and isinstance(value, (str, float)):
+            try:
+                value = Decimal(str(value).replace(',', '.').replace(' ', ''))
+            except ArithmeticError:
+                raise ValidationError('Ожидается число')
+        elif model_field.name == 'specifications' and isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                raise ValidationError('Ожидается JSON-объект')
+        return model_field.clean(value, None)
+
+    @staticmethod
+    def save(products, columns, pks):
+        update_fields = sorted(name for name in columns if name != 'sku')
+        Product.objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=[*update_fields, 'search_name', 'search_description', 'updated_at'],
+        )
+        if 'specifications' in columns:
+            for product in products:
+                # Not every database returns the ids of upserted rows
+                product.pk = product.pk or pks.get(product.sku)
+            if any(product.pk is None for product in products):
+                pks = dict(Product.objects.filter(sku__in=[p.sku for p in products]).values_list('sku', 'pk'))
+                for product in products:
+                    product.pk = pks[product.sku]
+            ProductSpecValue.sync(products)
+
+
+def import_products(rows, chunk_size=CHUNK_SIZE):
+    """Import (line, row) pairs; see read_rows()."""
+    return ProductImporter(chunk_size).run(rows)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.models import Category
+from apps.catalog.recommend import BATCH_SIZE, TOP_K, build_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Precomputes related products (by default only for categories changed since the last run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', action='append', default=[], help='Category slug (repeatable)')
+        parser.add_argument('--all', action='store_true', help='Rebuild every category')
+        parser.add_argument('--top-k', type=int, default=TOP_K, help='Related products per product')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows and columns per similarity block')
+
+    def handle(self, *args, **options):
+        category_ids = None
+        if options['all']:
+            category_ids = Category.objects.values_list('pk', flat=True)
+        elif options['category']:
+            category_ids = list(Category.objects.filter(slug__in=options['category']).values_list('pk', flat=True))
+            if len(category_ids) != len(set(options['category'])):
+                raise CommandError('Категория не найдена')
+
+        count = build_recommendations(category_ids, k=options['top_k'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Recommendations built: {count} products'))
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.catalog.cache import bump_version
+from apps.catalog.models import Brand, Category, Product
+from apps.catalog.search.engine import SearchEngine
+
+
+class Command(BaseCommand):
+    help = 'Builds the embedded search index and writes its snapshot for workers to load on start'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Snapshot path (default: settings.CATALOG_SEARCH_SNAPSHOT)')
+        parser.add_argument(
+            '--refresh-keys', action='store_true',
+            help='Recompute stored search keys first (after changes to search normalization)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.CATALOG_SEARCH_SNAPSHOT
+        if options['refresh_keys']:
+            for model, namespace in ((Product, 'products'), (Category, 'categories'), (Brand, 'brands')):
+                count = self.refresh_search_keys(model)
+                bump_version(namespace)
+                self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
+            if not path:
+                return
+        elif not path:
+            raise CommandError('Укажите --output или CATALOG_SEARCH_SNAPSHOT')
+
+        engine = SearchEngine()
+        engine.build()
+        engine.save_snapshot(path)
+
+        counts = ', '.join(f'{kind}: {len(index)}' for kind, index in engine.indexes.items())
+        self.stdout.write(self.style.SUCCESS(f'Search snapshot written to {path} ({counts})'))
+
+    def refresh_search_keys(self, model, batch_size=1000):
+        # updated_at lets running embedded engines pick the new keys up
+        fields = [*model.SEARCH_KEYS, 'updated_at']
+        now = timezone.now()
+        batch, count = [], 0
+        for obj in model.objects.order_by('pk').iterator(chunk_size=batch_size):
+            obj.update_search_keys()
+            obj.updated_at = now
+            batch.append(obj)
+            if len(batch) == batch_size:
+                model.objects.bulk_update(batch, fields)
+                count += len(batch)
+                batch = []
+        model.objects.bulk_update(batch, fields)
+        return count + len(batch)
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from apps.catalog.export import CHUNK_SIZE, CONTENT_TYPES, STREAMS, export_rows, write_xlsx
+from apps.catalog.filters import ProductFilter
+from apps.catalog.models import Product
+from apps.catalog.pricing import PricingContext
+from apps.core.localization import DEFAULT_LANGUAGE, LANGUAGE_CODES
+
+
+class Command(BaseCommand):
+    help = 'Exports the active catalog to CSV, NDJSON or XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(CONTENT_TYPES), default='csv', help='File format')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout; required for xlsx)')
+        parser.add_argument('--user', help='Username whose pricing tier is applied (default: guest prices)')
+        parser.add_argument('--lang', choices=LANGUAGE_CODES, default=DEFAULT_LANGUAGE, help='Language of names')
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='PARAM=VALUE',
+            help='Listing filter, as in /api/v1/products/ (repeatable), e.g. category=tractors',
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched per round trip')
+
+    def handle(self, *args, **options):
+        file_format = options['format']
+        if file_format == 'xlsx' and not options['output']:
+            raise CommandError('Для xlsx укажите --output')
+
+        user = None
+        if options['user']:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError('Пользователь не найден')
+
+        params = QueryDict(mutable=True)
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Ожидается PARAM=VALUE: {item}')
+            params.appendlist(name, value)
+        filterset = ProductFilter(params, Product.objects.filter(is_active=True).order_by('-created_at'))
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        rows = export_rows(
+            filterset.qs, PricingContext.for_user(user), options['lang'], chunk_size=options['chunk_size']
+        )
+        if filterset.search_truncated:
+            self.stderr.write('Warning: the search backend capped the matches, the export is partial')
+        if file_format == 'xlsx':
+            with open(options['output'], 'wb') as output:
+                write_xlsx(rows, output)
+        elif options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(STREAMS[file_format](rows))
+        else:
+            for chunk in STREAMS[file_format](rows):
+                self.stdout.write(chunk, ending='')
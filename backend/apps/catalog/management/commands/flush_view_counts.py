@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.catalog.counters import flush_view_counts
+
+
+class Command(BaseCommand):
+    help = 'Writes buffered product view counts to the database (run every minute or so)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=float, default=1.0,
+            help='Seconds to wait for in-flight views after closing the buffer'
+        )
+
+    def handle(self, *args, **options):
+        views = flush_view_counts(grace=options['grace'])
+        self.stdout.write(self.style.SUCCESS(f'Views flushed: {views}'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.importer import CHUNK_SIZE, FORMATS, get_format, import_products, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Imports products from CSV, XLSX or NDJSON (upsert by SKU)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=FORMATS, help='File format (default: from the extension)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows per upsert')
+        parser.add_argument('--max-errors', type=int, default=50, help='Errors to print')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or get_format(options['path'])
+        if file_format is None:
+            raise CommandError('Не удалось определить формат файла, укажите --format')
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_products(read_rows(file, file_format), chunk_size=options['chunk_size'])
+        except OSError as e:
+            raise CommandError(e)
+
+        for line, message in result.errors[:options['max_errors']]:
+            self.stderr.write(f'Line {line}: {message}')
+        if len(result.errors) > options['max_errors']:
+            self.stderr.write(f'... {len(result.errors) - options["max_errors"]} more errors')
+        self.stdout.write(self.style.SUCCESS(
+            f'Products imported: {result.created} created, {result.updated} updated, {len(result.errors)} errors'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.catalog.featured import build_featured_brands, build_featured_products
+
+
+class Command(BaseCommand):
+    help = 'Builds the materialized featured products/brands payloads (run at deploy)'
+
+    def handle(self, *args, **options):
+        products = build_featured_products()
+        brands = build_featured_brands()
+        self.stdout.write(self.style.SUCCESS(
+            f"Featured payloads built: {len(products['ids'])} products, {len(brands['ids'])} brands"
+        ))
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:32
+
+from django.db import migrations, models
+
+
+def populate_tree_paths(apps, schema_editor):
+    """Fill path/depth/path_name for existing categories, parents first."""
+    Category = apps.get_model('catalog', 'Category')
+    categories = {c.pk: c for c in Category.objects.all()}
+    resolved = {}
+
+    def resolve(category):
+        if category.pk in resolved:
+            return resolved[category.pk]
+        if category.parent_id is None or category.parent_id not in categories:
+            value = (f'/{category.pk}/', 0, category.name_ru)
+        else:
+            path, depth, path_name = resolve(categories[category.parent_id])
+            value = (f'{path}{category.pk}/', depth + 1, f'{path_name} / {category.name_ru}')
+        resolved[category.pk] = value
+        return value
+
+    for category in categories.values():
+        category.path, category.depth, category.path_name = resolve(category)
+    Category.objects.bulk_update(categories.values(), ['path', 'depth', 'path_name'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Уровень'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Идентификаторы предков и самой категории, например: /1/5/12/', max_length=255, verbose_name='Путь в дереве'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path_name',
+            field=models.TextField(blank=True, editable=False, verbose_name='Полный путь'),
+        ),
+        migrations.RunPython(populate_tree_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(name_ru, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(name_uz, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(name_en, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(sku, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(short_description_ru, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(short_description_uz, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(short_description_en, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX products_search_vector_idx ON products USING GIN (search_vector)",
+    "CREATE INDEX products_name_ru_trgm_idx ON products USING GIN (name_ru gin_trgm_ops)",
+    "CREATE INDEX products_sku_trgm_idx ON products USING GIN (sku gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS products_sku_trgm_idx",
+    "DROP INDEX IF EXISTS products_name_ru_trgm_idx",
+    "DROP INDEX IF EXISTS products_search_vector_idx",
+    "ALTER TABLE products DROP COLUMN IF EXISTS search_vector",
+]
+
+FTS_COLUMNS = (
+    'name_ru, name_uz, name_en, sku, '
+    'short_description_ru, short_description_uz, short_description_en'
+)
+FTS_VALUES = (
+    'new.name_ru, new.name_uz, new.name_en, new.sku, '
+    'new.short_description_ru, new.short_description_uz, new.short_description_en'
+)
+FTS_OLD_VALUES = FTS_VALUES.replace('new.', 'old.')
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE products_fts USING fts5(
+        {FTS_COLUMNS},
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {FTS_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, {FTS_OLD_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER products_fts_update AFTER UPDATE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, {FTS_OLD_VALUES});
+        INSERT INTO products_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {FTS_VALUES});
+    END
+    """,
+    "INSERT INTO products_fts(products_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS products_fts_update",
+    "DROP TRIGGER IF EXISTS products_fts_delete",
+    "DROP TRIGGER IF EXISTS products_fts_insert",
+    "DROP TABLE IF EXISTS products_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {'postgresql': postgres, 'sqlite': sqlite}.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search structures, maintained by the database itself:
+    a weighted tsvector generated column plus trigram GIN indexes on
+    PostgreSQL, an FTS5 external-content table with sync triggers on SQLite.
+    """
+
+    dependencies = [
+        ('catalog', '0003_product_keyset_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_REVERSE, SQLITE_REVERSE),
+        ),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:17
+
+import re
+import unicodedata
+from importlib import import_module
+
+from django.db import migrations, models
+
+previous = import_module('apps.catalog.migrations.0004_product_search_index')
+
+# Frozen copy of apps.catalog.search.normalize.build_search_key as of this
+# migration: later changes there must not change what it computes (and
+# importing it would load the search package and models at migration time).
+TOKEN_RE = re.compile(r'\w+')
+APOSTROPHES = dict.fromkeys(map(ord, "'`´‘’ʻʼʹ′"), None)
+CYRILLIC_TO_LATIN = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo',
+    'ж': 'j', 'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm',
+    'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+    'ф': 'f', 'х': 'x', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '',
+    'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya',
+    'ў': 'o', 'қ': 'q', 'ғ': 'g', 'ҳ': 'h',
+})
+SPELLING_FOLDS = [
+    (re.compile(r'kh'), 'x'),
+    (re.compile(r'zh'), 'j'),
+    (re.compile(r'ts'), 's'),
+    (re.compile(r'q'), 'k'),
+    (re.compile(r'c(?=[eiy])'), 's'),
+    (re.compile(r'c(?!h)'), 'k'),
+]
+
+
+def normalize(text):
+    if not text:
+        return ''
+    text = text.lower().translate(APOSTROPHES).translate(CYRILLIC_TO_LATIN)
+    decomposed = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    for pattern, replacement in SPELLING_FOLDS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def build_search_key(*values):
+    words = TOKEN_RE.findall(normalize(' '.join(value for value in values if value)))
+    return ' '.join(dict.fromkeys(words))
+
+
+SEARCH_KEYS = {
+    'Product': {
+        'search_name': ('name_ru', 'name_uz', 'name_en'),
+        'search_description': ('short_description_ru', 'short_description_uz', 'short_description_en'),
+    },
+    'Category': {'search_name': ('name_ru', 'name_uz', 'name_en')},
+    'Brand': {'search_name': ('name',)},
+}
+
+
+def populate_search_keys(apps, schema_editor):
+    for model_name, keys in SEARCH_KEYS.items():
+        model = apps.get_model('catalog', model_name)
+        batch = []
+        for obj in model.objects.order_by('pk').iterator(chunk_size=1000):
+            for key, sources in keys.items():
+                setattr(obj, key, build_search_key(*(getattr(obj, field) for field in sources)))
+            batch.append(obj)
+            if len(batch) == 1000:
+                model.objects.bulk_update(batch, list(keys))
+                batch = []
+        model.objects.bulk_update(batch, list(keys))
+
+
+# Index the normalized keys instead of the raw multilingual columns.
+# SKUs stay raw: queries match them with the raw query text.
+POSTGRES_FORWARD = [
+    "DROP INDEX IF EXISTS products_name_ru_trgm_idx",
+    "ALTER TABLE products DROP COLUMN search_vector",
+    """
+    ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(search_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(sku, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(search_description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX products_search_vector_idx ON products USING GIN (search_vector)",
+    "CREATE INDEX products_search_name_trgm_idx ON products USING GIN (search_name gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS products_search_name_trgm_idx",
+    "ALTER TABLE products DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS products_sku_trgm_idx",
+    *previous.POSTGRES_FORWARD,
+]
+
+FTS_COLUMNS = 'search_name, sku, search_description'
+FTS_VALUES = 'new.search_name, new.sku, new.search_description'
+FTS_OLD_VALUES = FTS_VALUES.replace('new.', 'old.')
+
+SQLITE_FORWARD = previous.SQLITE_REVERSE + [
+    statement.replace(previous.FTS_COLUMNS, FTS_COLUMNS)
+    .replace(previous.FTS_OLD_VALUES, FTS_OLD_VALUES)
+    .replace(previous.FTS_VALUES, FTS_VALUES)
+    for statement in previous.SQLITE_FORWARD
+]
+
+SQLITE_REVERSE = previous.SQLITE_REVERSE + previous.SQLITE_FORWARD
+
+
+class Migration(migrations.Migration):
+    """
+    Normalized search keys (apps.catalog.search.normalize) on products,
+    categories and brands, and full-text indexes rebuilt over them.
+    """
+
+    dependencies = [
+        ('catalog', '0004_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brand',
+            name='search_name',
+            field=models.TextField(blank=True, editable=False, verbose_name='Поисковый ключ'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='search_name',
+            field=models.TextField(blank=True, editable=False, verbose_name='Поисковый ключ'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_description',
+            field=models.TextField(blank=True, editable=False, verbose_name='Поисковый ключ (описание)'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_name',
+            field=models.TextField(blank=True, editable=False, verbose_name='Поисковый ключ (название)'),
+        ),
+        migrations.RunPython(populate_search_keys, migrations.RunPython.noop),
+        migrations.RunPython(
+            previous.run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            previous.run_for_vendor(POSTGRES_REVERSE, SQLITE_REVERSE),
+        ),
+    ]
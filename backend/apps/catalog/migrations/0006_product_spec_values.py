@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:28
+
+import django.db.models.deletion
+import math
+import re
+
+from django.db import migrations, models
+
+# Frozen copies of apps.catalog.models.parse_spec_number / numeric_specs:
+# later changes there must not change what this migration does.
+THOUSANDS_RE = re.compile(r'^[-+]?\d{1,3}(,\d{3})+(\.\d+)?$')
+
+
+def parse_spec_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip().replace(' ', '').replace('\xa0', '')
+        value = value.replace(',', '') if THOUSANDS_RE.match(value) else value.replace(',', '.')
+    elif not isinstance(value, (int, float)):
+        return None
+    try:
+        number = float(value)
+    except (ValueError, OverflowError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def numeric_specs(specifications):
+    for key, spec in (specifications or {}).items():
+        value, unit = (spec.get('value'), spec.get('unit') or '') if isinstance(spec, dict) else (spec, '')
+        number = parse_spec_number(value)
+        if number is not None:
+            yield key[:100], number, str(unit)[:20]
+
+
+def populate_spec_values(apps, schema_editor):
+    Product = apps.get_model('catalog', 'Product')
+    ProductSpecValue = apps.get_model('catalog', 'ProductSpecValue')
+    rows = []
+    products = Product.objects.exclude(specifications={}).values_list('pk', 'specifications')
+    for pk, specifications in products.iterator(chunk_size=1000):
+        rows.extend(
+            ProductSpecValue(product_id=pk, spec_key=key, numeric_value=number, unit=unit)
+            for key, number, unit in numeric_specs(specifications)
+        )
+        if len(rows) >= 1000:
+            ProductSpecValue.objects.bulk_create(rows)
+            rows = []
+    ProductSpecValue.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_search_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSpecValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spec_key', models.CharField(max_length=100, verbose_name='Характеристика')),
+                ('numeric_value', models.FloatField(verbose_name='Значение')),
+                ('unit', models.CharField(blank=True, max_length=20, verbose_name='Единица')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spec_values', to='catalog.product', verbose_name='Товар')),
+            ],
+            options={
+                'verbose_name': 'Числовая характеристика',
+                'verbose_name_plural': 'Числовые характеристики',
+                'db_table': 'product_spec_values',
+                'indexes': [models.Index(fields=['spec_key', 'numeric_value', 'product'], name='product_spec_range_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'spec_key'), name='product_spec_value_unique')],
+            },
+        ),
+        migrations.RunPython(populate_spec_values, migrations.RunPython.noop),
+    ]
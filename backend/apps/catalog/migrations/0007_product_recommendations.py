@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_product_spec_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRecommendations',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendations', serialize=False, to='catalog.product', verbose_name='Товар')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.category', verbose_name='Категория')),
+                ('related_ids', models.JSONField(default=list, verbose_name='Похожие товары')),
+                ('computed_at', models.DateTimeField(verbose_name='Рассчитано')),
+            ],
+            options={
+                'verbose_name': 'Похожие товары',
+                'verbose_name_plural': 'Похожие товары',
+                'db_table': 'product_recommendations',
+            },
+        ),
+    ]
@@ -2,11 +2,44 @@
 Product catalog models for UzAgro Platform.
 """
 
+import math
+import re
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from apps.core.localization import Translation
 from apps.core.models import TimestampedModel, OrderedMixin, ActiveMixin
 
+NAME = Translation('name')
+
 
-class Category(TimestampedModel, OrderedMixin, ActiveMixin):
+class SearchKeysMixin:
+    """
+    Keeps normalized search keys (see apps.catalog.search.normalize) in sync
+    with their source fields on save. SEARCH_KEYS maps key field -> sources.
+    Bulk writes must call `update_search_keys()` themselves.
+    """
+    SEARCH_KEYS = {}
+    
+    def update_search_keys(self):
+        from .search.normalize import build_search_key
+        for key, sources in self.SEARCH_KEYS.items():
+            setattr(self, key, build_search_key(*(getattr(self, field) for field in sources)))
+    
+    def save(self, *args, **kwargs):
+        self.update_search_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *(
+                key for key, sources in self.SEARCH_KEYS.items()
+                if not set(sources).isdisjoint(update_fields)
+            )}
+        super().save(*args, **kwargs)
+
+
+class Category(SearchKeysMixin, TimestampedModel, OrderedMixin, ActiveMixin):
     """
     Hierarchical product categories.
     Examples: Тракторы, Комбайны, Почвообработка, Запчасти
@@ -35,6 +68,9 @@ class Category(TimestampedModel, OrderedMixin, ActiveMixin):
     description_uz = models.TextField('Описание (UZ)', blank=True)
     description_en = models.TextField('Описание (EN)', blank=True)
     
+    # Normalized search key (script, case and spelling folded)
+    search_name = models.TextField('Поисковый ключ', blank=True, editable=False)
+    
     # Visual
     image = models.ImageField(
         'Изображение',
@@ -53,6 +89,23 @@ class Category(TimestampedModel, OrderedMixin, ActiveMixin):
     meta_title_ru = models.CharField('Meta Title (RU)', max_length=70, blank=True)
     meta_description_ru = models.CharField('Meta Description (RU)', max_length=160, blank=True)
     
+    # Materialized tree path, maintained in save()
+    path = models.CharField(
+        'Путь в дереве',
+        max_length=255,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text='Идентификаторы предков и самой категории, например: /1/5/12/'
+    )
+    depth = models.PositiveSmallIntegerField('Уровень', default=0, editable=False)
+    path_name = models.TextField('Полный путь', blank=True, editable=False)
+    
+    PATH_SEPARATOR = '/'
+    PATH_NAME_SEPARATOR = ' / '
+    
+    SEARCH_KEYS = {'search_name': ('name_ru', 'name_uz', 'name_en')}
+    
     class Meta:
         db_table = 'categories'
         verbose_name = 'Категория'
@@ -64,18 +117,89 @@ class Category(TimestampedModel, OrderedMixin, ActiveMixin):
     
     def get_name(self, lang='ru'):
         """Get name in specified language."""
-        name = getattr(self, f'name_{lang}', None)
-        return name if name else self.name_ru
+        return NAME.get(self, lang)
     
     @property
     def full_path(self):
         """Get full category path (e.g., 'Техника / Тракторы / Колёсные')."""
-        if self.parent:
-            return f"{self.parent.full_path} / {self.name_ru}"
-        return self.name_ru
+        return self.path_name or self.name_ru
+    
+    @property
+    def ancestor_ids(self):
+        """IDs of all ancestors, root first. Parsed from `path`, no query."""
+        ids = [int(pk) for pk in self.path.strip(self.PATH_SEPARATOR).split(self.PATH_SEPARATOR) if pk]
+        return ids[:-1]
+    
+    def get_ancestors(self, include_self=False):
+        """Get ancestors ordered from the root down (single query)."""
+        ids = self.ancestor_ids
+        if include_self:
+            ids.append(self.pk)
+        return Category.objects.filter(pk__in=ids).order_by('depth')
+    
+    def get_descendants(self, include_self=False):
+        """Get the whole subtree below this category (single indexed prefix query)."""
+        queryset = Category.objects.filter(path__startswith=self.path)
+        if not include_self:
+            queryset = queryset.exclude(pk=self.pk)
+        return queryset
+    
+    def clean(self):
+        super().clean()
+        self._check_parent()
+    
+    def _check_parent(self):
+        """Refuse to attach a category under itself or its own subtree."""
+        if self.pk is None or self.parent_id is None:
+            return
+        parent_path = Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).first()
+        if self.parent_id == self.pk or (parent_path and f'/{self.pk}/' in parent_path):
+            raise ValidationError({
+                'parent': 'Категория не может быть вложена в саму себя или свою подкатегорию'
+            })
+    
+    def save(self, *args, **kwargs):
+        old = None
+        if self.pk is not None:
+            self._check_parent()
+            old = Category.objects.filter(pk=self.pk).values('path', 'depth', 'path_name').first()
+        super().save(*args, **kwargs)
+        self._sync_tree_path(old)
+    
+    def _sync_tree_path(self, old):
+        """
+        Recompute path/depth/path_name after save and, when the category was
+        moved or renamed, rewrite the whole subtree in one UPDATE.
+        """
+        if self.parent_id is None:
+            path, depth, path_name = f'/{self.pk}/', 0, self.name_ru
+        else:
+            parent = Category.objects.values('path', 'depth', 'path_name').get(pk=self.parent_id)
+            path = f"{parent['path']}{self.pk}/"
+            depth = parent['depth'] + 1
+            path_name = f"{parent['path_name']}{self.PATH_NAME_SEPARATOR}{self.name_ru}"
+        
+        current = old or {'path': self.path, 'depth': self.depth, 'path_name': self.path_name}
+        self.path, self.depth, self.path_name = path, depth, path_name
+        if current == {'path': path, 'depth': depth, 'path_name': path_name}:
+            return
+        
+        Category.objects.filter(pk=self.pk).update(path=path, depth=depth, path_name=path_name)
+        if current['path']:
+            Category.objects.filter(
+                path__startswith=current['path']
+            ).exclude(pk=self.pk).update(
+                path=Concat(Value(path), Substr('path', len(current['path']) + 1)),
+                depth=F('depth') + (depth - current['depth']),
+                path_name=Concat(
+                    Value(path_name),
+                    Substr('path_name', len(current['path_name']) + 1),
+                    output_field=models.TextField()
+                ),
+            )
 
 
-class Brand(TimestampedModel, ActiveMixin):
+class Brand(SearchKeysMixin, TimestampedModel, ActiveMixin):
     """
     Manufacturers: YTO, Rostselmash, KUHN, etc.
     """
@@ -87,6 +211,7 @@ class Brand(TimestampedModel, ActiveMixin):
     )
     name = models.CharField('Название', max_length=100)
     country = models.CharField('Страна', max_length=50)
+    search_name = models.TextField('Поисковый ключ', blank=True, editable=False)
     
     logo = models.ImageField(
         'Логотип',
@@ -103,6 +228,8 @@ class Brand(TimestampedModel, ActiveMixin):
     is_verified = models.BooleanField('Верифицирован', default=False)
     is_featured = models.BooleanField('Рекомендуемый', default=False)
     
+    SEARCH_KEYS = {'search_name': ('name',)}
+    
     class Meta:
         db_table = 'brands'
         verbose_name = 'Бренд'
@@ -113,7 +240,7 @@ class Brand(TimestampedModel, ActiveMixin):
         return f"{self.name} ({self.country})"
 
 
-class Product(TimestampedModel, ActiveMixin):
+class Product(SearchKeysMixin, TimestampedModel, ActiveMixin):
     """
     Main product model for agricultural machinery and parts.
     """
@@ -162,6 +289,10 @@ class Product(TimestampedModel, ActiveMixin):
     full_description_uz = models.TextField('Полное описание (UZ)', blank=True)
     full_description_en = models.TextField('Полное описание (EN)', blank=True)
     
+    # Normalized search keys (script, case and spelling folded)
+    search_name = models.TextField('Поисковый ключ (название)', blank=True, editable=False)
+    search_description = models.TextField('Поисковый ключ (описание)', blank=True, editable=False)
+    
     # Relations
     category = models.ForeignKey(
         Category,
@@ -274,6 +405,11 @@ class Product(TimestampedModel, ActiveMixin):
     # View count for popularity
     view_count = models.PositiveIntegerField('Просмотры', default=0)
     
+    SEARCH_KEYS = {
+        'search_name': ('name_ru', 'name_uz', 'name_en'),
+        'search_description': ('short_description_ru', 'short_description_uz', 'short_description_en'),
+    }
+    
     class Meta:
         db_table = 'products'
         verbose_name = 'Товар'
@@ -285,34 +421,144 @@ class Product(TimestampedModel, ActiveMixin):
             models.Index(fields=['brand', 'is_active']),
             models.Index(fields=['product_type', 'is_active']),
             models.Index(fields=['stock_status']),
+            # Keyset pagination: (ordering field, id) for every ordering option
+            models.Index(fields=['is_active', 'base_price_usd', 'id']),
+            models.Index(fields=['is_active', 'created_at', 'id']),
+            models.Index(fields=['is_active', 'name_ru', 'id']),
+            models.Index(fields=['is_active', 'view_count', 'id']),
         ]
 
     def __str__(self):
         return f"{self.sku} - {self.name_ru}"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'specifications' in update_fields:
+            ProductSpecValue.sync([self])
+    
     def get_name(self, lang='ru'):
         """Get name in specified language."""
-        name = getattr(self, f'name_{lang}', None)
-        return name if name else self.name_ru
+        return NAME.get(self, lang)
     
     def get_price_for_user(self, user=None):
         """
         Get appropriate price based on user type.
         Returns (price_usd, can_see_price).
-        """
-        if user is None or not user.is_authenticated:
-            if self.show_price_to_guests:
-                return (self.retail_price_usd or self.base_price_usd, True)
-            return (None, False)
         
-        if hasattr(user, 'business_profile') and user.business_profile.is_verified:
-            tier = user.business_profile.pricing_tier
-            if tier == 'vip':
-                return (self.wholesale_price_usd or self.base_price_usd, True)
-            elif tier == 'wholesale':
-                return (self.wholesale_price_usd or self.retail_price_usd or self.base_price_usd, True)
-        
-        return (self.retail_price_usd or self.base_price_usd, True)
+        When pricing many products, resolve a PricingContext once instead.
+        """
+        from .pricing import PricingContext
+        return PricingContext.for_user(user).price_for(self)
+
+
+# '1,200' / '12,500.5': commas group thousands; otherwise a comma is the decimal point ('2,5')
+THOUSANDS_RE = re.compile(r'^[-+]?\d{1,3}(,\d{3})+(\.\d+)?$')
+
+
+def parse_spec_number(value):
+    """Numeric value of a spec ('2,5' -> 2.5, '1,200' -> 1200.0), or None for text specs."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip().replace(' ', '').replace('\xa0', '')
+        value = value.replace(',', '') if THOUSANDS_RE.match(value) else value.replace(',', '.')
+    elif not isinstance(value, (int, float)):
+        return None
+    try:
+        number = float(value)
+    except (ValueError, OverflowError):
+        return None
+    # 'nan' / 'inf' parse as floats, but would match every range filter
+    return number if math.isfinite(number) else None
+
+
+def numeric_specs(specifications):
+    """(key, number, unit) for the numeric entries of Product.specifications."""
+    for key, spec in (specifications or {}).items():
+        value, unit = (spec.get('value'), spec.get('unit') or '') if isinstance(spec, dict) else (spec, '')
+        number = parse_spec_number(value)
+        if number is not None:
+            yield key[:100], number, str(unit)[:20]
+
+
+class ProductSpecValue(models.Model):
+    """
+    Numeric specifications of a product, one row per spec.
+    
+    Denormalized from Product.specifications so spec range filters
+    (`spec_<key>_min/max`) are index range scans on (spec_key, numeric_value).
+    Kept in sync by Product.save(); bulk writes must call `sync()` themselves.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='spec_values',
+        verbose_name='Товар'
+    )
+    spec_key = models.CharField('Характеристика', max_length=100)
+    numeric_value = models.FloatField('Значение')
+    unit = models.CharField('Единица', max_length=20, blank=True)
+    
+    class Meta:
+        db_table = 'product_spec_values'
+        verbose_name = 'Числовая характеристика'
+        verbose_name_plural = 'Числовые характеристики'
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'spec_key'], name='product_spec_value_unique'),
+        ]
+        indexes = [
+            # Range scan returning product ids without touching the table
+            models.Index(fields=['spec_key', 'numeric_value', 'product'], name='product_spec_range_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.spec_key}={self.numeric_value}{self.unit}"
+    
+    @classmethod
+    def sync(cls, products):
+        """Replace the spec rows of saved products (two queries)."""
+        products = list(products)
+        cls.objects.filter(product__in=[p.pk for p in products]).delete()
+        cls.objects.bulk_create([
+            cls(product_id=product.pk, spec_key=key, numeric_value=number, unit=unit)
+            for product in products
+            for key, number, unit in numeric_specs(product.specifications)
+        ])
+
+
+class ProductRecommendations(models.Model):
+    """
+    Precomputed related products: the nearest neighbours of a product in
+    its category by specifications, price, brand and type, most similar
+    first. Built by `manage.py build_recommendations`
+    (see apps.catalog.recommend). `category` is the one the row was built
+    in, so a product moved out of it marks that category stale too.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recommendations',
+        verbose_name='Товар'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+',
+        verbose_name='Категория'
+    )
+    related_ids = models.JSONField('Похожие товары', default=list)
+    computed_at = models.DateTimeField('Рассчитано')
+
+    class Meta:
+        db_table = 'product_recommendations'
+        verbose_name = 'Похожие товары'
+        verbose_name_plural = 'Похожие товары'
+
+    def __str__(self):
+        return f"{self.product_id}: {self.related_ids}"
 
 
 class ProductImage(TimestampedModel):
@@ -0,0 +1,251 @@
+"""
+Pagination classes for catalog listings.
+"""
+
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import get_version, make_key
+
+
+class CountResolvingPaginator(DjangoPaginator):
+    """Django paginator that delegates `count` to a callable."""
+
+    def __init__(self, object_list, per_page, count_resolver=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_resolver = count_resolver
+
+    @cached_property
+    def count(self):
+        if self.count_resolver is None:
+            return super().count
+        return self.count_resolver(self.object_list)
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Page number pagination with cached and, for large sets, estimated counts.
+
+    The total is cached for `count_cache_timeout` seconds under the
+    normalized filter parameters (page/ordering excluded), in the
+    `count_namespace` cache namespace so data changes invalidate it. On
+    PostgreSQL, when at most `approximate_max_filters` filters are applied
+    and the planner estimates at least `approximate_threshold` rows, the
+    estimate is returned instead of running COUNT(*).
+
+    The response carries `count_is_approximate` next to `count`.
+    """
+    count_cache_timeout = 60
+    count_namespace = 'products'
+    approximate_threshold = 10_000
+    approximate_max_filters = 1
+    ignored_params = ('page', 'page_size', 'ordering', 'format', 'cursor', 'fields', 'omit')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_is_approximate = False
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, queryset, page_size):
+        return CountResolvingPaginator(queryset, page_size, count_resolver=self.resolve_count)
+
+    def get_filter_params(self):
+        """Normalized (sorted, de-duplicated) filter params of the request."""
+        params = self.request.query_params
+        return sorted(
+            (key, ','.join(sorted(set(params.getlist(key)))))
+            for key in params
+            if key not in self.ignored_params and any(params.getlist(key))
+        )
+
+    def get_count_cache_key(self, filter_params):
+        digest = hashlib.sha1(json.dumps(filter_params).encode('utf-8')).hexdigest()
+        return make_key(self.count_namespace, 'count', f"c{get_version('categories')}", digest)
+
+    def resolve_count(self, queryset):
+        filter_params = self.get_filter_params()
+        key = self.get_count_cache_key(filter_params)
+        cached = cache.get(key)
+        if cached is not None:
+            count, self.count_is_approximate = cached
+            return count
+
+        count, approximate = None, False
+        if len(filter_params) <= self.approximate_max_filters:
+            estimate = self.estimate_count(queryset)
+            if estimate is not None and estimate >= self.approximate_threshold:
+                count, approximate = estimate, True
+        if count is None:
+            count = queryset.count()
+
+        cache.set(key, (count, approximate), self.count_cache_timeout)
+        self.count_is_approximate = approximate
+        return count
+
+    def estimate_count(self, queryset):
+        """Planner row estimate on PostgreSQL, None elsewhere."""
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_is_approximate', self.count_is_approximate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_approximate'] = {'type': 'boolean'}
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a single ordering field plus `id`.
+
+    The cursor stores the ordering value and id of the boundary row, and the
+    next page is fetched with `WHERE (field, id) > (value, id)` over a
+    composite `(field, id)` index, so there is no COUNT(*) and no OFFSET:
+    page 500 costs the same as page 1.
+
+    The ordering field is taken from the queryset (as applied by
+    OrderingFilter) and must be one of `ordering_fields`.
+    """
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 24)
+    cursor_query_param = 'cursor'
+    ordering_fields = ()
+    default_ordering = '-created_at'
+    invalid_cursor_message = 'Некорректный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.field, self.descending = self.get_ordering(queryset)
+        self.model_field = queryset.model._meta.get_field(self.field)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor.get('r'))
+
+        # Walking backwards (previous page) flips the scan direction
+        descending = self.descending != reverse
+        sign = '-' if descending else ''
+        queryset = queryset.order_by(f'{sign}{self.field}', f'{sign}id')
+        if cursor is not None:
+            queryset = queryset.filter(self._seek(cursor, descending))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_ordering(self, queryset):
+        """Return (field, descending) for the queryset's first ordering term."""
+        ordering = next(
+            (term for term in queryset.query.order_by if isinstance(term, str)),
+            self.default_ordering
+        )
+        field = ordering.lstrip('-')
+        if field not in self.ordering_fields:
+            ordering = self.default_ordering
+            field = ordering.lstrip('-')
+        return field, ordering.startswith('-')
+
+    def _seek(self, cursor, descending):
+        lookup = 'lt' if descending else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': cursor['v']}) |
+            Q(**{self.field: cursor['v'], f'id__{lookup}': cursor['id']})
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(cursor, dict) or not isinstance(cursor.get('id'), int) or 'v' not in cursor:
+                raise ValueError
+            cursor['v'] = self.model_field.to_python(cursor['v'])
+            if cursor['v'] is None:
+                raise ValueError
+        except (TypeError, ValueError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, row, reverse=False):
+        # value_to_string keeps full precision (e.g. datetime microseconds)
+        cursor = {'v': self.model_field.value_to_string(row), 'id': row.pk}
+        if reverse:
+            cursor['r'] = 1
+        encoded = json.dumps(cursor, separators=(',', ':'))
+        value = base64.urlsafe_b64encode(encoded.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, value)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class ProductCursorPagination(KeysetPagination):
+    """
+    Opt-in cursor pagination for product listings (infinite scroll).
+    Enabled by passing `?cursor=` (empty for the first page).
+    """
+    ordering_fields = ('base_price_usd', 'created_at', 'name_ru', 'view_count')
+    default_ordering = '-created_at'
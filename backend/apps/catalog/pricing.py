@@ -0,0 +1,117 @@
+"""
+Request-scoped product pricing.
+
+The user's pricing tier is resolved once (one business profile lookup at
+most) and reused for every product priced during the request, instead of
+re-checking `user.business_profile` per row. Cart, compare and export code
+should price through `PricingContext.for_request()` as well.
+
+UZS amounts use the current exchange rate, also read once per context.
+
+Usage:
+    pricing = PricingContext.for_request(request)
+    price_usd, can_see = pricing.price_for(product)
+    page = pricing.price_page(products)   # {product_id: list pricing dict}
+"""
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.functional import cached_property
+
+from apps.accounts.models import BusinessProfile
+from apps.core.utils.currency import CurrencyService
+
+
+class PricingContext:
+    """Pricing rules for one user tier."""
+
+    GUEST = 'guest'
+    RETAIL = BusinessProfile.PricingTier.RETAIL.value
+    WHOLESALE = BusinessProfile.PricingTier.WHOLESALE.value
+    VIP = BusinessProfile.PricingTier.VIP.value
+
+    # Price fields tried in order; the first non-empty one is the user's price
+    PRICE_FIELDS = {
+        GUEST: ('retail_price_usd', 'base_price_usd'),
+        RETAIL: ('retail_price_usd', 'base_price_usd'),
+        WHOLESALE: ('wholesale_price_usd', 'retail_price_usd', 'base_price_usd'),
+        VIP: ('wholesale_price_usd', 'base_price_usd'),
+    }
+
+    def __init__(self, tier=GUEST):
+        self.tier = tier
+        self.is_guest = tier == self.GUEST
+        self.price_fields = self.PRICE_FIELDS[tier]
+
+    @cached_property
+    def uzs_rate(self):
+        """USD/UZS rate used for the whole request."""
+        return float(CurrencyService.get_usd_uzs_rate())
+
+    def __repr__(self):
+        return f'<PricingContext {self.tier}>'
+
+    @classmethod
+    def for_user(cls, user=None):
+        """Resolve the pricing tier of a user."""
+        if user is None or not user.is_authenticated:
+            return cls(cls.GUEST)
+        try:
+            profile = user.business_profile
+        except ObjectDoesNotExist:
+            profile = None
+        if profile is not None and profile.is_verified and profile.pricing_tier in (cls.WHOLESALE, cls.VIP):
+            return cls(profile.pricing_tier)
+        return cls(cls.RETAIL)
+
+    @classmethod
+    def for_request(cls, request=None):
+        """Pricing context of a request, resolved once and memoized on it."""
+        if request is None:
+            return cls(cls.GUEST)
+        # Store on the underlying HttpRequest so DRF views and serializers share it
+        http_request = getattr(request, '_request', request)
+        context = getattr(http_request, '_pricing_context', None)
+        if context is None:
+            context = cls.for_user(getattr(request, 'user', None))
+            http_request._pricing_context = context
+        return context
+
+    def price_for(self, product):
+        """Returns (price_usd, can_see_price) for a product."""
+        if self.is_guest and not product.show_price_to_guests:
+            return (None, False)
+        for field in self.price_fields:
+            price = getattr(product, field)
+            if price:
+                return (price, True)
+        return (product.base_price_usd, True)
+
+    def list_pricing(self, product):
+        """Pricing block of listing payloads."""
+        price_usd, can_see = self.price_for(product)
+        price = float(price_usd) if price_usd else None
+        return {
+            'show_to_guests': product.show_price_to_guests,
+            'can_see_price': can_see,
+            'price_usd': price,
+            'price_uzs': int(price * self.uzs_rate) if price else None,
+        }
+
+    def detail_pricing(self, product):
+        """Pricing block of product detail payloads."""
+        price_usd, can_see = self.price_for(product)
+        price = float(price_usd) if price_usd else None
+        return {
+            'show_to_guests': product.show_price_to_guests,
+            'can_see_price': can_see,
+            'base_usd': float(product.base_price_usd) if can_see else None,
+            'retail_usd': float(product.retail_price_usd) if product.retail_price_usd and can_see else None,
+            'wholesale_usd': float(product.wholesale_price_usd) if product.wholesale_price_usd and can_see else None,
+            'user_price_usd': price,
+            'user_price_uzs': int(price * self.uzs_rate) if price else None,
+        }
+
+    def price_page(self, products):
+        """Price a whole page in one pass. Returns {product_id: list pricing dict}."""
+        list_pricing = self.list_pricing
+        return {product.pk: list_pricing(product) for product in products}
@@ -0,0 +1,161 @@
+"""
+Related products by feature similarity.
+
+Each active product becomes a feature vector built from its numeric
+specifications (product_spec_values) and price, standardized within its
+category, plus one-hot brand and product type. Rows are L2-normalized,
+so the dot product is the cosine similarity, and the top-k neighbours
+within the category are found with NumPy one batch_size x batch_size block
+of similarities at a time, so memory stays bounded however large the
+category is. Results go to ProductRecommendations; the /related/ endpoint
+only reads them.
+
+    build_recommendations()                  # stale categories only
+    build_recommendations(category_ids=[3])  # or a given set
+"""
+
+import numpy as np
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import Product, ProductRecommendations, ProductSpecValue
+
+TOP_K = 6
+BATCH_SIZE = 1024
+
+# Relative weight of each feature group
+SPEC_WEIGHT = 1.0
+PRICE_WEIGHT = 2.0
+BRAND_WEIGHT = 0.5
+TYPE_WEIGHT = 1.0
+
+
+def get_stale_categories():
+    """
+    Categories with a product changed since (or missing from) the last build.
+    A product moved to another category makes both of them stale.
+    """
+    rows = (
+        Product.objects
+        .filter(
+            Q(is_active=True, recommendations__isnull=True) |
+            Q(updated_at__gt=F('recommendations__computed_at'))
+        )
+        .values_list('category_id', 'recommendations__category_id')
+        .distinct()
+    )
+    return {pk for row in rows for pk in row if pk is not None}
+
+
+def _one_hot(values):
+    _, inverse = np.unique(values, return_inverse=True)
+    return np.eye(inverse.max() + 1, dtype=np.float32)[inverse]
+
+
+def build_features(products, specs):
+    """
+    Normalized feature matrix for one category.
+    `products`: [(pk, brand_id, product_type, price)], `specs`: [(pk, key, value)].
+    """
+    rows = {product[0]: i for i, product in enumerate(products)}
+    keys = {key: i for i, key in enumerate(sorted({key for _, key, _ in specs}))}
+
+    numeric = np.full((len(products), len(keys) + 1), np.nan)
+    for pk, key, value in specs:
+        numeric[rows[pk], keys[key]] = value
+    numeric[:, -1] = np.log1p([float(product[3]) for product in products])
+
+    # Standardize per column; a missing spec counts as the category average
+    mean = np.nanmean(numeric, axis=0)
+    std = np.nanstd(numeric, axis=0)
+    std[std == 0] = 1
+    numeric = np.nan_to_num((numeric - mean) / std)
+    numeric[:, :-1] *= SPEC_WEIGHT
+    numeric[:, -1] *= PRICE_WEIGHT
+
+    features = np.hstack([
+        numeric,
+        _one_hot([product[1] for product in products]) * BRAND_WEIGHT,
+        _one_hot([product[2] for product in products]) * TYPE_WEIGHT,
+    ]).astype(np.float32)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return features / norms
+
+
+def nearest_neighbours(features, k=TOP_K, batch_size=BATCH_SIZE):
+    """
+    Row indices of the k most similar other rows, most similar first.
+    Each batch of rows keeps a running top-k over column blocks of the
+    same size, so at most batch_size x (batch_size + k) similarities are held.
+    """
+    n = len(features)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.intp)
+    result = np.empty((n, k), dtype=np.intp)
+    for start in range(0, n, batch_size):
+        rows = features[start:start + batch_size]
+        batch = np.arange(len(rows))
+        best = np.empty((len(rows), 0), dtype=np.float32)
+        best_ids = np.empty((len(rows), 0), dtype=np.intp)
+        for column in range(0, n, batch_size):
+            similarity = rows @ features[column:column + batch_size].T
+            own = batch + start - column
+            inside = (own >= 0) & (own < similarity.shape[1])
+            similarity[batch[inside], own[inside]] = -np.inf  # not itself
+            best = np.hstack([best, similarity])
+            ids = np.arange(column, column + similarity.shape[1])
+            best_ids = np.hstack([best_ids, np.broadcast_to(ids, similarity.shape)])
+            if best.shape[1] > k:
+                top = np.argpartition(-best, k - 1, axis=1)[:, :k]
+                best = np.take_along_axis(best, top, axis=1)
+                best_ids = np.take_along_axis(best_ids, top, axis=1)
+        order = np.argsort(-best, axis=1, kind='stable')
+        result[start:start + len(rows)] = np.take_along_axis(best_ids, order, axis=1)
+    return result
+
+
+def build_category(category_id, computed_at, k=TOP_K, batch_size=BATCH_SIZE):
+    """Recompute the recommendations of one category. Returns the product count."""
+    ProductRecommendations.objects.filter(product__category_id=category_id, product__is_active=False).delete()
+    products = list(
+        Product.objects.filter(is_active=True, category_id=category_id)
+        .order_by('pk')
+        .values_list('pk', 'brand_id', 'product_type', 'base_price_usd')
+    )
+    if not products:
+        return 0
+    specs = ProductSpecValue.objects.filter(
+        product__is_active=True, product__category_id=category_id
+    ).values_list('product_id', 'spec_key', 'numeric_value')
+
+    neighbours = nearest_neighbours(build_features(products, list(specs)), k, batch_size)
+    pks = [product[0] for product in products]
+    ProductRecommendations.objects.bulk_create(
+        [
+            ProductRecommendations(
+                product_id=pk, category_id=category_id,
+                related_ids=[pks[j] for j in row], computed_at=computed_at,
+            )
+            for pk, row in zip(pks, neighbours.tolist())
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=['category', 'related_ids', 'computed_at'],
+    )
+    return len(products)
+
+
+def build_recommendations(category_ids=None, k=TOP_K, batch_size=BATCH_SIZE):
+    """Rebuild the given (default: stale) categories. Returns the product count."""
+    # Taken before reading, so edits made during the build stay stale
+    computed_at = timezone.now()
+    if category_ids is None:
+        category_ids = get_stale_categories()
+    total = sum(build_category(pk, computed_at, k, batch_size) for pk in sorted(category_ids))
+    if total:
+        bump_version('products')
+    return total
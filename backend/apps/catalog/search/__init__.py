@@ -0,0 +1,34 @@
+"""
+Catalog search backends.
+
+`get_search_backend()` returns the backend configured in
+settings.CATALOG_SEARCH_BACKEND (dotted path), or picks one for the
+database in use: PostgreSQL full-text + trigram search in production,
+SQLite FTS5 in development, plain `icontains` as a last resort.
+`EmbeddedSearchBackend` (engine.py) is an in-process index that needs no
+database support or search service. `get_suggester()` (suggest.py) serves
+search-as-you-type suggestions from an in-memory prefix index.
+"""
+
+from .backends import (
+    BaseSearchBackend,
+    SimpleSearchBackend,
+    PostgresSearchBackend,
+    SQLiteSearchBackend,
+    get_search_backend,
+)
+from .engine import EmbeddedSearchBackend, get_engine, reset_engine
+from .suggest import get_suggester, reset_suggester
+
+__all__ = [
+    'BaseSearchBackend',
+    'SimpleSearchBackend',
+    'PostgresSearchBackend',
+    'SQLiteSearchBackend',
+    'get_search_backend',
+    'EmbeddedSearchBackend',
+    'get_engine',
+    'reset_engine',
+    'get_suggester',
+    'reset_suggester',
+]
@@ -0,0 +1,158 @@
+"""
+Search backend implementations.
+
+Every backend filters a product queryset down to matches, annotates a
+`search_rank` (higher is better) and orders by it. Categories and brands
+are small tables and are searched with `icontains` by all backends.
+"""
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .normalize import normalize_query, tokenize
+
+
+def escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class BaseSearchBackend:
+    """
+    Interface used by SearchView and ProductFilter.filter_search.
+    `limit` caps the number of results when the caller only needs the top
+    few, so backends ranking outside the database can fetch less. Backends
+    with a cap of their own set `search_truncated = True` on the returned
+    queryset when matches were left out.
+    """
+
+    def search_products(self, queryset, query, limit=None):
+        """Filter and rank a Product queryset by relevance."""
+        raise NotImplementedError
+
+    def search_categories(self, queryset, query, limit=None):
+        return queryset.filter(search_name__icontains=' '.join(normalize_query(query)))[:limit]
+
+    def search_brands(self, queryset, query, limit=None):
+        return queryset.filter(search_name__icontains=' '.join(normalize_query(query)))[:limit]
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    Substring search over the normalized search keys and the SKU.
+    Works everywhere but scans the table and cannot rank.
+    """
+
+    def search_products(self, queryset, query, limit=None):
+        key = ' '.join(normalize_query(query))
+        return queryset.filter(
+            Q(search_name__icontains=key) |
+            Q(search_description__icontains=key) |
+            Q(sku__icontains=query)
+        )[:limit]
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    PostgreSQL full-text search over the weighted `products.search_vector`
+    generated column (search_name A, SKU B, search_description C), with
+    trigram matching on search_name for typos and SKU fragments by ILIKE.
+    Indexes are created by migrations 0004-0005.
+    """
+
+    TSQUERY = "(to_tsquery('simple', %s) || to_tsquery('simple', %s))"
+
+    def search_products(self, queryset, query, limit=None):
+        words = normalize_query(query)
+        if not words:
+            return queryset.none()
+        # Normalized words match the search keys, raw words the SKU
+        tsquery_params = [
+            ' & '.join(f'{word}:*' for word in words),
+            ' & '.join(f'{word}:*' for word in tokenize(query)) or words[0],
+        ]
+        text = ' '.join(words)
+
+        match = RawSQL(
+            f'("products"."search_vector" @@ {self.TSQUERY}'
+            ' OR "products"."sku" ILIKE %s'
+            ' OR "products"."search_name" %% %s)',
+            [*tsquery_params, f'%{escape_like(query)}%', text],
+            output_field=BooleanField()
+        )
+        rank = RawSQL(
+            f'(ts_rank("products"."search_vector", {self.TSQUERY})'
+            ' + similarity("products"."search_name", %s))',
+            [*tsquery_params, text],
+            output_field=FloatField()
+        )
+        return queryset.filter(match).annotate(search_rank=rank).order_by('-search_rank', '-id')[:limit]
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 fallback for development. `products_fts` is an external
+    content table over the search keys and SKU, kept in sync by triggers
+    (migrations 0004-0005); results are ranked with bm25 weighted
+    name > SKU > description.
+    """
+
+    # products_fts columns: search_name, sku, search_description
+    BM25 = 'bm25(products_fts, 10.0, 5.0, 1.0)'
+
+    _available = {}
+
+    @classmethod
+    def is_available(cls, using='default'):
+        if using not in cls._available:
+            tables = connections[using].introspection.table_names()
+            cls._available[using] = 'products_fts' in tables
+        return cls._available[using]
+
+    @staticmethod
+    def _all_prefixes(words):
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def search_products(self, queryset, query, limit=None):
+        words = normalize_query(query)
+        if not words:
+            return queryset.none()
+        # Every word as a prefix, all required: normalized words in the
+        # search keys, or raw words in the SKU
+        match_query = '{{search_name search_description}} : ({}) OR sku : ({})'.format(
+            self._all_prefixes(words), self._all_prefixes(tokenize(query) or words)
+        )
+
+        # Join the FTS table once so bm25 is computed in the same scan as
+        # MATCH; a correlated rank subquery would re-run MATCH for every row.
+        return queryset.extra(
+            tables=['products_fts'],
+            where=['products_fts.rowid = "products"."id"', 'products_fts MATCH %s'],
+            params=[match_query],
+            select={'search_rank': f'-{self.BM25}'},
+        ).order_by('-search_rank', '-id')[:limit]
+
+
+_backends = {}
+
+
+def get_search_backend(using='default'):
+    """Backend from settings.CATALOG_SEARCH_BACKEND, or the best one for the database."""
+    path = getattr(settings, 'CATALOG_SEARCH_BACKEND', None)
+    if path:
+        if path not in _backends:
+            _backends[path] = import_string(path)()
+        return _backends[path]
+
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        backend_class = PostgresSearchBackend
+    elif vendor == 'sqlite' and SQLiteSearchBackend.is_available(using):
+        backend_class = SQLiteSearchBackend
+    else:
+        backend_class = SimpleSearchBackend
+    if backend_class not in _backends:
+        _backends[backend_class] = backend_class()
+    return _backends[backend_class]
@@ -0,0 +1,494 @@
+"""
+Embedded in-process search engine.
+
+A compact inverted index over active products, categories and brands held
+in the worker's memory, for environments without a search service:
+
+    CATALOG_SEARCH_BACKEND = 'apps.catalog.search.EmbeddedSearchBackend'
+
+Matching follows MeiliSearch defaults: every query word must match, the
+last word also matches as a prefix, and words of 5+ letters tolerate one
+typo. A document scores the best weighted field match of each word.
+
+The index is built from the database on first use, or loaded from the
+snapshot at settings.CATALOG_SEARCH_SNAPSHOT (`manage.py build_search_index`).
+Saves in this worker update it through signals; saves in other workers are
+picked up by a delta sync on `updated_at` once the catalog cache versions
+change.
+"""
+
+import bisect
+import heapq
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from array import array
+from datetime import timedelta
+from itertools import compress
+
+from django.conf import settings
+from django.db.models import Case, FloatField, Value, When
+from django.utils import timezone
+
+from ..cache import get_versions
+from ..models import Brand, Category, Product
+from .backends import BaseSearchBackend
+from .normalize import TOKEN_RE, normalize, normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Match quality multipliers
+EXACT, PREFIX, TYPO = 1.0, 0.8, 0.6
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_TERMS = 50
+MIN_TYPO_LENGTH = 5
+
+# (field, weight) per document kind; at most 8 fields (masks are bytes).
+# Values are normalized (see normalize.py); the search keys already are.
+PRODUCT_FIELDS = (('search_name', 10), ('sku', 5), ('search_description', 1))
+CATEGORY_FIELDS = (('search_name', 10),)
+BRAND_FIELDS = (('search_name', 10),)
+
+
+def one_char_deletes(term):
+    """Variants of a term with one character removed."""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def within_one_edit(a, b):
+    """True if a and b differ by at most one substitution, insertion, deletion or transposition."""
+    if a == b:
+        return True
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return False
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    if a[i + 1:] == b[i + 1:]:
+        return True
+    return i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+
+
+class InvertedIndex:
+    """
+    Inverted index of one document kind.
+
+    `postings[term]` is a pair of parallel arrays: sorted document ids and
+    a bit mask of the fields containing the term. Masks map to the best
+    field weight through lookup tables, so scoring a term runs in C
+    (dict(zip(...)), bytes.translate) rather than a Python loop.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        weights = [weight for _, weight in self.fields]
+        self.mask_weights = [
+            float(max((w for bit, w in enumerate(weights) if mask >> bit & 1), default=0))
+            for mask in range(1 << len(weights))
+        ]
+        # bytes.translate tables flagging the masks whose best weight is `weight`
+        self.level_selectors = [
+            (weight, bytes(
+                mask < len(self.mask_weights) and self.mask_weights[mask] == weight
+                for mask in range(256)
+            ))
+            for weight in sorted(set(self.mask_weights) - {0.0}, reverse=True)
+        ]
+        self.postings = {}
+        self.documents = {}  # doc id -> its terms, to undo on update/remove
+        self.terms = []      # sorted vocabulary for prefix lookups
+        self.deletes = {}    # one-deletion variant -> terms, for typo lookups
+
+    def __len__(self):
+        return len(self.documents)
+
+    @property
+    def columns(self):
+        """Model fields to read, in `values` order."""
+        return tuple(name for name, _ in self.fields)
+
+    def extend(self, rows):
+        """Index (pk, *values) rows."""
+        for doc_id, *values in rows:
+            self.add(doc_id, values)
+
+    def add(self, doc_id, values):
+        """Index (or re-index) a document from its field values."""
+        self.remove(doc_id)
+        masks = {}
+        for bit, value in enumerate(values):
+            for term in TOKEN_RE.findall(normalize(value)):
+                masks[term] = masks.get(term, 0) | 1 << bit
+
+        for term, mask in masks.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                self.postings[term] = (array('q', [doc_id]), bytearray([mask]))
+                self._add_term(term)
+            else:
+                ids, term_masks = posting
+                i = bisect.bisect_left(ids, doc_id)
+                ids.insert(i, doc_id)
+                term_masks.insert(i, mask)
+        self.documents[doc_id] = tuple(masks)
+
+    def remove(self, doc_id):
+        """Drop a document from the index (no-op if absent)."""
+        for term in self.documents.pop(doc_id, ()):
+            ids, masks = self.postings[term]
+            i = bisect.bisect_left(ids, doc_id)
+            del ids[i]
+            del masks[i]
+            if not ids:
+                del self.postings[term]
+                self._remove_term(term)
+
+    def _typo_keys(self, term):
+        if len(term) >= MIN_TYPO_LENGTH and term.isalpha():
+            return one_char_deletes(term) | {term}
+        return ()
+
+    def _add_term(self, term):
+        bisect.insort(self.terms, term)
+        for key in self._typo_keys(term):
+            self.deletes.setdefault(key, set()).add(term)
+
+    def _remove_term(self, term):
+        del self.terms[bisect.bisect_left(self.terms, term)]
+        for key in self._typo_keys(term):
+            variants = self.deletes[key]
+            variants.discard(term)
+            if not variants:
+                del self.deletes[key]
+
+    def expand(self, word, prefix=False):
+        """Index terms matching a query word -> match quality."""
+        candidates = {}
+        if word in self.postings:
+            candidates[word] = EXACT
+        if prefix and len(word) >= MIN_PREFIX_LENGTH:
+            start = bisect.bisect_left(self.terms, word)
+            for term in self.terms[start:start + MAX_PREFIX_TERMS]:
+                if not term.startswith(word):
+                    break
+                candidates.setdefault(term, PREFIX)
+        for key in self._typo_keys(word):
+            for term in self.deletes.get(key, ()):
+                if term not in candidates and within_one_edit(word, term):
+                    candidates[term] = TYPO
+        return candidates
+
+    def _weights(self, quality):
+        if quality == EXACT:
+            return self.mask_weights
+        return [weight * quality for weight in self.mask_weights]
+
+    def score_word(self, word, prefix=False):
+        """{doc_id: score} of documents matching a query word."""
+        scores = {}
+        for term, quality in self.expand(word, prefix).items():
+            ids, masks = self.postings[term]
+            term_scores = dict(zip(ids, map(self._weights(quality).__getitem__, masks)))
+            if not scores:
+                scores = term_scores
+                continue
+            for doc_id, score in term_scores.items():
+                if score > scores.get(doc_id, 0):
+                    scores[doc_id] = score
+        return scores
+
+    def search(self, query, limit):
+        """Top `limit` [(doc_id, score)], best first; ties go to the newest id."""
+        words = list(dict.fromkeys(normalize_query(query)))
+        if not words:
+            return []
+        if len(words) == 1:
+            return self._search_word(words[0], limit)
+
+        scores = None
+        for n, word in enumerate(words):
+            word_scores = self.score_word(word, prefix=n == len(words) - 1)
+            if scores is None:
+                scores = word_scores
+            else:
+                if len(word_scores) < len(scores):
+                    scores, word_scores = word_scores, scores
+                scores = {
+                    doc_id: score + word_scores[doc_id]
+                    for doc_id, score in scores.items() if doc_id in word_scores
+                }
+            if not scores:
+                return []
+        return self._top(list(scores), list(scores.values()), limit)
+
+    def _search_word(self, word, limit):
+        """
+        Single-word queries (the common case, e.g. as-you-type) rank straight
+        from the posting arrays: for each score level, a bytes.translate of
+        the masks selects the matching ids, so no per-document dict is built.
+        """
+        levels = {}
+        for term, quality in self.expand(word, prefix=True).items():
+            for weight, selector in self.level_selectors:
+                levels.setdefault(weight * quality, []).append((term, selector))
+
+        ranked, seen = [], set()
+        for level in sorted(levels, reverse=True):
+            level_ids = []
+            for term, selector in levels[level]:
+                ids, masks = self.postings[term]
+                level_ids.extend(compress(ids, masks.translate(selector)))
+            need = limit - len(ranked)
+            if len(levels[level]) == 1 and not seen:
+                best = level_ids[:-need - 1:-1]  # ids are sorted, newest last
+            else:
+                best = heapq.nlargest(need, set(level_ids).difference(seen))
+            seen.update(best)
+            ranked.extend((doc_id, level) for doc_id in best)
+            if len(ranked) >= limit:
+                break
+        return ranked
+
+    @staticmethod
+    def _top(ids, scores, limit):
+        """Best `limit` (doc_id, score) pairs, walking the few distinct score levels."""
+        ranked = []
+        for level in sorted(set(scores), reverse=True):
+            level_ids = compress(ids, map(level.__eq__, scores))
+            ranked.extend((doc_id, level) for doc_id in heapq.nlargest(limit - len(ranked), level_ids))
+            if len(ranked) >= limit:
+                break
+        return ranked
+
+
+class SearchEngine:
+    """The product, category and brand indexes of this worker."""
+
+    SNAPSHOT_FORMAT = 2
+    index_class = InvertedIndex
+    # Re-read rows saved shortly before the last sync (clock skew, long transactions)
+    SYNC_OVERLAP = timedelta(seconds=5)
+    # Keys double as catalog cache namespaces (see cache.py)
+    KINDS = {
+        'products': (Product, PRODUCT_FIELDS),
+        'categories': (Category, CATEGORY_FIELDS),
+        'brands': (Brand, BRAND_FIELDS),
+    }
+
+    def __init__(self, snapshot_path=None, sync_interval=5):
+        self.snapshot_path = snapshot_path
+        self.sync_interval = sync_interval
+        self.indexes = None
+        self.synced_at = None
+        self.versions = None
+        self._next_check = 0
+        self._lock = threading.RLock()
+
+    @property
+    def is_loaded(self):
+        return self.indexes is not None
+
+    def index(self, kind):
+        """Index of a kind, loading or syncing the engine first if needed."""
+        self.ensure_fresh()
+        return self.indexes[kind]
+
+    def search(self, kind, query, limit):
+        """
+        InvertedIndex.search() on a fresh index, under the engine lock: syncs
+        and signal updates from other threads change the index in place.
+        """
+        self.ensure_fresh()
+        with self._lock:
+            return self.indexes[kind].search(query, limit)
+
+    def ensure_fresh(self):
+        if self.indexes is None:
+            with self._lock:
+                if self.indexes is None:
+                    self.load()
+            return
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.sync_interval
+            if get_versions(self.KINDS) != self.versions:
+                self.sync()
+
+    def load(self):
+        """Load the snapshot and catch up, or build from the database."""
+        if self.snapshot_path and self._read_snapshot():
+            self.sync()
+            return
+        self.build()
+        if self.snapshot_path:
+            self.save_snapshot()
+
+    def build(self):
+        """Index every active object from scratch."""
+        with self._lock:
+            versions, started = get_versions(self.KINDS), timezone.now()
+            indexes = {}
+            for kind, (model, fields) in self.KINDS.items():
+                index = self.index_class(fields)
+                rows = model.objects.filter(is_active=True).order_by('pk')
+                index.extend(self._values(rows, index.columns))
+                indexes[kind] = index
+            self.indexes, self.synced_at, self.versions = indexes, started, versions
+            self._next_check = time.monotonic() + self.sync_interval
+
+    def sync(self):
+        """Apply rows changed since the last sync (saves from other workers)."""
+        with self._lock:
+            versions, started = get_versions(self.KINDS), timezone.now()
+            for kind, (model, _) in self.KINDS.items():
+                index = self.indexes[kind]
+                changed = model.objects.filter(
+                    updated_at__gte=self.synced_at - self.SYNC_OVERLAP
+                ).order_by()
+                for pk, is_active, *values in self._values(changed, ('is_active', *index.columns)):
+                    if is_active:
+                        index.add(pk, values)
+                    else:
+                        index.remove(pk)
+                self._reconcile(index, model)
+            self.synced_at, self.versions = started, versions
+            self._next_check = time.monotonic() + self.sync_interval
+
+    def _reconcile(self, index, model):
+        """Fix drift the delta cannot see (hard deletes, bulk activation)."""
+        active = model.objects.filter(is_active=True)
+        if active.count() == len(index):
+            return
+        ids = set(active.values_list('pk', flat=True))
+        for pk in [pk for pk in index.documents if pk not in ids]:
+            index.remove(pk)
+        missing = sorted(ids.difference(index.documents))
+        for start in range(0, len(missing), 1000):
+            rows = model.objects.filter(pk__in=missing[start:start + 1000])
+            index.extend(self._values(rows, index.columns))
+
+    @staticmethod
+    def _values(queryset, columns):
+        return queryset.values_list('pk', *columns).iterator(chunk_size=5000)
+
+    def update_instance(self, kind, instance):
+        """Re-index one saved object (called from signals)."""
+        if self.indexes is None:
+            return
+        with self._lock:
+            index = self.indexes[kind]
+            if instance.is_active:
+                index.add(instance.pk, [getattr(instance, name) for name in index.columns])
+            else:
+                index.remove(instance.pk)
+
+    def remove_instance(self, kind, pk):
+        """Drop a deleted object (called from signals)."""
+        if self.indexes is None:
+            return
+        with self._lock:
+            self.indexes[kind].remove(pk)
+
+    def save_snapshot(self, path=None):
+        """Write the indexes to disk atomically."""
+        path = path or self.snapshot_path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = {'format': self.SNAPSHOT_FORMAT, 'synced_at': self.synced_at, 'indexes': self.indexes}
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.search-snapshot-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception:
+            logger.warning('Search snapshot %s is unreadable, rebuilding', self.snapshot_path, exc_info=True)
+            return False
+        indexes = data.get('indexes') if data.get('format') == self.SNAPSHOT_FORMAT else None
+        if not indexes or any(
+            kind not in indexes or indexes[kind].fields != fields
+            for kind, (_, fields) in self.KINDS.items()
+        ):
+            return False
+        self.indexes, self.synced_at = indexes, data['synced_at']
+        return True
+
+
+_engine = None
+
+
+def get_engine():
+    """The engine of this process (loaded lazily on first search)."""
+    global _engine
+    if _engine is None:
+        _engine = SearchEngine(
+            snapshot_path=getattr(settings, 'CATALOG_SEARCH_SNAPSHOT', '') or None,
+            sync_interval=getattr(settings, 'CATALOG_SEARCH_SYNC_INTERVAL', 5),
+        )
+    return _engine
+
+
+def reset_engine():
+    """Forget the process engine (tests, settings changes)."""
+    global _engine
+    _engine = None
+
+
+class EmbeddedSearchBackend(BaseSearchBackend):
+    """
+    Search backend over the embedded engine. Only active objects are
+    indexed; at most `max_results` best matches are returned (their ids go
+    into the SQL), and the queryset gets `search_truncated = True` when
+    there were more.
+    """
+
+    max_results = 1000
+
+    def _ranked(self, queryset, kind, query, limit):
+        limit = min(limit or self.max_results, self.max_results)
+        ranked = get_engine().search(kind, query, limit + 1)
+        truncated = len(ranked) > limit
+        ranked = ranked[:limit]
+        if not ranked:
+            return queryset.none()
+        # Scores take few distinct values: one WHEN per score keeps the SQL short
+        by_score = {}
+        for pk, score in ranked:
+            by_score.setdefault(score, []).append(pk)
+        rank = Case(
+            *[When(pk__in=pks, then=Value(score)) for score, pks in by_score.items()],
+            default=Value(0.0), output_field=FloatField()
+        )
+        queryset = (
+            queryset.filter(pk__in=[pk for pk, _ in ranked])
+            .annotate(search_rank=rank)
+            .order_by('-search_rank', '-pk')
+        )
+        queryset.search_truncated = truncated
+        return queryset
+
+    def search_products(self, queryset, query, limit=None):
+        return self._ranked(queryset, 'products', query, limit)
+
+    def search_categories(self, queryset, query, limit=None):
+        return self._ranked(queryset, 'categories', query, limit)
+
+    def search_brands(self, queryset, query, limit=None):
+        return self._ranked(queryset, 'brands', query, limit)
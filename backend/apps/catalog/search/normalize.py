@@ -0,0 +1,84 @@
+"""
+Search text normalization.
+
+Folds Russian and Uzbek (Cyrillic or Latin script) and English text to one
+lowercase Latin form, so spelling variants produce the same search key:
+
+    >>> normalize('Трактор'), normalize('traktor'), normalize('Tractor')
+    ('traktor', 'traktor', 'traktor')
+    >>> normalize("O‘g‘it"), normalize("o'g'it"), normalize('Ўғит')
+    ('ogit', 'ogit', 'ogit')
+
+Steps:
+    1. lowercase;
+    2. drop apostrophes and modifier letters (o‘ oʻ o' o’ -> o, g‘ -> g);
+    3. transliterate Cyrillic to Latin, following the Uzbek Latin alphabet;
+    4. strip diacritics (é -> e, ş -> s);
+    5. fold common spelling variants (kh/x, zh/j, ts/s, q/k, c before
+       e/i/y -> s, other c -> k).
+
+Stored keys (`search_name`, `search_description` on catalog models) and
+queries go through the same function, so every step applies to both sides.
+Changing it requires recomputing stored keys (`manage.py build_search_index
+--refresh-keys`).
+"""
+
+import re
+import unicodedata
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_TOKENS = 10
+
+APOSTROPHES = dict.fromkeys(map(ord, "'`´‘’ʻʼʹ′"), None)
+
+CYRILLIC_TO_LATIN = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo',
+    'ж': 'j', 'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm',
+    'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+    'ф': 'f', 'х': 'x', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '',
+    'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya',
+    # Uzbek Cyrillic
+    'ў': 'o', 'қ': 'q', 'ғ': 'g', 'ҳ': 'h',
+})
+
+# Applied in order, on Latin text
+SPELLING_FOLDS = [
+    (re.compile(r'kh'), 'x'),
+    (re.compile(r'zh'), 'j'),
+    (re.compile(r'ts'), 's'),
+    (re.compile(r'q'), 'k'),
+    (re.compile(r'c(?=[eiy])'), 's'),
+    (re.compile(r'c(?!h)'), 'k'),
+]
+
+
+def strip_diacritics(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize(text):
+    """Fold case, script, apostrophes, diacritics and spelling variants."""
+    if not text:
+        return ''
+    text = text.lower().translate(APOSTROPHES).translate(CYRILLIC_TO_LATIN)
+    text = strip_diacritics(text)
+    for pattern, replacement in SPELLING_FOLDS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def tokenize(query):
+    """Lowercased raw words of a query (punctuation dropped), e.g. for SKUs."""
+    return TOKEN_RE.findall(query.lower())[:MAX_TOKENS]
+
+
+def build_search_key(*values):
+    """Normalized, de-duplicated words of several fields, space separated."""
+    words = TOKEN_RE.findall(normalize(' '.join(value for value in values if value)))
+    return ' '.join(dict.fromkeys(words))
+
+
+def normalize_query(query):
+    """Normalized words of a search query."""
+    return TOKEN_RE.findall(normalize(query))[:MAX_TOKENS]
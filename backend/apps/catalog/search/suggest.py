@@ -0,0 +1,186 @@
+"""
+Search-as-you-type suggestions.
+
+`GET /api/v1/search/suggest/?q=` is answered from a sorted array of prefix
+keys held in the worker's memory, without database queries. Each active
+product, category and brand gets a key for every word of its search key
+(so 'yto' and 'x1204' both reach 'Трактор YTO X1204') and, for products,
+one for the SKU. A lookup is a bisect plus a short scan.
+
+Labels are kept in every language; the suggestion is rendered in the
+request language. The index follows catalog changes like the embedded
+search engine does (see engine.py): signals in this worker, a delta sync
+on `updated_at` for saves in other workers.
+"""
+
+import bisect
+from array import array
+
+from django.conf import settings
+
+from ..models import Brand, Category, Product
+from .engine import SearchEngine
+from .normalize import TOKEN_RE, normalize, normalize_query
+
+MIN_QUERY_LENGTH = 2
+# Keys are cut to this many characters; longer queries match on the cut
+KEY_LENGTH = 32
+# Words of a name that start a key; later words are rarely typed first
+MAX_KEY_WORDS = 4
+# Keys scanned per lookup, before ranking
+SCAN_LIMIT = 200
+
+PRODUCT_FIELDS = ('search_name', 'sku', 'slug', 'name_ru', 'name_uz', 'name_en')
+CATEGORY_FIELDS = ('search_name', 'slug', 'name_ru', 'name_uz', 'name_en')
+BRAND_FIELDS = ('search_name', 'slug', 'name')
+
+
+class SuggestionIndex:
+    """
+    Prefix index of one object kind.
+
+    `keys` is sorted and `ids` holds the object id of each key. Both are
+    flat sequences, so a lookup touches only the matching slice.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.label_fields = [name for name in self.fields if name.startswith('name')]
+        self.keys = []
+        self.ids = array('q')
+        self.documents = {}  # id -> (keys, slug, labels)
+
+    def __len__(self):
+        return len(self.documents)
+
+    @property
+    def columns(self):
+        return self.fields
+
+    def _document(self, values):
+        row = dict(zip(self.fields, values))
+        words = (row['search_name'] or '').split()
+        keys = [' '.join(words[i:])[:KEY_LENGTH] for i in range(min(len(words), MAX_KEY_WORDS))]
+        if row.get('sku'):
+            keys.append(' '.join(TOKEN_RE.findall(normalize(row['sku'])))[:KEY_LENGTH])
+        labels = tuple(row[name] for name in self.label_fields)
+        return tuple(dict.fromkeys(key for key in keys if key)), row['slug'], labels
+
+    def add(self, doc_id, values):
+        """Index (or re-index) one object."""
+        self.remove(doc_id)
+        document = self._document(values)
+        for key in document[0]:
+            i = bisect.bisect_right(self.keys, key)
+            self.keys.insert(i, key)
+            self.ids.insert(i, doc_id)
+        self.documents[doc_id] = document
+
+    def extend(self, rows):
+        """Index (pk, *values) rows with a single sort (builds, reconciles)."""
+        entries = list(zip(self.keys, self.ids))
+        for doc_id, *values in rows:
+            if doc_id in self.documents:
+                self.add(doc_id, values)
+                entries = list(zip(self.keys, self.ids))
+                continue
+            document = self._document(values)
+            entries.extend((key, doc_id) for key in document[0])
+            self.documents[doc_id] = document
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ids = array('q', [doc_id for _, doc_id in entries])
+
+    def remove(self, doc_id):
+        """Drop an object (no-op if absent)."""
+        document = self.documents.pop(doc_id, None)
+        if document is None:
+            return
+        for key in document[0]:
+            i = bisect.bisect_left(self.keys, key)
+            while self.ids[i] != doc_id:
+                i += 1
+            del self.keys[i]
+            del self.ids[i]
+
+    def lookup(self, query, limit):
+        """
+        Ids of up to `limit` objects with a key starting with the query.
+        Objects whose name starts with the query come first, then shorter
+        keys.
+        """
+        prefix = ' '.join(normalize_query(query))[:KEY_LENGTH]
+        if len(prefix) < MIN_QUERY_LENGTH:
+            return []
+        start = bisect.bisect_left(self.keys, prefix)
+        candidates = {}
+        for i in range(start, min(start + SCAN_LIMIT, len(self.keys))):
+            key = self.keys[i]
+            if not key.startswith(prefix):
+                break
+            doc_id = self.ids[i]
+            rank = (key != self.documents[doc_id][0][0], len(key), doc_id)
+            candidates[doc_id] = min(rank, candidates.get(doc_id, rank))
+        return sorted(candidates, key=candidates.get)[:limit]
+
+    def label(self, doc_id, lang):
+        """Name of an object in `lang`, falling back to the first language."""
+        labels = self.documents[doc_id][2]
+        name = f'name_{lang}'
+        if name in self.label_fields:
+            label = labels[self.label_fields.index(name)]
+            if label:
+                return label
+        return labels[0]
+
+
+class Suggester(SearchEngine):
+    """Suggestion indexes of this worker (no snapshot: builds in one query per kind)."""
+
+    index_class = SuggestionIndex
+    KINDS = {
+        'categories': (Category, CATEGORY_FIELDS),
+        'brands': (Brand, BRAND_FIELDS),
+        'products': (Product, PRODUCT_FIELDS),
+    }
+    # Suggestions per kind, in response order; products fill the rest
+    LIMITS = {'categories': 3, 'brands': 3, 'products': None}
+    TYPES = {'categories': 'category', 'brands': 'brand', 'products': 'product'}
+
+    def suggest(self, query, lang='ru', limit=10):
+        """[{id, label, type, slug}] for the query, categories and brands first."""
+        self.ensure_fresh()
+        results = []
+        with self._lock:
+            for kind, kind_limit in self.LIMITS.items():
+                index = self.indexes[kind]
+                count = min(kind_limit or limit, limit - len(results))
+                if count <= 0:
+                    break
+                results.extend(
+                    {
+                        'id': doc_id,
+                        'label': index.label(doc_id, lang),
+                        'type': self.TYPES[kind],
+                        'slug': index.documents[doc_id][1],
+                    }
+                    for doc_id in index.lookup(query, count)
+                )
+        return results
+
+
+_suggester = None
+
+
+def get_suggester():
+    """The suggester of this process (built lazily on first request)."""
+    global _suggester
+    if _suggester is None:
+        _suggester = Suggester(sync_interval=getattr(settings, 'CATALOG_SEARCH_SYNC_INTERVAL', 5))
+    return _suggester
+
+
+def reset_suggester():
+    """Forget the process suggester (tests, settings changes)."""
+    global _suggester
+    _suggester = None
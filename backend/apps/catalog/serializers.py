@@ -3,10 +3,81 @@ Serializers for catalog app.
 """
 
 from rest_framework import serializers
+from apps.core.localization import LANGUAGE_CODES, Translation, get_language
+from .compare import spec_label
 from .models import Category, Brand, Product, ProductImage, ProductDocument
+from .pricing import PricingContext
 
+NAME = Translation('name')
+DESCRIPTION = Translation('description')
+SHORT_DESCRIPTION = Translation('short_description')
+FULL_DESCRIPTION = Translation('full_description')
+CATEGORY_NAME = Translation('category__name')  # on ProductListRowSerializer rows
 
-class CategorySerializer(serializers.ModelSerializer):
+
+def localized(field):
+    """Model fields of a translated field: name -> name_ru, name_uz, name_en."""
+    return tuple(f'{field}_{lang}' for lang in LANGUAGE_CODES)
+
+
+class SparseFieldsMixin:
+    """
+    Field selection from the query string: `?fields=id,slug,name` keeps the
+    listed fields, `?omit=pricing` drops fields. Applies to the top-level
+    serializer; nested ones (declared, or built with `nested_context()`)
+    stay whole. Unselected method fields are never computed.
+    
+    FIELD_SOURCES maps computed fields to the model fields they read, so
+    views can load only those columns (`get_only_fields()`).
+    """
+    FIELD_SOURCES = {}
+    
+    @staticmethod
+    def _param_names(request, param):
+        value = request.query_params.get(param, '')
+        return {name.strip() for name in value.split(',') if name.strip()}
+    
+    @classmethod
+    def select_fields(cls, request, names):
+        """The names kept for a request, in declaration order."""
+        if request is None:
+            return list(names)
+        requested = cls._param_names(request, 'fields')
+        omitted = cls._param_names(request, 'omit')
+        return [
+            name for name in names
+            if (not requested or name in requested) and name not in omitted
+        ]
+    
+    @classmethod
+    def get_only_fields(cls, request):
+        """Model fields to load for the selection, or None if every field is selected."""
+        selected = cls.select_fields(request, cls.Meta.fields)
+        if len(selected) == len(cls.Meta.fields):
+            return None
+        only = {'id'}
+        for name in selected:
+            only.update(cls.FIELD_SOURCES.get(name, (name,)))
+        return only
+    
+    def nested_context(self):
+        """Context for a serializer built inside a method field: it keeps every field."""
+        return {**self.context, 'nested': True}
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if self.context.get('nested'):
+            return fields
+        if parent is not None and not (isinstance(parent, serializers.ListSerializer) and parent.parent is None):
+            return fields
+        return {
+            name: fields[name]
+            for name in self.select_fields(self.context.get('request'), fields)
+        }
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for categories."""
     
     name = serializers.SerializerMethodField()
@@ -23,32 +94,39 @@ class CategorySerializer(serializers.ModelSerializer):
             'is_active', 'order'
         ]
     
+    FIELD_SOURCES = {
+        'name': localized('name'),
+        'description': localized('description'),
+        'children': ('parent',),
+        'product_count': (),
+    }
+    
     def get_name(self, obj):
-        lang = self._get_language()
+        lang = get_language(self.context.get('request'))
         return obj.get_name(lang)
     
     def get_description(self, obj):
-        lang = self._get_language()
-        return getattr(obj, f'description_{lang}', obj.description_ru)
+        lang = get_language(self.context.get('request'))
+        return DESCRIPTION.get(obj, lang)
     
     def get_children(self, obj):
         # Only include for top-level categories
-        if obj.parent is None:
-            children = obj.children.filter(is_active=True)
-            return CategorySerializer(children, many=True, context=self.context).data
+        if obj.parent_id is None:
+            # Prebuilt by build_category_tree() - no extra query
+            children = getattr(obj, 'tree_children', None)
+            if children is None:
+                children = obj.children.filter(is_active=True)
+            return CategorySerializer(children, many=True, context=self.nested_context()).data
         return []
     
     def get_product_count(self, obj):
+        count = getattr(obj, 'tree_product_count', None)
+        if count is not None:
+            return count
         return obj.products.filter(is_active=True).count()
-    
-    def _get_language(self):
-        request = self.context.get('request')
-        if request:
-            return request.headers.get('Accept-Language', 'ru')[:2]
-        return 'ru'
 
 
-class CategoryListSerializer(serializers.ModelSerializer):
+class CategoryListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Lightweight category serializer for listings."""
     
     name = serializers.SerializerMethodField()
@@ -57,15 +135,14 @@ class CategoryListSerializer(serializers.ModelSerializer):
         model = Category
         fields = ['id', 'slug', 'name', 'icon', 'image']
     
+    FIELD_SOURCES = {'name': localized('name')}
+    
     def get_name(self, obj):
-        request = self.context.get('request')
-        lang = 'ru'
-        if request:
-            lang = request.headers.get('Accept-Language', 'ru')[:2]
+        lang = get_language(self.context.get('request'))
         return obj.get_name(lang)
 
 
-class BrandSerializer(serializers.ModelSerializer):
+class BrandSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for brands."""
     
     description = serializers.SerializerMethodField()
@@ -79,18 +156,20 @@ class BrandSerializer(serializers.ModelSerializer):
             'product_count'
         ]
     
+    FIELD_SOURCES = {
+        'description': localized('description'),
+        'product_count': (),
+    }
+    
     def get_description(self, obj):
-        request = self.context.get('request')
-        lang = 'ru'
-        if request:
-            lang = request.headers.get('Accept-Language', 'ru')[:2]
-        return getattr(obj, f'description_{lang}', obj.description_ru)
+        lang = get_language(self.context.get('request'))
+        return DESCRIPTION.get(obj, lang)
     
     def get_product_count(self, obj):
         return obj.products.filter(is_active=True).count()
 
 
-class BrandListSerializer(serializers.ModelSerializer):
+class BrandListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Lightweight brand serializer for filters."""
     
     class Meta:
@@ -114,7 +193,22 @@ class ProductDocumentSerializer(serializers.ModelSerializer):
         fields = ['id', 'doc_type', 'title', 'file', 'language']
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductPageSerializer(serializers.ListSerializer):
+    """Prices the whole page in one pass before serializing the rows."""
+    
+    def to_representation(self, data):
+        products = data.all() if hasattr(data, 'all') else data
+        products = list(products)
+        if 'pricing' in self.child.fields:
+            pricing = PricingContext.for_request(self.context.get('request'))
+            self.child._page_pricing = pricing.price_page(products)
+        return super().to_representation(products)
+
+
+PRICING_SOURCES = ('base_price_usd', 'retail_price_usd', 'wholesale_price_usd', 'show_price_to_guests')
+
+
+class ProductListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Lightweight product serializer for listings.
     Used in catalog grids and search results.
@@ -135,37 +229,113 @@ class ProductListSerializer(serializers.ModelSerializer):
             'main_image', 'pricing',
             'stock_status', 'is_featured'
         ]
+        list_serializer_class = ProductPageSerializer
+    
+    FIELD_SOURCES = {
+        'name': localized('name'),
+        'short_description': localized('short_description'),
+        'pricing': PRICING_SOURCES,
+    }
     
     def get_name(self, obj):
-        lang = self._get_language()
+        lang = get_language(self.context.get('request'))
         return obj.get_name(lang)
     
     def get_short_description(self, obj):
-        lang = self._get_language()
-        desc = getattr(obj, f'short_description_{lang}', None)
-        return desc if desc else obj.short_description_ru
+        lang = get_language(self.context.get('request'))
+        return SHORT_DESCRIPTION.get(obj, lang)
     
     def get_pricing(self, obj):
-        request = self.context.get('request')
-        user = request.user if request else None
-        price_usd, can_see = obj.get_price_for_user(user)
-        
-        return {
-            'show_to_guests': obj.show_price_to_guests,
-            'can_see_price': can_see,
-            'price_usd': float(price_usd) if price_usd else None,
-            # Mock UZS conversion (12,800 rate)
-            'price_uzs': int(float(price_usd) * 12800) if price_usd else None,
-        }
-    
-    def _get_language(self):
-        request = self.context.get('request')
-        if request:
-            return request.headers.get('Accept-Language', 'ru')[:2]
-        return 'ru'
+        page_pricing = getattr(self, '_page_pricing', None)
+        if page_pricing and obj.pk in page_pricing:
+            return page_pricing[obj.pk]
+        return PricingContext.for_request(self.context.get('request')).list_pricing(obj)
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductListRowSerializer:
+    """
+    Fast path for ProductListSerializer with every field selected.
+
+    Reads `values_list(named=True)` rows instead of model instances and
+    builds the same payload with the language, pricing tier and URL
+    handling resolved once per request:
+
+        serializer = ProductListRowSerializer(request)
+        rows = serializer.get_rows(queryset)   # paginate like a queryset
+        data = serializer.serialize(page)
+
+    Without a request, file URLs are relative and prices are guest prices.
+    """
+    COLUMNS = (
+        'pk', 'sku', 'slug', 'product_type',
+        *localized('name'), *localized('short_description'),
+        'category_id', 'category__slug', *(f'category__{name}' for name in localized('name')),
+        'category__icon', 'category__image',
+        'brand_id', 'brand__slug', 'brand__name', 'brand__logo', 'brand__country',
+        'main_image', *PRICING_SOURCES, 'stock_status', 'is_featured',
+    )
+
+    def __init__(self, request=None, lang=None):
+        self.request = request
+        self.lang = lang or get_language(request)
+        self.pricing = PricingContext.for_request(request)
+
+    def get_rows(self, queryset, extra_columns=()):
+        """Row queryset; `extra_columns` are loaded too (e.g. for keyset pagination)."""
+        return queryset.values_list(*dict.fromkeys((*self.COLUMNS, *extra_columns)), named=True)
+
+    def _file_url(self, model, field_name):
+        """Stored file name -> URL, as DRF's ImageField renders it."""
+        storage = model._meta.get_field(field_name).storage
+        absolute = self.request.build_absolute_uri if self.request is not None else None
+
+        def url(name):
+            if not name:
+                return None
+            location = storage.url(name)
+            return absolute(location) if absolute else location
+        return url
+
+    def serialize(self, rows):
+        name = NAME.getter(self.lang)
+        short_description = SHORT_DESCRIPTION.getter(self.lang)
+        category_name = CATEGORY_NAME.getter(self.lang)
+        category_image = self._file_url(Category, 'image')
+        brand_logo = self._file_url(Brand, 'logo')
+        main_image = self._file_url(Product, 'main_image')
+        list_pricing = self.pricing.list_pricing  # reads the price columns by name
+        return [
+            {
+                'id': row.pk,
+                'sku': row.sku,
+                'slug': row.slug,
+                'product_type': row.product_type,
+                'name': name(row),
+                'short_description': short_description(row),
+                'category': {
+                    'id': row.category_id,
+                    'slug': row.category__slug,
+                    'name': category_name(row),
+                    'icon': row.category__icon,
+                    'image': category_image(row.category__image),
+                },
+                'brand': {
+                    'id': row.brand_id,
+                    'slug': row.brand__slug,
+                    'name': row.brand__name,
+                    'logo': brand_logo(row.brand__logo),
+                    'country': row.brand__country,
+                },
+                'main_image': main_image(row.main_image),
+                'pricing': list_pricing(row),
+                'stock_status': row.stock_status,
+                'is_featured': row.is_featured,
+            }
+            for row in rows
+        ]
+
+
+class ProductDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Full product serializer for detail pages.
     """
@@ -199,34 +369,30 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             'view_count', 'created_at'
         ]
     
+    FIELD_SOURCES = {
+        'name': localized('name'),
+        'short_description': localized('short_description'),
+        'full_description': localized('full_description'),
+        'images': (),
+        'documents': (),
+        'pricing': PRICING_SOURCES,
+        'specifications_formatted': ('specifications',),
+    }
+    
     def get_name(self, obj):
-        lang = self._get_language()
+        lang = get_language(self.context.get('request'))
         return obj.get_name(lang)
     
     def get_short_description(self, obj):
-        lang = self._get_language()
-        desc = getattr(obj, f'short_description_{lang}', None)
-        return desc if desc else obj.short_description_ru
+        lang = get_language(self.context.get('request'))
+        return SHORT_DESCRIPTION.get(obj, lang)
     
     def get_full_description(self, obj):
-        lang = self._get_language()
-        desc = getattr(obj, f'full_description_{lang}', None)
-        return desc if desc else obj.full_description_ru
+        lang = get_language(self.context.get('request'))
+        return FULL_DESCRIPTION.get(obj, lang)
     
     def get_pricing(self, obj):
-        request = self.context.get('request')
-        user = request.user if request else None
-        price_usd, can_see = obj.get_price_for_user(user)
-        
-        return {
-            'show_to_guests': obj.show_price_to_guests,
-            'can_see_price': can_see,
-            'base_usd': float(obj.base_price_usd) if can_see else None,
-            'retail_usd': float(obj.retail_price_usd) if obj.retail_price_usd and can_see else None,
-            'wholesale_usd': float(obj.wholesale_price_usd) if obj.wholesale_price_usd and can_see else None,
-            'user_price_usd': float(price_usd) if price_usd else None,
-            'user_price_uzs': int(float(price_usd) * 12800) if price_usd else None,
-        }
+        return PricingContext.for_request(self.context.get('request')).detail_pricing(obj)
     
     def get_specifications_formatted(self, obj):
         """Format specifications with labels in current language."""
@@ -234,21 +400,11 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         if not specs:
             return []
         
-        lang = self._get_language()
+        lang = get_language(self.context.get('request'))
         formatted = []
         
-        # Spec labels in Russian
-        labels = {
-            'horsepower': {'ru': 'Мощность', 'uz': 'Quvvat', 'en': 'Power'},
-            'engine_type': {'ru': 'Двигатель', 'uz': 'Dvigatel', 'en': 'Engine'},
-            'transmission': {'ru': 'КПП', 'uz': 'Uzatma', 'en': 'Transmission'},
-            'fuel_capacity': {'ru': 'Топливный бак', 'uz': "Yoqilg'i sig'imi", 'en': 'Fuel Tank'},
-            'working_width': {'ru': 'Рабочая ширина', 'uz': 'Ish kengligi', 'en': 'Working Width'},
-            'weight': {'ru': 'Вес', 'uz': "Og'irlik", 'en': 'Weight'},
-        }
-        
         for key, value in specs.items():
-            label = labels.get(key, {}).get(lang, key.replace('_', ' ').title())
+            label = spec_label(key, lang)
             
             if isinstance(value, dict):
                 val = value.get('value', '')
@@ -266,9 +422,4 @@ class ProductDetailSerializer(serializers.ModelSerializer):
                 })
         
         return formatted
-    
-    def _get_language(self):
-        request = self.context.get('request')
-        if request:
-            return request.headers.get('Accept-Language', 'ru')[:2]
-        return 'ru'
+    
\ No newline at end of file
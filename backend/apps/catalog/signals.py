@@ -0,0 +1,80 @@
+"""
+Signal handlers keeping catalog caches in sync with the database.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.core.models import ExchangeRate
+from apps.core.utils.currency import CurrencyService
+
+from .cache import bump_version
+from .featured import get_featured_ids, refresh_featured
+from .models import Category, Brand, Product, ProductImage, ProductDocument
+from .search.engine import get_engine
+from .search.suggest import get_suggester
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_caches(sender, **kwargs):
+    bump_version('categories')
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_caches(sender, **kwargs):
+    bump_version('products')
+
+
+@receiver([post_save, post_delete], sender=Brand)
+def invalidate_brand_caches(sender, **kwargs):
+    bump_version('brands')
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=ProductDocument)
+def invalidate_product_media_caches(sender, **kwargs):
+    bump_version('products')
+
+
+@receiver([post_save, post_delete], sender=ExchangeRate)
+def invalidate_uzs_prices(sender, **kwargs):
+    # Cached payloads carry UZS prices: publish the new rate to every worker
+    # before the new version exists, so nothing is cached under it at the old rate
+    CurrencyService.refresh()
+    bump_version('products')
+
+
+@receiver([post_save, post_delete], sender=Product)
+def refresh_featured_products(sender, instance, **kwargs):
+    # Flag changes both ways: newly featured, or no longer featured/active
+    if instance.is_featured or instance.pk in get_featured_ids('products'):
+        refresh_featured('products')
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Brand)
+def refresh_featured_payloads(sender, instance, **kwargs):
+    # Nested in the product payload; rare enough to always rebuild
+    refresh_featured('products')
+    if sender is Brand and (instance.is_featured or instance.pk in get_featured_ids('brands')):
+        refresh_featured('brands')
+
+
+SEARCH_KINDS = {Product: 'products', Category: 'categories', Brand: 'brands'}
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Brand)
+def update_search_index(sender, instance, **kwargs):
+    # No-op unless the search engine / suggester is loaded in this process
+    get_engine().update_instance(SEARCH_KINDS[sender], instance)
+    get_suggester().update_instance(SEARCH_KINDS[sender], instance)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Brand)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_engine().remove_instance(SEARCH_KINDS[sender], instance.pk)
+    get_suggester().remove_instance(SEARCH_KINDS[sender], instance.pk)
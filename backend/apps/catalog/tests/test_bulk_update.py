@@ -0,0 +1,100 @@
+"""
+Tests for the batch price/stock update endpoint.
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from apps.catalog.cache import get_version
+from apps.catalog.models import Product, Category, Brand
+from apps.core.utils.currency import CurrencyService
+
+User = get_user_model()
+
+URL = '/api/v1/products/bulk-update/'
+
+
+class BulkUpdateTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        brand = Brand.objects.create(name="YTO", slug="yto", country="Китай")
+        for n in range(3):
+            Product.objects.create(
+                sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Трактор {n}", category=category, brand=brand,
+                base_price_usd=1000, retail_price_usd=1200, stock_quantity=5,
+                show_price_to_guests=True, is_featured=n == 0,
+            )
+        cls.manager = User.objects.create_user(username='manager', password='secret123')
+        cls.manager.user_permissions.add(Permission.objects.get(codename='change_product'))
+
+    def setUp(self):
+        cache.clear()
+        CurrencyService.get_usd_uzs_rate()  # warm the rate cache
+        self.client.force_authenticate(self.manager)
+
+    def test_permissions(self):
+        self.client.force_authenticate(User.objects.create_user(username='farmer', password='secret123'))
+        self.assertEqual(self.client.post(URL, {'rows': []}, format='json').status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(URL, {'rows': []}, format='json').status_code, 401)
+
+    def test_diff_and_single_version_bump(self):
+        version = get_version('products')
+        rows = [
+            {'sku': 'SKU-0', 'base_price_usd': '950.5', 'stock_quantity': 0, 'stock_status': 'out_of_stock'},
+            {'sku': 'SKU-1', 'base_price_usd': 1000, 'retail_price_usd': None},
+            {'sku': 'SKU-2', 'base_price_usd': '1000.00'},
+            {'sku': 'MISSING', 'stock_quantity': 1},
+        ]
+        with self.assertNumQueries(6):  # 2 permission lookups, savepoint, select, update, release
+            response = self.client.post(URL, {'rows': rows}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(response.data['unchanged'], 1)
+        self.assertEqual(response.data['not_found'], ['MISSING'])
+        self.assertEqual(response.data['changes'][0], {'sku': 'SKU-0', 'changes': {
+            'base_price_usd': {'old': Decimal('1000.00'), 'new': Decimal('950.50')},
+            'stock_quantity': {'old': 5, 'new': 0},
+            'stock_status': {'old': 'in_stock', 'new': 'out_of_stock'},
+        }})
+        self.assertEqual(response.data['changes'][1]['changes'], {'retail_price_usd': {'old': Decimal('1200.00'), 'new': None}})
+        self.assertEqual(get_version('products'), version + 1)
+
+        product = Product.objects.get(sku='SKU-0')
+        self.assertEqual((product.base_price_usd, product.stock_status), (Decimal('950.50'), 'out_of_stock'))
+        self.assertIsNone(Product.objects.get(sku='SKU-1').retail_price_usd)
+        self.assertGreater(product.updated_at, Product.objects.get(sku='SKU-2').updated_at)
+
+    def test_featured_payload_gets_new_prices(self):
+        call_command('warm_catalog_cache', stdout=StringIO())
+        self.client.post(URL, [{'sku': 'SKU-0', 'retail_price_usd': '1100'}], format='json')
+        self.client.force_authenticate(None)
+        featured = self.client.get('/api/v1/products/featured/').data
+        self.assertEqual(featured[0]['pricing']['price_usd'], 1100.0)
+
+    def test_invalid_batch_writes_nothing(self):
+        version = get_version('products')
+        rows = [
+            {'sku': 'SKU-0', 'base_price_usd': '900'},
+            {'sku': 'SKU-1', 'base_price_usd': 'abc'},
+            {'sku': 'SKU-0', 'stock_quantity': 1},
+            {'sku': 'SKU-2', 'name_ru': 'x'},
+            {'base_price_usd': '1'},
+        ]
+        response = self.client.post(URL, {'rows': rows}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3, 4])
+        self.assertEqual(Product.objects.get(sku='SKU-0').base_price_usd, Decimal('1000.00'))
+        self.assertEqual(get_version('products'), version)
+
+    def test_dry_run(self):
+        response = self.client.post(URL, {'rows': [{'sku': 'SKU-0', 'stock_quantity': 9}], 'dry_run': True}, format='json')
+        self.assertEqual((response.data['updated'], response.data['dry_run']), (1, True))
+        self.assertEqual(Product.objects.get(sku='SKU-0').stock_quantity, 5)
@@ -0,0 +1,64 @@
+"""
+Tests for cached / approximate listing counts.
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.pagination import CachedCountPagination
+
+
+class CachedCountPaginationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        self.brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+        for n in range(30):
+            self._product(n, stock_status='in_stock' if n % 2 else 'pre_order')
+
+    def _product(self, n, **kwargs):
+        return Product.objects.create(
+            sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Трактор {n}",
+            category=self.category, brand=self.brand, base_price_usd=1000, **kwargs
+        )
+
+    def test_count_cached_per_filter_set(self):
+        with self.assertNumQueries(2):  # COUNT + page
+            response = self.client.get('/api/v1/products/', {'stock_status': 'in_stock'})
+        self.assertEqual(response.data['count'], 15)
+        self.assertFalse(response.data['count_is_approximate'])
+
+        # Same filters, explicit page and ordering: count comes from cache
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/api/v1/products/', {'stock_status': 'in_stock', 'page': 1, 'ordering': 'name_ru'}
+            )
+        self.assertEqual(response.data['count'], 15)
+
+        response = self.client.get('/api/v1/products/', {'stock_status': 'pre_order'})
+        self.assertEqual(response.data['count'], 15)
+
+    def test_count_invalidated_on_product_change(self):
+        self.assertEqual(self.client.get('/api/v1/products/').data['count'], 30)
+        self._product(99)
+        self.assertEqual(self.client.get('/api/v1/products/').data['count'], 31)
+
+    def test_planner_estimate_for_large_lightly_filtered_sets(self):
+        with mock.patch.object(CachedCountPagination, 'estimate_count', return_value=120_000):
+            response = self.client.get('/api/v1/products/', {'brand': 'yto'})
+            self.assertEqual(response.data['count'], 120_000)
+            self.assertTrue(response.data['count_is_approximate'])
+
+            # Heavier filtering always counts exactly
+            response = self.client.get('/api/v1/products/', {'brand': 'yto', 'stock_status': 'in_stock'})
+            self.assertEqual(response.data['count'], 15)
+            self.assertFalse(response.data['count_is_approximate'])
+
+    def test_small_estimate_counts_exactly(self):
+        with mock.patch.object(CachedCountPagination, 'estimate_count', return_value=40):
+            response = self.client.get('/api/v1/products/')
+        self.assertEqual(response.data['count'], 30)
+        self.assertFalse(response.data['count_is_approximate'])
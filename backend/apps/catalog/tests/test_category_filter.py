@@ -0,0 +1,58 @@
+"""
+Tests for subtree-aware category filtering.
+"""
+
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.tree import get_subtree_ids
+
+
+class CategorySubtreeFilterTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+        self.machinery = Category.objects.create(name_ru="Техника", slug="machinery")
+        self.tractors = Category.objects.create(name_ru="Тракторы", slug="tractors", parent=self.machinery)
+        self.wheeled = Category.objects.create(name_ru="Колёсные", slug="wheeled", parent=self.tractors)
+        self.parts = Category.objects.create(name_ru="Запчасти", slug="parts")
+
+        self.wheeled_tractor = self._product("wheeled-1", self.wheeled)
+        self.tractor = self._product("tractor-1", self.tractors)
+        self.part = self._product("part-1", self.parts)
+
+    def _product(self, slug, category):
+        return Product.objects.create(
+            sku=slug.upper(), slug=slug, name_ru=slug,
+            category=category, brand=self.brand, base_price_usd=100,
+        )
+
+    def _slugs(self, **params):
+        response = self.client.get('/api/v1/products/', params)
+        return {item['slug'] for item in response.data['results']}
+
+    def test_parent_category_matches_subtree(self):
+        self.assertEqual(self._slugs(category='machinery'), {'wheeled-1', 'tractor-1'})
+        self.assertEqual(self._slugs(category='wheeled'), {'wheeled-1'})
+        self.assertEqual(self._slugs(category='missing'), set())
+
+    def test_multiple_categories(self):
+        self.assertEqual(
+            self._slugs(categories='tractors,parts'),
+            {'wheeled-1', 'tractor-1', 'part-1'}
+        )
+
+    def test_subtree_ids_are_cached(self):
+        get_subtree_ids(['machinery'])
+        with self.assertNumQueries(0):
+            ids = get_subtree_ids(['machinery'])
+        self.assertEqual(set(ids), {self.machinery.pk, self.tractors.pk, self.wheeled.pk})
+
+    def test_cache_invalidated_on_move(self):
+        get_subtree_ids(['machinery'])
+        self.wheeled.parent = self.parts
+        self.wheeled.save()
+
+        self.assertEqual(set(get_subtree_ids(['machinery'])), {self.machinery.pk, self.tractors.pk})
+        self.assertEqual(self._slugs(category='parts'), {'wheeled-1', 'part-1'})
@@ -0,0 +1,75 @@
+"""
+Tests for the materialized category path.
+"""
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from apps.catalog.models import Category
+
+
+class CategoryPathTests(TestCase):
+
+    def setUp(self):
+        self.machinery = Category.objects.create(name_ru="Техника", slug="machinery")
+        self.tractors = Category.objects.create(name_ru="Тракторы", slug="tractors", parent=self.machinery)
+        self.wheeled = Category.objects.create(name_ru="Колёсные", slug="wheeled", parent=self.tractors)
+        self.mini = Category.objects.create(name_ru="Мини", slug="mini", parent=self.wheeled)
+        self.parts = Category.objects.create(name_ru="Запчасти", slug="parts")
+
+    def test_path_and_depth(self):
+        self.assertEqual(self.machinery.path, f"/{self.machinery.pk}/")
+        self.assertEqual(
+            self.mini.path,
+            f"/{self.machinery.pk}/{self.tractors.pk}/{self.wheeled.pk}/{self.mini.pk}/"
+        )
+        self.assertEqual(self.mini.depth, 3)
+        self.assertEqual(self.mini.ancestor_ids, [self.machinery.pk, self.tractors.pk, self.wheeled.pk])
+
+    def test_full_path_without_queries(self):
+        mini = Category.objects.get(pk=self.mini.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(mini.full_path, "Техника / Тракторы / Колёсные / Мини")
+
+    def test_ancestors_and_descendants(self):
+        with self.assertNumQueries(1):
+            ancestors = list(self.mini.get_ancestors())
+        self.assertEqual(ancestors, [self.machinery, self.tractors, self.wheeled])
+
+        with self.assertNumQueries(1):
+            descendants = set(self.machinery.get_descendants())
+        self.assertEqual(descendants, {self.tractors, self.wheeled, self.mini})
+        self.assertIn(self.tractors, self.tractors.get_descendants(include_self=True))
+
+    def test_move_rewrites_subtree(self):
+        self.tractors.parent = self.parts
+        self.tractors.save()
+
+        mini = Category.objects.get(pk=self.mini.pk)
+        self.assertEqual(mini.full_path, "Запчасти / Тракторы / Колёсные / Мини")
+        self.assertEqual(mini.path, f"/{self.parts.pk}/{self.tractors.pk}/{self.wheeled.pk}/{self.mini.pk}/")
+        self.assertEqual(mini.depth, 3)
+        self.assertEqual(set(self.machinery.get_descendants()), set())
+
+        self.wheeled.refresh_from_db()
+        self.wheeled.parent = None
+        self.wheeled.save()
+        mini.refresh_from_db()
+        self.assertEqual(mini.full_path, "Колёсные / Мини")
+        self.assertEqual(mini.depth, 1)
+
+    def test_rename_rewrites_descendant_names(self):
+        self.machinery.name_ru = "Сельхозтехника"
+        self.machinery.save()
+
+        self.mini.refresh_from_db()
+        self.assertEqual(self.mini.full_path, "Сельхозтехника / Тракторы / Колёсные / Мини")
+        self.assertEqual(self.parts.full_path, "Запчасти")
+
+    def test_cycle_rejected(self):
+        self.machinery.parent = self.mini
+        with self.assertRaises(ValidationError):
+            self.machinery.save()
+
+    def test_delete_removes_subtree(self):
+        self.tractors.delete()
+        self.assertEqual(set(self.machinery.get_descendants()), set())
@@ -0,0 +1,78 @@
+"""
+Tests for batched category tree rendering.
+"""
+
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.tree import build_category_tree
+
+
+class CategoryTreeTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+
+        # 20 top-level categories x 15 children = 320 categories
+        roots = Category.objects.bulk_create([
+            Category(name_ru=f"Раздел {i}", slug=f"root-{i}", order=i)
+            for i in range(20)
+        ])
+        children = Category.objects.bulk_create([
+            Category(name_ru=f"Подраздел {i}-{j}", slug=f"child-{i}-{j}", parent=root, order=j)
+            for i, root in enumerate(roots)
+            for j in range(15)
+        ])
+        Category.objects.create(
+            name_ru="Скрытый", slug="hidden", parent=roots[0], is_active=False
+        )
+
+        products = []
+        for n, child in enumerate(children[:40]):
+            products.append(Product(
+                sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Товар {n}",
+                category=child, brand=cls.brand, base_price_usd=100,
+            ))
+        products.append(Product(
+            sku="SKU-ROOT", slug="product-root", name_ru="Товар в разделе",
+            category=roots[0], brand=cls.brand, base_price_usd=100,
+        ))
+        products.append(Product(
+            sku="SKU-OFF", slug="product-off", name_ru="Снят с продажи",
+            category=roots[0], brand=cls.brand, base_price_usd=100, is_active=False,
+        ))
+        Product.objects.bulk_create(products)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_build_category_tree_constant_queries(self):
+        with self.assertNumQueries(2):
+            roots = build_category_tree()
+
+        self.assertEqual(len(roots), 20)
+        self.assertEqual([c.slug for c in roots[0].tree_children][:2], ['child-0-0', 'child-0-1'])
+        self.assertEqual(len(roots[0].tree_children), 15)
+        self.assertEqual(roots[0].tree_product_count, 1)
+        self.assertEqual(roots[0].tree_children[0].tree_product_count, 1)
+
+    def test_list_endpoint_constant_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/categories/', {'page': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 20)
+        first = response.data['results'][0]
+        self.assertEqual(first['slug'], 'root-0')
+        self.assertEqual(first['product_count'], 1)
+        self.assertEqual(len(first['children']), 15)
+        self.assertEqual(first['children'][0]['product_count'], 1)
+        self.assertEqual(first['children'][0]['children'], [])
+
+    def test_list_matches_per_object_serialization(self):
+        response = self.client.get('/api/v1/categories/')
+        detail = self.client.get('/api/v1/categories/root-1/')
+
+        self.assertEqual(response.data['results'][1], detail.data)
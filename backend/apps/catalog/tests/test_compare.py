@@ -0,0 +1,101 @@
+"""
+Tests for the product comparison endpoint and spec matrix.
+"""
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+from apps.catalog.compare import build_spec_matrix
+from apps.catalog.models import Product, Category, Brand
+from apps.core.utils.currency import CurrencyService
+
+
+class SpecMatrixTests(SimpleTestCase):
+
+    def test_aligned_rows(self):
+        rows = build_spec_matrix([
+            {'horsepower': {'value': 80, 'unit': 'кВт'}, 'engine_type': {'value': 'Дизель'}, 'weight': {'value': 4.5, 'unit': 'т'}},
+            {'horsepower': {'value': '108,77', 'unit': 'hp'}, 'engine_type': 'дизель', 'working_width': {'value': 250, 'unit': 'см'}},
+            {'horsepower': 120, 'weight': {'value': 4500, 'unit': 'кг'}},
+        ], lang='en')
+        by_key = {row['key']: row for row in rows}
+        self.assertEqual([row['key'] for row in rows], ['horsepower', 'engine_type', 'weight', 'working_width'])
+
+        horsepower = by_key['horsepower']
+        self.assertEqual((horsepower['label'], horsepower['unit']), ('Power', 'кВт'))
+        self.assertEqual(horsepower['values'], [80, 80.0003, 120])
+        self.assertTrue(horsepower['differs'])
+
+        self.assertEqual(by_key['engine_type']['values'], ['Дизель', 'дизель', None])
+        self.assertEqual(by_key['weight']['values'], [4.5, None, 4.5])
+        self.assertEqual(by_key['working_width']['values'], [None, 250, None])
+
+    def test_incompatible_units_and_equal_rows(self):
+        rows = build_spec_matrix([
+            {'fuel_capacity': {'value': 200, 'unit': 'л'}, 'transmission': 'Механика'},
+            {'fuel_capacity': {'value': 200, 'unit': 'кг'}, 'transmission': 'механика'},
+        ])
+        self.assertEqual(rows[0]['values'], ['200 л', '200 кг'])
+        self.assertEqual(rows[0]['unit'], '')
+        self.assertTrue(rows[0]['differs'])
+        self.assertFalse(rows[1]['differs'])
+
+
+class CompareEndpointTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name_ru="Тракторы", name_en="Tractors", slug="tractors")
+        brand = Brand.objects.create(name="YTO", slug="yto", country="Китай")
+        cls.products = [
+            Product.objects.create(
+                sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Трактор {n}",
+                category=category, brand=brand, base_price_usd=1000 + n,
+                specifications={'horsepower': {'value': 50 * (n + 1), 'unit': 'л.с.'}},
+            )
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        CurrencyService.get_usd_uzs_rate()  # warm the rate cache
+
+    def test_matrix_in_requested_order(self):
+        first, second, third = self.products
+        ids = f'{third.pk},{first.pk}'
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/products/compare/', {'ids': ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['slug'] for p in response.data['products']], ['product-2', 'product-0'])
+        self.assertIn('pricing', response.data['products'][0])
+        self.assertEqual(response.data['specs'][0]['values'], [150, 50])
+
+        # Same id set in another order comes from the cache
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/products/compare/', {'ids': f'{first.pk},{third.pk}'})
+        self.assertEqual([p['slug'] for p in response.data['products']], ['product-0', 'product-2'])
+        self.assertEqual(response.data['specs'][0]['values'], [50, 150])
+
+    def test_language_and_changes(self):
+        ids = ','.join(str(p.pk) for p in self.products)
+        response = self.client.get('/api/v1/products/compare/', {'ids': ids}, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual(response.data['specs'][0]['label'], 'Power')
+
+        product = self.products[1]
+        product.specifications = {'horsepower': {'value': 75, 'unit': 'кВт'}}
+        product.save()
+        response = self.client.get('/api/v1/products/compare/', {'ids': ids})
+        self.assertEqual(response.data['specs'][0]['label'], 'Мощность')
+        self.assertEqual(response.data['specs'][0]['values'], [50, 101.9715, 150])
+
+    def test_cached_per_host(self):
+        Product.objects.filter(pk=self.products[0].pk).update(main_image='products/p.jpg')
+        ids = f'{self.products[0].pk},{self.products[1].pk}'
+        for host in ('api.example.com', 'admin.example.com'):
+            response = self.client.get('/api/v1/products/compare/', {'ids': ids}, HTTP_HOST=host)
+            self.assertEqual(response.data['products'][0]['main_image'], f'http://{host}/media/products/p.jpg')
+
+    def test_invalid_ids(self):
+        self.assertEqual(self.client.get('/api/v1/products/compare/').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/products/compare/', {'ids': 'a,b'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/products/compare/', {'ids': '1,2,3,4,5'}).status_code, 400)
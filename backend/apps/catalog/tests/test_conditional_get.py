@@ -0,0 +1,115 @@
+"""
+Tests for ETag / Last-Modified conditional GETs on catalog endpoints.
+"""
+
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+from apps.catalog.cache import MODIFIED_KEY, bump_version, get_last_modified
+from apps.catalog.models import Product, Category, Brand
+
+User = get_user_model()
+
+
+class ConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name_ru="Тракторы", name_en="Tractors", slug="tractors")
+        self.brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+        self.product = Product.objects.create(
+            sku="SKU-1", slug="product-1", name_ru="Трактор",
+            category=self.category, brand=self.brand, base_price_usd=1000,
+        )
+        # Last-Modified is only sent once the second of the last change is over
+        for namespace in ('products', 'categories', 'brands'):
+            cache.set(MODIFIED_KEY.format(namespace=namespace), time.time() - 60, timeout=None)
+
+    def test_not_modified_without_queries(self):
+        urls = [
+            '/api/v1/products/', '/api/v1/products/product-1/', '/api/v1/products/featured/',
+            '/api/v1/products/product-1/related/', '/api/v1/products/compare/?ids=1',
+            '/api/v1/categories/', '/api/v1/categories/tractors/', '/api/v1/categories/flat/',
+            '/api/v1/brands/', '/api/v1/brands/yto/', '/api/v1/brands/featured/',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                self.assertIn('Last-Modified', first)
+                with self.assertNumQueries(0):
+                    second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+                self.assertEqual(second.status_code, 304)
+                self.assertEqual(second['ETag'], first['ETag'])
+                self.assertFalse(second.content)
+
+    def test_if_modified_since(self):
+        first = self.client.get('/api/v1/categories/flat/')
+        second = self.client.get('/api/v1/categories/flat/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_change_in_the_same_second_is_not_modified(self):
+        def get(now, **headers):
+            with mock.patch('apps.catalog.cache.time.time', return_value=now):
+                return self.client.get('/api/v1/categories/flat/', **headers)
+
+        cache.clear()
+        with mock.patch('apps.catalog.cache.time.time', return_value=1000.3):
+            bump_version('categories')
+        self.assertNotIn('Last-Modified', get(1000.5))
+        first = get(1001.2)
+        self.assertEqual(first['Last-Modified'], http_date(1000))
+
+        with mock.patch('apps.catalog.cache.time.time', return_value=1001.5):
+            bump_version('categories')
+        second = get(1001.7, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotIn('Last-Modified', second)
+        third = get(1002.1, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third['Last-Modified'], http_date(1001))
+
+    def test_burst_of_changes_stays_in_the_past(self):
+        for _ in range(200):
+            bump_version('products')
+        self.assertLessEqual(get_last_modified(['products']), time.time())
+
+    def test_etag_changes_with_catalog_data(self):
+        etag = self.client.get('/api/v1/products/product-1/')['ETag']
+
+        self.brand.name = "YTO Group"
+        self.brand.save()
+        response = self.client.get('/api/v1/products/product-1/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['brand']['name'], "YTO Group")
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_varies_by_language_and_pricing_tier(self):
+        ru = self.client.get('/api/v1/categories/flat/')
+        en = self.client.get('/api/v1/categories/flat/', HTTP_ACCEPT_LANGUAGE='en')
+        self.assertNotEqual(ru['ETag'], en['ETag'])
+        self.assertEqual(
+            self.client.get('/api/v1/categories/flat/', HTTP_ACCEPT_LANGUAGE='en', HTTP_IF_NONE_MATCH=ru['ETag']).status_code,
+            200
+        )
+        self.assertIn('Accept-Language', ru['Vary'])
+
+        guest = self.client.get('/api/v1/products/')
+        user = User.objects.create_user(username='farmer', password='secret123')
+        self.client.force_authenticate(user)
+        member = self.client.get('/api/v1/products/', HTTP_IF_NONE_MATCH=guest['ETag'])
+        self.assertEqual(member.status_code, 200)
+        self.assertNotEqual(member['ETag'], guest['ETag'])
+
+    def test_cache_flush_never_yields_stale_304(self):
+        etag = self.client.get('/api/v1/brands/')['ETag']
+        cache.clear()
+        # Versions restart at 1, but the change time is new
+        Brand.objects.filter(pk=self.brand.pk).update(name="YTO Group")
+        response = self.client.get('/api/v1/brands/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['name'], "YTO Group")
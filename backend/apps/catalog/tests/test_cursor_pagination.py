@@ -0,0 +1,91 @@
+"""
+Tests for opt-in keyset pagination of product listings.
+"""
+
+import base64
+import json
+
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.pagination import ProductCursorPagination
+
+
+class ProductCursorPaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+        for n in range(30):
+            Product.objects.create(
+                sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Трактор {n % 7}",
+                category=category, brand=brand,
+                base_price_usd=1000 + (n % 4) * 250,  # lots of ties
+                view_count=n % 3,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.page_size = ProductCursorPagination.page_size
+        ProductCursorPagination.page_size = 7
+
+    def tearDown(self):
+        ProductCursorPagination.page_size = self.page_size
+
+    def _walk(self, ordering):
+        """Follow `next` links from the first page, return slugs and pages."""
+        url = '/api/v1/products/'
+        params = {'cursor': '', 'ordering': ordering}
+        pages = []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            pages.append(response.data)
+            url, params = response.data['next'], None
+        slugs = [item['slug'] for page in pages for item in page['results']]
+        return slugs, pages
+
+    def test_walk_matches_offset_ordering_for_every_field(self):
+        for ordering in ProductCursorPagination.ordering_fields:
+            for direction in ('', '-'):
+                with self.subTest(ordering=direction + ordering):
+                    slugs, pages = self._walk(direction + ordering)
+                    expected = list(
+                        Product.objects.order_by(direction + ordering, direction + 'id')
+                        .values_list('slug', flat=True)
+                    )
+                    self.assertEqual(slugs, expected)
+                    self.assertEqual(len(pages), 5)
+                    self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_link_returns_previous_page(self):
+        slugs, pages = self._walk('-base_price_usd')
+        response = self.client.get(pages[2]['previous'])
+        self.assertEqual(response.data['results'], pages[1]['results'])
+        response = self.client.get(pages[1]['previous'])
+        self.assertEqual(response.data['results'], pages[0]['results'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_cursor_page_costs_single_query(self):
+        _, pages = self._walk('name_ru')
+        cache.clear()  # bypass the anonymous response cache
+        with self.assertNumQueries(1):
+            self.client.get(pages[3]['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/v1/products/', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        for ordering, value in (('-created_at', 'abc'), ('base_price_usd', 'abc'), ('name_ru', None), ('-created_at', {})):
+            with self.subTest(ordering=ordering, value=value):
+                cursor = base64.urlsafe_b64encode(json.dumps({'v': value, 'id': 1}).encode()).decode()
+                response = self.client.get('/api/v1/products/', {'cursor': cursor, 'ordering': ordering})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get('/api/v1/products/')
+        self.assertEqual(response.data['count'], 30)
@@ -0,0 +1,95 @@
+"""
+Tests for the streaming catalog export.
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.test import APITestCase
+from apps.accounts.models import BusinessProfile
+from apps.catalog.models import Product, Category, Brand
+from apps.core.utils.currency import CurrencyService
+
+User = get_user_model()
+
+
+class CatalogExportTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        tractors = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        pumps = Category.objects.create(name_ru="Насосы", slug="pumps")
+        brand = Brand.objects.create(name="YTO", slug="yto", country="Китай")
+        for n in range(5):
+            Product.objects.create(
+                sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Трактор {n}", name_en=f"Tractor {n}" if n else "",
+                category=tractors if n < 4 else pumps, brand=brand, main_image="products/p.jpg" if n == 1 else "",
+                base_price_usd=1000, retail_price_usd=1200, wholesale_price_usd=900 if n % 2 else None,
+                stock_quantity=n, is_active=n != 3,
+            )
+        cls.dealer = User.objects.create_user(username='dealer', password='secret123')
+        BusinessProfile.objects.create(
+            user=cls.dealer, inn='100000001', company_name='Dealer', legal_address='Ташкент',
+            pricing_tier='wholesale', verified_at=timezone.now(),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.rate = CurrencyService.get_usd_uzs_rate()
+
+    def export(self, file_format, **params):
+        response = self.client.get(f'/api/v1/products/export/{file_format}/', params, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'filename="uzagro-products.{file_format}"', response['Content-Disposition'])
+        return response
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.client.get('/api/v1/products/export/csv/').status_code, 401)
+
+    def test_csv_with_tier_prices_and_filters(self):
+        self.client.force_authenticate(self.dealer)
+        response = self.export('csv', category='tractors')
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual([row['sku'] for row in rows], ['SKU-2', 'SKU-1', 'SKU-0'])
+        self.assertEqual(rows[1]['name'], 'Tractor 1')
+        self.assertEqual(rows[2]['name'], 'Трактор 0')  # no English name
+        self.assertEqual((rows[1]['price_usd'], rows[0]['price_usd']), ('900.0', '1200.0'))
+        self.assertEqual(rows[1]['price_uzs'], str(int(900 * float(self.rate))))
+        self.assertEqual(rows[1]['main_image'], 'http://testserver/media/products/p.jpg')
+
+    def test_ndjson_and_xlsx(self):
+        self.client.force_authenticate(User.objects.create_user(username='farmer', password='secret123'))
+        response = self.export('ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[0]['sku'], 'SKU-4')
+        self.assertEqual(lines[0]['price_usd'], 1200.0)
+
+        response = self.export('xlsx')
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0][:3], ('sku', 'slug', 'name'))
+        self.assertEqual([row[0] for row in rows[1:]], ['SKU-4', 'SKU-2', 'SKU-1', 'SKU-0'])
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('export_catalog', format='ndjson', filter=['category=pumps'], user='dealer', stdout=out)
+        self.assertEqual([json.loads(line)['sku'] for line in out.getvalue().splitlines()], ['SKU-4'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'products.csv')
+            call_command('export_catalog', output=path, lang='en')
+            with open(path, encoding='utf-8-sig') as file:
+                rows = list(csv.DictReader(file))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]['name'], 'Tractor 4')
+        self.assertEqual(rows[0]['price_usd'], '')  # guest prices: hidden by default
@@ -0,0 +1,91 @@
+"""
+Tests for the product facets endpoint.
+"""
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from apps.catalog.models import Product, Category, Brand
+
+
+class FacetsTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tractors = Category.objects.create(name_ru="Тракторы", name_en="Tractors", slug="tractors")
+        cls.parts = Category.objects.create(name_ru="Запчасти", slug="parts")
+        cls.yto = Brand.objects.create(name="YTO", slug="yto", country="Китай")
+        cls.claas = Brand.objects.create(name="CLAAS", slug="claas", country="Германия")
+        rows = [
+            ('t1', cls.tractors, cls.yto, 'machinery', 'in_stock', 10000, 80),
+            ('t2', cls.tractors, cls.yto, 'machinery', 'pre_order', 20000, 120),
+            ('t3', cls.tractors, cls.claas, 'machinery', 'in_stock', 110000, 240),
+            ('p1', cls.parts, cls.claas, 'spare_part', 'in_stock', 100, None),
+        ]
+        for slug, category, brand, product_type, stock_status, price, horsepower in rows:
+            Product.objects.create(
+                sku=slug, slug=slug, name_ru=f"Товар {slug}", category=category, brand=brand,
+                product_type=product_type, stock_status=stock_status, base_price_usd=price,
+                specifications={'horsepower': {'value': horsepower, 'unit': 'л.с.'}} if horsepower else {},
+            )
+        Product.objects.create(
+            sku='off', slug='off', name_ru="Скрыт", category=cls.tractors, brand=cls.yto,
+            base_price_usd=5, is_active=False,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_all_facets_in_few_queries(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/products/facets/', HTTP_ACCEPT_LANGUAGE='en')
+        data = response.data
+        self.assertEqual(data['count'], 4)
+        self.assertEqual(data['brands'], [
+            {'slug': 'claas', 'name': 'CLAAS', 'count': 2},
+            {'slug': 'yto', 'name': 'YTO', 'count': 2},
+        ])
+        self.assertEqual(data['categories'], [
+            {'slug': 'tractors', 'name': 'Tractors', 'count': 3},
+            {'slug': 'parts', 'name': 'Запчасти', 'count': 1},
+        ])
+        self.assertEqual([(t['value'], t['count']) for t in data['product_types']], [('machinery', 3), ('spare_part', 1)])
+        self.assertEqual([(s['value'], s['count']) for s in data['stock_statuses']], [('in_stock', 3), ('pre_order', 1)])
+
+        price = data['price']
+        self.assertEqual((price['min'], price['max']), (100.0, 110000.0))
+        self.assertEqual([b['count'] for b in price['histogram']], [2, 1, 0, 0, 0, 0, 0, 0, 0, 1])
+        self.assertEqual((price['histogram'][0]['from'], price['histogram'][0]['to']), (100.0, 11090.0))
+        self.assertEqual(price['histogram'][-1]['to'], 110000.0)
+
+        self.assertEqual(data['specs'], [{'key': 'horsepower', 'min': 80.0, 'max': 240.0, 'unit': 'л.с.', 'count': 3}])
+
+    def test_same_filters_as_list(self):
+        params = {'brand': 'yto', 'spec_horsepower_min': 100, 'ordering': 'base_price_usd'}
+        listing = self.client.get('/api/v1/products/', params)
+        data = self.client.get('/api/v1/products/facets/', params).data
+        self.assertEqual(data['count'], listing.data['count'])
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['price']['histogram'], [{'from': 20000.0, 'to': 20000.0, 'count': 1}])
+
+    def test_search_filter(self):
+        for backend in ('', 'apps.catalog.search.SimpleSearchBackend', 'apps.catalog.search.EmbeddedSearchBackend'):
+            with self.subTest(backend=backend), override_settings(CATALOG_SEARCH_BACKEND=backend):
+                cache.clear()
+                self.assertEqual(self.client.get('/api/v1/products/facets/', {'search': 't3'}).data['count'], 1)
+
+    def test_cached_per_filter_set(self):
+        self.client.get('/api/v1/products/facets/', {'brand': 'yto', 'page': 2})
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/products/facets/', {'page': 3, 'brand': 'yto'})
+        self.assertEqual(response.data['count'], 2)
+
+        Product.objects.filter(slug='t1').first().save()
+        with self.assertNumQueries(3):
+            self.client.get('/api/v1/products/facets/', {'brand': 'yto'})
+
+    def test_empty(self):
+        data = self.client.get('/api/v1/products/facets/', {'brand': 'nope'}).data
+        self.assertEqual(data['count'], 0)
+        self.assertEqual(data['brands'], [])
+        self.assertEqual(data['price'], {'min': None, 'max': None, 'histogram': []})
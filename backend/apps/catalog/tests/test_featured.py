@@ -0,0 +1,109 @@
+"""
+Tests for the materialized featured products/brands payloads.
+"""
+
+import json
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.request import Request
+from rest_framework.test import APITestCase
+from apps.catalog.featured import build_featured_products
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.serializers import ProductListSerializer
+from apps.core.utils.currency import CurrencyService
+
+User = get_user_model()
+
+
+class FeaturedPayloadTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(
+            name_ru="Тракторы", name_en="Tractors", slug="tractors", image="categories/t.png"
+        )
+        cls.brand = Brand.objects.create(name="YTO", slug="yto", country="Китай", logo="brands/yto.png", is_featured=True)
+        Brand.objects.create(name="Claas", slug="claas", country="Германия")
+        for n in range(4):
+            Product.objects.create(
+                sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Трактор {n}", name_en=f"Tractor {n}",
+                category=cls.category, brand=cls.brand, main_image="products/p.jpg" if n else "",
+                base_price_usd=1000 + n, retail_price_usd=1200 + n, show_price_to_guests=n != 1,
+                is_featured=n < 3,
+            )
+
+    def setUp(self):
+        cache.clear()
+        CurrencyService.get_usd_uzs_rate()  # warm the rate cache
+        call_command('warm_catalog_cache', stdout=StringIO())
+
+    def assertSameAsSerializer(self, response):
+        products = Product.objects.filter(is_active=True, is_featured=True).select_related('category', 'brand')
+        # Language and pricing tier are memoized on the request by the view
+        request = Request(response.wsgi_request)
+        expected = ProductListSerializer(products, many=True, context={'request': request}).data
+        self.assertEqual(json.dumps(response.data), json.dumps(expected))
+
+    def test_served_from_cache(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/products/featured/', HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual([p['name'] for p in response.data], ['Tractor 2', 'Tractor 1', 'Tractor 0'])
+        self.assertSameAsSerializer(response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/brands/featured/')
+        self.assertEqual(response.data, [{
+            'id': self.brand.pk, 'slug': 'yto', 'name': 'YTO',
+            'logo': 'http://testserver/media/brands/yto.png', 'country': 'Китай',
+        }])
+
+    def test_pricing_overlay_per_tier(self):
+        self.assertSameAsSerializer(self.client.get('/api/v1/products/featured/'))
+        self.client.force_authenticate(User.objects.create_user(username='farmer', password='secret123'))
+        response = self.client.get('/api/v1/products/featured/')
+        self.assertTrue(all(p['pricing']['can_see_price'] for p in response.data))
+        self.assertSameAsSerializer(response)
+
+        response = self.client.get('/api/v1/products/featured/', {'fields': 'slug'})
+        self.assertEqual(response.data[0], {'slug': 'product-2'})
+
+    def test_rebuilt_on_flag_changes(self):
+        product = Product.objects.get(slug='product-3')
+        with self.captureOnCommitCallbacks(execute=True):
+            product.is_featured = True
+            product.save()
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/products/featured/')
+        self.assertEqual(len(response.data), 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.get(slug='product-0').delete()
+            self.brand.is_featured = False
+            self.brand.save()
+        self.assertEqual(len(self.client.get('/api/v1/products/featured/').data), 3)
+        self.assertEqual(self.client.get('/api/v1/brands/featured/').data, [])
+
+    def test_rebuilt_lazily_after_cache_flush(self):
+        cache.clear()
+        response = self.client.get('/api/v1/products/featured/')
+        self.assertEqual(len(response.data), 3)
+        self.assertSameAsSerializer(response)
+
+    def test_request_build_never_replaces_rebuild(self):
+        cache.clear()
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            self.client.get('/api/v1/products/featured/')
+        self.assertEqual(add.call_args.kwargs['timeout'], settings.CATALOG_CACHE_TIMEOUT)
+
+        # The rebuild after a commit, then a request that read the rows before it
+        featured = Product.objects.filter(slug='product-3')
+        featured.update(is_featured=True)
+        build_featured_products()
+        featured.update(is_featured=False)
+        build_featured_products(lazy=True)
+        self.assertEqual(len(self.client.get('/api/v1/products/featured/').data), 4)
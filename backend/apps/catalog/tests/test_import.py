@@ -0,0 +1,144 @@
+"""
+Tests for the bulk product import.
+"""
+
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase
+from openpyxl import Workbook
+
+from apps.catalog.cache import get_version
+from apps.catalog.importer import ProductImporter, import_products, read_rows
+from apps.catalog.models import Product, ProductSpecValue, Category, Brand
+
+User = get_user_model()
+
+CSV = (
+    'sku;name_ru;base_price_usd;category;brand;specifications;is_featured\n'
+    'A-1;Трактор;1000,50;tractors;yto;"{""horsepower"": {""value"": 50, ""unit"": ""л.с.""}}";да\n'
+    'A-2;Насос;abc;tractors;yto;;\n'
+    'A-3;Косилка;10;missing;yto;;\n'
+    'A-4;Косилка;10;tractors;yto;;нет\n'
+)
+
+
+def import_text(text, file_format, **kwargs):
+    return import_products(read_rows(io.BytesIO(text.encode()), file_format), **kwargs)
+
+
+class ProductImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        cls.brand = Brand.objects.create(name="YTO", slug="yto", country="Китай")
+
+    def test_csv_with_row_errors(self):
+        version = get_version('products')
+        result = import_text(CSV, 'csv')
+        self.assertEqual((result.created, result.updated), (2, 0))
+        self.assertEqual([line for line, _ in result.errors], [3, 4])
+        self.assertIn('Категория', result.errors[1][1])
+
+        product = Product.objects.get(sku='A-1')
+        self.assertEqual(product.slug, 'a-1')
+        self.assertEqual(product.base_price_usd, Decimal('1000.50'))
+        self.assertTrue(product.is_featured)
+        self.assertEqual(product.search_name, 'traktor')
+        self.assertEqual(
+            list(ProductSpecValue.objects.values_list('product_id', 'spec_key', 'numeric_value')),
+            [(product.pk, 'horsepower', 50.0)],
+        )
+        self.assertFalse(Product.objects.get(sku='A-4').is_featured)
+        self.assertNotEqual(get_version('products'), version)
+
+    def test_partial_update_keeps_other_columns(self):
+        import_text(CSV, 'csv')
+        rows = [
+            {'sku': 'A-1', 'retail_price_usd': '1200', 'specifications': {'horsepower': {'value': 55}}},
+            {'sku': 'A-4', 'stock_status': 'out_of_stock'},
+            {'sku': 'A-9', 'stock_status': 'in_stock'},
+        ]
+        result = import_text('\n'.join(json.dumps(row) for row in rows) + '\n{broken\n', 'ndjson', chunk_size=2)
+        self.assertEqual((result.created, result.updated), (0, 2))
+        self.assertEqual([line for line, _ in result.errors], [3, 4])
+
+        product = Product.objects.get(sku='A-1')
+        self.assertEqual((product.name_ru, product.base_price_usd), ('Трактор', Decimal('1000.50')))
+        self.assertEqual(product.retail_price_usd, Decimal('1200'))
+        self.assertTrue(product.is_featured)
+        self.assertEqual(ProductSpecValue.objects.get(product=product).numeric_value, 55.0)
+        self.assertEqual(Product.objects.get(sku='A-4').stock_status, 'out_of_stock')
+
+    def test_last_row_wins_and_slug_conflicts(self):
+        Product.objects.create(
+            sku='OLD', slug='taken', name_ru='Старый', category=self.category, brand=self.brand, base_price_usd=1
+        )
+        result = import_text(
+            'sku,slug,name_ru,base_price_usd,category,brand\n'
+            'B-1,,Первый,1,tractors,yto\n'
+            'B-1,,Второй,2,tractors,yto\n'
+            'B-2,taken,Занят,3,tractors,yto\n',
+            'csv',
+        )
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, _ in result.errors], [2, 4])
+        self.assertEqual(Product.objects.get(sku='B-1').name_ru, 'Второй')
+        self.assertFalse(Product.objects.filter(sku='B-2').exists())
+
+    def test_failed_group_is_retried_as_new_rows(self):
+        save, retried = ProductImporter.save, []
+
+        def failing_save(products, columns, pks):
+            if len(products) > 1:
+                save(products, columns, pks)  # the ids returned here are rolled back
+                raise DatabaseError('group failed')
+            retried.append(products[0].pk)
+            save(products, columns, pks)
+
+        with mock.patch.object(ProductImporter, 'save', staticmethod(failing_save)):
+            result = import_text(CSV, 'csv')
+        self.assertEqual((result.created, result.errors[0][0]), (2, 3))
+        self.assertEqual(retried, [None, None])
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_xlsx_command(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['sku', 'name_ru', 'base_price_usd', 'category', 'brand', 'stock_quantity'])
+        sheet.append(['X-1', 'Сеялка', 250.5, 'tractors', 'yto', 7])
+        sheet.append([None] * 6)
+        sheet.append(['X-2', 'Плуг', 100, 'tractors', 'nope', 1])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'products.xlsx')
+            workbook.save(path)
+            out, err = io.StringIO(), io.StringIO()
+            call_command('import_catalog', path, stdout=out, stderr=err)
+        self.assertIn('1 created, 0 updated, 1 errors', out.getvalue())
+        self.assertIn('Line 4', err.getvalue())
+        product = Product.objects.get(sku='X-1')
+        self.assertEqual((product.base_price_usd, product.stock_quantity), (Decimal('250.50'), 7))
+
+    def test_admin_upload(self):
+        self.client.force_login(User.objects.create_superuser(username='admin', password='secret123'))
+        self.assertEqual(self.client.get('/admin/catalog/product/import/').status_code, 200)
+        self.assertContains(self.client.get('/admin/catalog/product/'), '/admin/catalog/product/import/')
+
+        upload = SimpleUploadedFile('products.csv', CSV.encode())
+        response = self.client.post('/admin/catalog/product/import/', {'file': upload}, follow=True)
+        self.assertContains(response, 'создано 2, обновлено 0, ошибок 2')
+        self.assertContains(response, 'Строка 3')
+        self.assertEqual(Product.objects.count(), 2)
+
+        upload = SimpleUploadedFile('products.txt', b'sku\n')
+        response = self.client.post('/admin/catalog/product/import/', {'file': upload})
+        self.assertContains(response, 'Поддерживаются файлы')
@@ -0,0 +1,82 @@
+"""
+Tests for the values()-based product listing serializer.
+"""
+
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from apps.accounts.models import BusinessProfile
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.serializers import ProductListRowSerializer, ProductListSerializer
+
+User = get_user_model()
+
+
+class ProductListRowSerializerTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        tractors = Category.objects.create(
+            name_ru="Тракторы", name_en="Tractors", slug="tractors", icon="tractor", image="categories/t.png"
+        )
+        pumps = Category.objects.create(name_ru="Насосы", slug="pumps")
+        yto = Brand.objects.create(name="YTO", slug="yto", country="Китай", logo="brands/yto.png")
+        pedrollo = Brand.objects.create(name="Pedrollo", slug="pedrollo", country="Италия")
+        for n in range(6):
+            Product.objects.create(
+                sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Трактор {n}",
+                name_en=f"Tractor {n}" if n % 2 else "",
+                short_description_ru="Описание", short_description_uz="Tavsif" if n % 3 else "",
+                category=tractors if n % 2 else pumps, brand=yto if n < 3 else pedrollo,
+                main_image="products/p.jpg" if n % 2 else "",
+                base_price_usd=Decimal('1000.00'),
+                retail_price_usd=Decimal('1200.00') if n % 3 else None,
+                wholesale_price_usd=Decimal('900.50') if n % 2 else None,
+                show_price_to_guests=n % 3 == 0, is_featured=n == 4,
+            )
+        opt = User.objects.create_user(username='opt', password='secret123')
+        BusinessProfile.objects.create(
+            user=opt, inn='100000001', company_name='Opt', legal_address='Ташкент',
+            pricing_tier='wholesale', verified_at=timezone.now(),
+        )
+        cls.users = [None, User.objects.create_user(username='farmer', password='secret123'), opt]
+
+    def setUp(self):
+        cache.clear()
+
+    def assertSameOutput(self, request):
+        queryset = Product.objects.select_related('category', 'brand').order_by('pk')
+        expected = ProductListSerializer(queryset, many=True, context={'request': request}).data
+        serializer = ProductListRowSerializer(request)
+        actual = serializer.serialize(serializer.get_rows(queryset))
+        self.assertEqual(json.dumps(actual), json.dumps(expected))
+
+    def test_same_output_as_model_serializer(self):
+        factory = APIRequestFactory()
+        for user in self.users:
+            for lang in ('ru', 'uz', 'en', 'de'):
+                with self.subTest(user=user, lang=lang):
+                    request = Request(factory.get('/api/v1/products/', HTTP_ACCEPT_LANGUAGE=lang))
+                    request.user = user or AnonymousUser()
+                    self.assertSameOutput(request)
+
+    def test_list_endpoint(self):
+        for params in ({}, {'cursor': ''}, {'search': 'трактор'}, {'fields': 'slug'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/v1/products/', {**params, 'ordering': 'base_price_usd'})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), 6)
+
+        response = self.client.get('/api/v1/products/', {'ordering': '-created_at'})
+        first = response.data['results'][0]
+        self.assertEqual(first['slug'], 'product-5')
+        self.assertEqual(first['main_image'], 'http://testserver/media/products/p.jpg')
+        self.assertEqual(first['brand']['logo'], None)
+        self.assertEqual(first['category']['image'], 'http://testserver/media/categories/t.png')
+
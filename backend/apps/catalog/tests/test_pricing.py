@@ -0,0 +1,90 @@
+"""
+Tests for request-scoped pricing.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from apps.accounts.models import BusinessProfile
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.pricing import PricingContext
+from apps.core.utils.currency import CurrencyService
+
+User = get_user_model()
+
+
+class PricingContextTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+        self.products = [
+            Product.objects.create(
+                sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Трактор {n}",
+                category=category, brand=brand,
+                base_price_usd=Decimal('1000.00'),
+                retail_price_usd=Decimal('1200.00'),
+                wholesale_price_usd=Decimal('900.50') if n % 2 else None,
+                show_price_to_guests=n % 3 == 0,
+            )
+            for n in range(6)
+        ]
+
+    def _user(self, name, tier=None, verified=True):
+        user = User.objects.create_user(username=name, password='secret123')
+        if tier:
+            BusinessProfile.objects.create(
+                user=user, inn=str(100000000 + user.pk), company_name=name,
+                legal_address='Ташкент', pricing_tier=tier,
+                verified_at=timezone.now() if verified else None,
+            )
+        return User.objects.get(pk=user.pk)
+
+    def test_tier_resolution(self):
+        self.assertEqual(PricingContext.for_user(None).tier, 'guest')
+        self.assertEqual(PricingContext.for_user(self._user('farmer')).tier, 'retail')
+        self.assertEqual(PricingContext.for_user(self._user('opt', 'wholesale')).tier, 'wholesale')
+        self.assertEqual(PricingContext.for_user(self._user('big', 'vip')).tier, 'vip')
+        self.assertEqual(PricingContext.for_user(self._user('new', 'vip', verified=False)).tier, 'retail')
+
+    def test_prices_by_tier(self):
+        priced, hidden = self.products[3], self.products[2]
+        self.assertEqual(PricingContext('guest').price_for(priced), (Decimal('1200.00'), True))
+        self.assertEqual(PricingContext('guest').price_for(hidden), (None, False))
+        self.assertEqual(PricingContext('retail').price_for(hidden), (Decimal('1200.00'), True))
+        self.assertEqual(PricingContext('wholesale').price_for(priced), (Decimal('900.50'), True))
+        self.assertEqual(PricingContext('wholesale').price_for(hidden), (Decimal('1200.00'), True))
+        self.assertEqual(PricingContext('vip').price_for(hidden), (Decimal('1000.00'), True))
+
+    def test_model_helper_matches_context(self):
+        user = self._user('opt', 'wholesale')
+        for product in self.products:
+            self.assertEqual(product.get_price_for_user(user), PricingContext('wholesale').price_for(product))
+
+    def test_listing_resolves_tier_once_per_request(self):
+        user = self._user('opt', 'wholesale')
+        self.client.force_authenticate(user=user)
+        CurrencyService.get_usd_uzs_rate()  # warm the rate cache
+        with self.assertNumQueries(2):  # page + business profile
+            response = self.client.get('/api/v1/products/', {'ordering': 'created_at', 'cursor': ''})
+
+        pricing = response.data['results'][1]['pricing']
+        self.assertEqual(pricing['price_usd'], 900.5)
+        self.assertEqual(pricing['price_uzs'], int(900.5 * 12800))
+        self.assertTrue(pricing['can_see_price'])
+
+    def test_detail_pricing_for_guest(self):
+        response = self.client.get('/api/v1/products/product-2/')
+        self.assertEqual(response.data['pricing'], {
+            'show_to_guests': False,
+            'can_see_price': False,
+            'base_usd': None,
+            'retail_usd': None,
+            'wholesale_usd': None,
+            'user_price_usd': None,
+            'user_price_uzs': None,
+        })
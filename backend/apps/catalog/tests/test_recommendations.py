@@ -0,0 +1,101 @@
+"""
+Tests for precomputed related products.
+"""
+
+from io import StringIO
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from apps.catalog.models import Product, ProductRecommendations, Category, Brand
+from apps.catalog.recommend import build_recommendations, get_stale_categories, nearest_neighbours
+from apps.core.utils.currency import CurrencyService
+
+
+class RecommendationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tractors = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        cls.pumps = Category.objects.create(name_ru="Насосы", slug="pumps")
+        yto = Brand.objects.create(name="YTO", slug="yto", country="Китай")
+        claas = Brand.objects.create(name="Claas", slug="claas", country="Германия")
+        tractors = [
+            # slug, horsepower, price, brand
+            ('t-50', 50, 9000, yto),
+            ('t-55', 55, 10000, yto),
+            ('t-60', 60, 11000, claas),
+            ('t-200', 200, 60000, claas),
+            ('t-220', 220, 65000, claas),
+        ]
+        for slug, horsepower, price, brand in tractors:
+            Product.objects.create(
+                sku=slug.upper(), slug=slug, name_ru=slug, category=cls.tractors, brand=brand,
+                base_price_usd=price, specifications={'horsepower': {'value': horsepower, 'unit': 'л.с.'}},
+            )
+        Product.objects.create(sku='P-1', slug='p-1', name_ru='p-1', category=cls.pumps, brand=yto, base_price_usd=500)
+
+    def setUp(self):
+        cache.clear()
+        CurrencyService.get_usd_uzs_rate()  # warm the rate cache
+
+    def related(self, slug):
+        response = self.client.get(f'/api/v1/products/{slug}/related/')
+        self.assertEqual(response.status_code, 200)
+        return [p['slug'] for p in response.data]
+
+    def test_nearest_products_first(self):
+        self.assertEqual(build_recommendations(), 6)
+        self.assertEqual(self.related('t-50')[:2], ['t-55', 't-60'])
+        self.assertEqual(self.related('t-220')[0], 't-200')
+        self.assertEqual(len(self.related('t-50')), 4)
+        self.assertEqual(self.related('p-1'), [])
+
+    def test_related_is_two_queries(self):
+        build_recommendations()
+        with self.assertNumQueries(2):  # lookup + products
+            self.client.get('/api/v1/products/t-50/related/')
+
+    def test_fallback_and_not_found(self):
+        self.assertEqual(len(self.related('t-50')), 4)
+        self.assertEqual(self.client.get('/api/v1/products/missing/related/').status_code, 404)
+
+    def test_incremental(self):
+        build_recommendations()
+        self.assertEqual(get_stale_categories(), set())
+
+        product = Product.objects.get(slug='t-55')
+        product.is_active = False
+        product.save()
+        self.assertEqual(get_stale_categories(), {self.tractors.pk})
+        self.assertEqual(build_recommendations(), 4)
+        self.assertEqual(get_stale_categories(), set())
+        self.assertFalse(ProductRecommendations.objects.filter(product=product).exists())
+        self.assertNotIn('t-55', self.related('t-50'))
+
+    def test_moved_product_leaves_old_category(self):
+        build_recommendations()
+        product = Product.objects.get(slug='t-55')
+        product.category = self.pumps
+        product.save()
+        self.assertEqual(get_stale_categories(), {self.tractors.pk, self.pumps.pk})
+        self.assertEqual(build_recommendations(), 6)
+        self.assertNotIn('t-55', self.related('t-50'))
+        self.assertEqual(self.related('t-55'), ['p-1'])
+
+    def test_blocks_match_full_matrix(self):
+        features = np.random.default_rng(0).standard_normal((50, 8)).astype(np.float32)
+        similarity = features @ features.T
+        np.fill_diagonal(similarity, -np.inf)
+        expected = np.argsort(-similarity, axis=1, kind='stable')[:, :5]
+        for batch_size in (7, 50, 64):
+            np.testing.assert_array_equal(nearest_neighbours(features, 5, batch_size), expected)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('build_recommendations', category=['pumps'], stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(get_stale_categories(), {self.tractors.pk})
+        call_command('build_recommendations', all=True, top_k=2, stdout=out)
+        self.assertEqual(len(ProductRecommendations.objects.get(product__slug='t-50').related_ids), 2)
@@ -0,0 +1,72 @@
+"""
+Tests for the anonymous catalog response cache.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from apps.catalog.models import Product, ProductImage, Category, Brand
+
+User = get_user_model()
+
+
+class CatalogResponseCacheTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        self.brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+        self.product = Product.objects.create(
+            sku="SKU-1", slug="product-1", name_ru="Трактор",
+            category=self.category, brand=self.brand, base_price_usd=1000,
+        )
+
+    def test_repeat_request_served_from_cache(self):
+        first = self.client.get('/api/v1/products/', {'brand': 'yto', 'ordering': 'name_ru'})
+        with self.assertNumQueries(0):
+            # Same params in a different order
+            second = self.client.get('/api/v1/products/?ordering=name_ru&brand=yto')
+        self.assertEqual(first.data, second.data)
+
+        self.client.get('/api/v1/categories/')
+        self.client.get('/api/v1/brands/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/v1/categories/')
+            self.client.get('/api/v1/brands/')
+
+    def test_language_is_part_of_key(self):
+        self.category.name_en = "Tractors"
+        self.category.save()
+        ru = self.client.get('/api/v1/categories/flat/')
+        en = self.client.get('/api/v1/categories/flat/', HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual(ru.data[0]['name'], "Тракторы")
+        self.assertEqual(en.data[0]['name'], "Tractors")
+
+    def test_invalidated_by_model_changes(self):
+        self.client.get('/api/v1/products/')
+
+        self.product.name_ru = "Трактор YTO"
+        self.product.save()
+        self.assertEqual(self.client.get('/api/v1/products/').data['results'][0]['name'], "Трактор YTO")
+
+        self.brand.name = "YTO Group"
+        self.brand.save()
+        self.assertEqual(self.client.get('/api/v1/products/').data['results'][0]['brand']['name'], "YTO Group")
+
+        self.category.name_ru = "Техника"
+        self.category.save()
+        self.assertEqual(self.client.get('/api/v1/products/').data['results'][0]['category']['name'], "Техника")
+
+        products_version = cache.get('catalog:version:products')
+        ProductImage.objects.create(product=self.product, image='products/1.jpg')
+        self.assertEqual(cache.get('catalog:version:products'), products_version + 1)
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = User.objects.create_user(username='farmer', password='secret123')
+        self.client.force_authenticate(user=user)
+        self.client.get('/api/v1/products/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/v1/products/')
+        self.assertGreater(len(queries), 0)
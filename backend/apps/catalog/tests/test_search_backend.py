@@ -0,0 +1,79 @@
+"""
+Tests for ranked product search backends.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.search import (
+    SimpleSearchBackend, SQLiteSearchBackend, get_search_backend
+)
+
+
+class SearchBackendTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+        cls.tractor = Product.objects.create(
+            sku="YTO-X1204", slug="yto-x1204", name_ru="Трактор YTO X1204",
+            name_en="YTO X1204 tractor", category=category, brand=brand,
+            base_price_usd=25000,
+        )
+        cls.mention = Product.objects.create(
+            sku="SEED-01", slug="seeder", name_ru="Сеялка",
+            short_description_ru="Агрегатируется с трактором мощностью 80 л.с.",
+            category=category, brand=brand, base_price_usd=5000,
+        )
+        cls.other = Product.objects.create(
+            sku="PUMP-7", slug="pump", name_ru="Насос",
+            category=category, brand=brand, base_price_usd=300,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_database_backend_is_selected(self):
+        backend = get_search_backend()
+        if connection.vendor == 'sqlite':
+            self.assertIsInstance(backend, SQLiteSearchBackend)
+
+    def test_name_match_ranks_above_description_match(self):
+        results = list(get_search_backend().search_products(Product.objects.all(), 'трактор'))
+        self.assertEqual(results, [self.tractor, self.mention])
+
+    def test_prefix_and_sku_match(self):
+        backend = get_search_backend()
+        self.assertEqual(list(backend.search_products(Product.objects.all(), 'трак')), [self.tractor, self.mention])
+        self.assertEqual(list(backend.search_products(Product.objects.all(), 'x1204')), [self.tractor])
+
+    def test_index_follows_updates_and_deletes(self):
+        backend = get_search_backend()
+        self.other.name_ru = "Насос для трактора"
+        self.other.save()
+        self.assertIn(self.other, backend.search_products(Product.objects.all(), 'трактора'))
+
+        self.other.delete()
+        self.assertEqual(backend.search_products(Product.objects.filter(sku="PUMP-7"), 'насос').count(), 0)
+
+    def test_punctuation_only_query(self):
+        self.assertEqual(get_search_backend().search_products(Product.objects.all(), '"*:()').count(), 0)
+
+    def test_listing_search_keeps_relevance_order(self):
+        response = self.client.get('/api/v1/products/', {'search': 'трактор'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['slug'] for p in response.data['results']], ['yto-x1204', 'seeder'])
+
+        response = self.client.get('/api/v1/products/', {'search': 'трактор', 'ordering': 'base_price_usd'})
+        self.assertEqual([p['slug'] for p in response.data['results']], ['seeder', 'yto-x1204'])
+
+    def test_search_view_uses_backend(self):
+        response = self.client.get('/api/v1/search/', {'q': 'x1204'})
+        self.assertEqual([p['slug'] for p in response.data['products']], ['yto-x1204'])
+
+    def test_simple_backend_matches_substrings(self):
+        results = SimpleSearchBackend().search_products(Product.objects.all(), '1204')
+        self.assertEqual(list(results), [self.tractor])
@@ -0,0 +1,164 @@
+"""
+Tests for the embedded in-process search engine.
+"""
+
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from apps.catalog.cache import bump_version
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.search import EmbeddedSearchBackend, get_engine, reset_engine
+from apps.catalog.search.engine import InvertedIndex, SearchEngine
+from apps.catalog.search.normalize import build_search_key
+
+User = get_user_model()
+
+
+class InvertedIndexTests(APITestCase):
+
+    def setUp(self):
+        self.index = InvertedIndex((('name', 10), ('description', 1)))
+        self.index.add(1, ['Трактор YTO X1204', ''])
+        self.index.add(2, ['Сеялка', 'Работает с трактором'])
+        self.index.add(3, ['Культиватор', 'Навесной'])
+
+    def ids(self, query):
+        return [doc_id for doc_id, _ in self.index.search(query, 10)]
+
+    def test_field_weights_prefix_and_typo(self):
+        self.assertEqual(self.ids('трактор'), [1, 2])
+        self.assertEqual(self.ids('культ'), [3])
+        self.assertEqual(self.ids('култиватор'), [3])   # deletion
+        self.assertEqual(self.ids('кульитватор'), [3])  # transposition
+        self.assertEqual(self.ids('x12'), [1])
+        self.assertEqual(self.ids('x1205'), [])          # no typos in codes
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.ids('трактор yto'), [1])
+        self.assertEqual(self.ids('сеялка yto'), [])
+
+    def test_update_and_remove(self):
+        self.index.add(1, ['Комбайн', ''])
+        self.assertEqual(self.ids('трактор'), [2])
+        self.index.remove(2)
+        self.assertEqual(self.ids('трактор'), [])
+        self.assertNotIn('сеялка', self.index.postings)
+        self.assertNotIn('сеялка', self.index.terms)
+        self.assertEqual(len(self.index), 2)
+
+
+@override_settings(CATALOG_SEARCH_BACKEND='apps.catalog.search.EmbeddedSearchBackend')
+class EmbeddedSearchBackendTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        cls.brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+        cls.tractor = Product.objects.create(
+            sku="YTO-X1204", slug="yto-x1204", name_ru="Трактор YTO X1204",
+            category=cls.category, brand=cls.brand, base_price_usd=25000,
+        )
+        cls.seeder = Product.objects.create(
+            sku="SEED-01", slug="seeder", name_ru="Сеялка",
+            short_description_ru="Агрегатируется с трактором",
+            category=cls.category, brand=cls.brand, base_price_usd=5000,
+        )
+
+    def setUp(self):
+        cache.clear()
+        reset_engine()
+        self.addCleanup(reset_engine)
+
+    def search(self, query):
+        return list(EmbeddedSearchBackend().search_products(Product.objects.all(), query))
+
+    def test_search_view(self):
+        response = self.client.get('/api/v1/search/', {'q': 'трак'})
+        self.assertEqual([p['slug'] for p in response.data['products']], ['yto-x1204', 'seeder'])
+        self.assertEqual([c['slug'] for c in response.data['categories']], ['tractors'])
+        self.assertEqual(response.data['brands'], [])
+
+        response = self.client.get('/api/v1/search/', {'q': 'тракотр'})
+        self.assertEqual([p['slug'] for p in response.data['products']], ['yto-x1204'])
+        response = self.client.get('/api/v1/search/', {'q': 'yto'})
+        self.assertEqual([b['slug'] for b in response.data['brands']], ['yto'])
+
+    def test_listing_search(self):
+        response = self.client.get('/api/v1/products/', {'search': 'трак'})
+        self.assertEqual([p['slug'] for p in response.data['results']], ['yto-x1204', 'seeder'])
+        self.assertEqual(response.data['count'], 2)
+
+    def test_truncation_is_reported(self):
+        self.assertNotIn('search_truncated', self.client.get('/api/v1/products/', {'search': 'трак'}).data)
+        cache.clear()
+        with mock.patch.object(EmbeddedSearchBackend, 'max_results', 1):
+            response = self.client.get('/api/v1/products/', {'search': 'трак'})
+            self.assertEqual(response.data['count'], 1)
+            self.assertIs(response.data['search_truncated'], True)
+
+            self.client.force_authenticate(User.objects.create_user(username='dealer', password='secret123'))
+            response = self.client.get('/api/v1/products/export/csv/', {'search': 'трак'})
+            self.assertEqual(response['X-Search-Truncated'], 'true')
+
+    def test_search_waits_for_index_updates(self):
+        engine = get_engine()
+        self.assertEqual(self.search('сеялка'), [self.seeder])
+        results = []
+        with engine._lock:  # e.g. a sync in another thread
+            thread = threading.Thread(target=lambda: results.append(engine.search('products', 'сеялка', 10)))
+            thread.start()
+            thread.join(0.2)
+            self.assertTrue(thread.is_alive())
+        thread.join()
+        self.assertEqual([doc_id for doc_id, _ in results[0]], [self.seeder.pk])
+
+    def test_signals_update_loaded_index(self):
+        self.assertEqual(self.search('сеялка'), [self.seeder])
+
+        self.seeder.name_ru = "Сеялка пневматическая"
+        self.seeder.save()
+        self.assertEqual(self.search('пневматическая'), [self.seeder])
+
+        self.seeder.is_active = False
+        self.seeder.save()
+        self.assertEqual(self.search('сеялка'), [])
+
+        self.tractor.delete()
+        self.assertNotIn(self.tractor.pk, get_engine().indexes['products'].documents)
+
+    def test_sync_picks_up_changes_from_other_workers(self):
+        engine = get_engine()
+        self.assertEqual(self.search('насос'), [])
+
+        # Saves in another process do not reach this process's signals
+        Product.objects.filter(pk=self.seeder.pk).update(
+            name_ru="Насос", search_name=build_search_key("Насос"), updated_at=timezone.now()
+        )
+        Product.objects.filter(pk=self.tractor.pk).delete()
+        bump_version('products')
+        engine._next_check = 0
+
+        self.assertEqual(self.search('насос'), [self.seeder])
+        self.assertEqual(self.search('x1204'), [])
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'search.snapshot')
+            call_command('build_search_index', output=path, stdout=open(os.devnull, 'w'))
+
+            Product.objects.filter(pk=self.seeder.pk).update(
+                name_ru="Насос", search_name=build_search_key("Насос"), updated_at=timezone.now()
+            )
+            engine = SearchEngine(snapshot_path=path)
+            with self.assertNumQueries(6):  # changed rows + active count per kind
+                engine.ensure_fresh()
+            ids = [pk for pk, _ in engine.indexes['products'].search('насос', 10)]
+            self.assertEqual(ids, [self.seeder.pk])
@@ -0,0 +1,105 @@
+"""
+Tests for script-aware search normalization.
+"""
+
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.search import reset_engine
+from apps.catalog.search.normalize import build_search_key, normalize
+
+
+class NormalizeTests(APITestCase):
+
+    def test_script_case_and_spelling_variants_fold_together(self):
+        groups = [
+            ('Трактор', 'traktor', 'TRACTOR'),
+            ("O‘g‘it", "oʻgʻit", "o'g'it", 'o’g’it', 'Ўғит'),
+            ('Культиватор', 'cultivator', 'kultivator'),
+            ('Қишлоқ', 'qishloq', 'kishlok'),
+            ('Хлопок', 'khlopok', 'xlopok'),
+            ('Ёқилғи', "yoqilg'i"),
+            ('Цилиндр', 'silindr'),
+            ('Kühne', 'kuhne'),
+        ]
+        for variants in groups:
+            with self.subTest(variants=variants):
+                self.assertEqual(len({normalize(v) for v in variants}), 1)
+
+    def test_normalize_is_idempotent(self):
+        for text in ('Трактор YTO X1204', "Paxta terish mashinasi o‘g‘it", 'Ростсельмаш CLAAS'):
+            self.assertEqual(normalize(normalize(text)), normalize(text))
+
+    def test_build_search_key(self):
+        self.assertEqual(
+            build_search_key('Трактор YTO-X1204', 'Traktor YTO X1204', ''),
+            'traktor yto x1204'
+        )
+
+
+class CrossScriptSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(
+            name_ru="Удобрения", name_uz="O‘g‘itlar", slug="fertilizers"
+        )
+        cls.brand = Brand.objects.create(name="Ростсельмаш", slug="rostselmash", country="Россия")
+        cls.tractor = Product.objects.create(
+            sku="RSM-2375", slug="rsm-2375", name_ru="Трактор RSM 2375",
+            category=cls.category, brand=cls.brand, base_price_usd=90000,
+        )
+        cls.spreader = Product.objects.create(
+            sku="SPR-01", slug="spreader", name_ru="Разбрасыватель удобрений",
+            name_uz="O‘g‘it sepgich",
+            category=cls.category, brand=cls.brand, base_price_usd=3000,
+        )
+
+    def setUp(self):
+        cache.clear()
+        reset_engine()
+        self.addCleanup(reset_engine)
+
+    def test_keys_are_stored_on_save(self):
+        self.assertEqual(self.spreader.search_name, 'razbrasivatel udobreniy ogit sepgich')
+        self.assertEqual(self.brand.search_name, 'rosselmash')
+
+        self.tractor.name_uz = 'Traktor'
+        self.tractor.save(update_fields=['name_uz'])
+        self.tractor.refresh_from_db()
+        self.assertEqual(self.tractor.search_name, 'traktor rsm 2375')
+
+    def test_cross_script_queries_every_backend(self):
+        backends = [
+            '',  # database default (FTS5 here)
+            'apps.catalog.search.SimpleSearchBackend',
+            'apps.catalog.search.EmbeddedSearchBackend',
+        ]
+        queries = {
+            'traktor': ['rsm-2375'],
+            'tractor': ['rsm-2375'],
+            'ўғит': ['spreader'],
+            "o'g'it sepgich": ['spreader'],
+            'rsm-2375': ['rsm-2375'],
+        }
+        for backend in backends:
+            for query, slugs in queries.items():
+                with self.subTest(backend=backend, query=query), override_settings(CATALOG_SEARCH_BACKEND=backend):
+                    response = self.client.get('/api/v1/products/', {'search': query})
+                    self.assertEqual([p['slug'] for p in response.data['results']], slugs)
+
+    def test_search_view_categories_and_brands(self):
+        response = self.client.get('/api/v1/search/', {'q': "og'it"})
+        self.assertEqual([c['slug'] for c in response.data['categories']], ['fertilizers'])
+        response = self.client.get('/api/v1/search/', {'q': 'Rostselmash'})
+        self.assertEqual([b['slug'] for b in response.data['brands']], ['rostselmash'])
+
+    def test_refresh_keys_command(self):
+        Product.objects.filter(pk=self.tractor.pk).update(search_name='')
+        call_command('build_search_index', refresh_keys=True, stdout=StringIO())
+        self.tractor.refresh_from_db()
+        self.assertEqual(self.tractor.search_name, 'traktor rsm 2375')
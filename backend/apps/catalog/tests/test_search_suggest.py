@@ -0,0 +1,111 @@
+"""
+Tests for search-as-you-type suggestions.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from apps.catalog.cache import bump_version
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.search import get_suggester, reset_suggester
+from apps.catalog.search.normalize import build_search_key
+from apps.catalog.search.suggest import SuggestionIndex
+
+
+class SuggestionIndexTests(APITestCase):
+
+    def setUp(self):
+        self.index = SuggestionIndex(('search_name', 'sku', 'slug', 'name_ru', 'name_en'))
+        self.index.extend([
+            (1, build_search_key('Трактор YTO X1204'), 'YTO-X1204', 'x1204', 'Трактор YTO X1204', 'Tractor'),
+            (2, build_search_key('Мини трактор'), 'MT-1', 'mini', 'Мини трактор', ''),
+        ])
+
+    def test_lookup(self):
+        self.assertEqual(self.index.lookup('трак', 10), [1, 2])  # name starts with the query first
+        self.assertEqual(self.index.lookup('yto x12', 10), [1])
+        self.assertEqual(self.index.lookup('yto-x1204', 10), [1])  # SKU
+        self.assertEqual(self.index.lookup('mini', 10), [2])
+        self.assertEqual(self.index.lookup('т', 10), [])
+
+    def test_incremental_updates(self):
+        self.index.add(3, [build_search_key('Трал'), '', 'tral', 'Трал', ''])
+        self.assertEqual(self.index.lookup('тра', 10), [3, 1, 2])
+        self.index.add(1, [build_search_key('Сеялка'), 'S-1', 'x1204', 'Сеялка', ''])
+        self.assertEqual(self.index.lookup('тра', 10), [3, 2])
+        self.index.remove(3)
+        self.assertEqual(self.index.lookup('тра', 10), [2])
+        self.assertEqual(sorted(self.index.ids), [1, 1, 2, 2, 2])
+        self.assertEqual(len(self.index.keys), len(self.index.ids))
+
+    def test_label_language_fallback(self):
+        self.assertEqual(self.index.label(1, 'en'), 'Tractor')
+        self.assertEqual(self.index.label(2, 'en'), 'Мини трактор')
+        self.assertEqual(self.index.label(1, 'uz'), 'Трактор YTO X1204')
+
+
+class SuggestViewTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name_ru="Тракторы", name_en="Tractors", slug="tractors")
+        cls.brand = Brand.objects.create(name="Tractorio", slug="tractorio", country="Италия")
+        cls.product = Product.objects.create(
+            sku="YTO-X1204", slug="yto-x1204", name_ru="Трактор YTO X1204", name_en="YTO X1204 tractor",
+            category=cls.category, brand=cls.brand, base_price_usd=45000,
+        )
+        Product.objects.create(
+            sku="OLD-1", slug="old", name_ru="Трактор старый", is_active=False,
+            category=cls.category, brand=cls.brand, base_price_usd=1000,
+        )
+
+    def setUp(self):
+        cache.clear()
+        reset_suggester()
+        self.addCleanup(reset_suggester)
+
+    def test_suggestions(self):
+        response = self.client.get('/api/v1/search/suggest/', {'q': 'trak'})
+        self.assertEqual(response.data['results'], [
+            {'id': self.category.pk, 'label': 'Тракторы', 'type': 'category', 'slug': 'tractors'},
+            {'id': self.brand.pk, 'label': 'Tractorio', 'type': 'brand', 'slug': 'tractorio'},
+            {'id': self.product.pk, 'label': 'Трактор YTO X1204', 'type': 'product', 'slug': 'yto-x1204'},
+        ])
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertIn('Accept-Language', response['Vary'])
+
+        response = self.client.get('/api/v1/search/suggest/', {'q': 'x12', 'limit': 1}, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual([(r['type'], r['label']) for r in response.data['results']], [('product', 'YTO X1204 tractor')])
+
+        response = self.client.get('/api/v1/search/suggest/', {'q': 't'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_no_queries_once_built(self):
+        self.client.get('/api/v1/search/suggest/', {'q': 'tr'})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/v1/search/suggest/', {'q': 'yto'})
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_follows_catalog_changes(self):
+        self.client.get('/api/v1/search/suggest/', {'q': 'tr'})
+
+        # Saved in this worker: signals
+        Product.objects.create(
+            sku="S-1", slug="seyalka", name_ru="Сеялка", category=self.category, brand=self.brand,
+            base_price_usd=1,
+        )
+        response = self.client.get('/api/v1/search/suggest/', {'q': 'seya'})
+        self.assertEqual([r['slug'] for r in response.data['results']], ['seyalka'])
+
+        # Saved in another worker: delta sync once the versions change
+        Product.objects.filter(pk=self.product.pk).update(
+            name_ru="Комбайн", search_name=build_search_key("Комбайн"), updated_at=timezone.now()
+        )
+        bump_version('products')
+        get_suggester()._next_check = 0
+        response = self.client.get('/api/v1/search/suggest/', {'q': 'kombayn'})
+        self.assertEqual([r['slug'] for r in response.data['results']], ['yto-x1204'])
+        response = self.client.get('/api/v1/search/suggest/', {'q': 'yto'})
+        self.assertEqual([r['slug'] for r in response.data['results']], ['yto-x1204'])  # SKU still matches
@@ -0,0 +1,92 @@
+"""
+Tests for sparse fieldsets (?fields= / ?omit=) on catalog endpoints.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from apps.catalog.models import Product, Category, Brand
+from apps.catalog.pagination import ProductCursorPagination
+
+
+class SparseFieldsTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name_ru="Тракторы", name_en="Tractors", slug="tractors")
+        cls.brand = Brand.objects.create(name="YTO", slug="yto", country="Китай")
+        for n in range(3):
+            Product.objects.create(
+                sku=f"SKU-{n}", slug=f"product-{n}", name_ru=f"Трактор {n}", name_en=f"Tractor {n}",
+                short_description_ru="Описание", category=cls.category, brand=cls.brand,
+                base_price_usd=1000 + n,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_fields_selects_payload_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                '/api/v1/products/', {'fields': 'id,slug,name', 'ordering': 'base_price_usd'},
+                HTTP_ACCEPT_LANGUAGE='en'
+            )
+        first = response.data['results'][0]
+        self.assertEqual(first, {'id': first['id'], 'slug': 'product-0', 'name': 'Tractor 0'})
+        page_sql = ctx.captured_queries[-1]['sql']
+        self.assertNotIn('short_description', page_sql)
+        self.assertNotIn('JOIN', page_sql)
+        # No exchange rate lookup for pricing
+        self.assertFalse([q for q in ctx.captured_queries if 'exchange' in q['sql']])
+
+    def test_omit(self):
+        response = self.client.get('/api/v1/products/', {'omit': 'pricing,category,brand'})
+        result = response.data['results'][0]
+        self.assertNotIn('pricing', result)
+        self.assertNotIn('category', result)
+        self.assertIn('short_description', result)
+
+    def test_nested_serializers_stay_whole(self):
+        response = self.client.get('/api/v1/products/', {'fields': 'slug,brand'})
+        self.assertEqual(set(response.data['results'][0]), {'slug', 'brand'})
+        self.assertEqual(set(response.data['results'][0]['brand']), {'id', 'slug', 'name', 'logo', 'country'})
+
+    def test_nested_categories_stay_whole(self):
+        Category.objects.create(name_ru="Мини-тракторы", slug="mini-tractors", parent=self.category)
+        response = self.client.get('/api/v1/categories/', {'fields': 'slug,children'})
+        roots = response.data['results']
+        self.assertEqual(set(roots[0]), {'slug', 'children'})
+        self.assertEqual(roots[0]['children'][0]['slug'], 'mini-tractors')
+        self.assertIn('id', roots[0]['children'][0])
+
+    def test_selection_shares_count_and_facet_caches(self):
+        self.client.get('/api/v1/products/', {'brand': 'yto'})
+        self.client.get('/api/v1/products/facets/', {'brand': 'yto'})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/v1/products/', {'brand': 'yto', 'fields': 'slug'})
+            self.client.get('/api/v1/products/facets/', {'brand': 'yto', 'omit': 'pricing'})
+        self.assertFalse([q for q in ctx.captured_queries if 'COUNT' in q['sql']])
+        self.assertEqual(len(ctx.captured_queries), 1)  # the sparse page itself
+
+    def test_cursor_pagination_and_detail(self):
+        page_size = ProductCursorPagination.page_size
+        ProductCursorPagination.page_size = 2
+        self.addCleanup(setattr, ProductCursorPagination, 'page_size', page_size)
+        with CaptureQueriesContext(connection) as ctx:
+            first = self.client.get('/api/v1/products/', {'cursor': '', 'fields': 'slug', 'ordering': 'view_count'})
+            second = self.client.get(first.data['next'])
+        self.assertEqual(len(second.data['results']), 1)
+        self.assertEqual(len(ctx.captured_queries), 2)  # no deferred loads for cursor positions
+
+        response = self.client.get('/api/v1/products/product-1/', {'fields': 'name,pricing,specifications_formatted'})
+        self.assertEqual(set(response.data), {'name', 'pricing', 'specifications_formatted'})
+        full = self.client.get('/api/v1/products/product-1/')
+        self.assertEqual(response.data['pricing'], full.data['pricing'])
+
+    def test_categories_and_brands(self):
+        response = self.client.get('/api/v1/categories/flat/', {'fields': 'slug,name'})
+        self.assertEqual(response.data, [{'slug': 'tractors', 'name': 'Тракторы'}])
+        response = self.client.get('/api/v1/brands/yto/', {'omit': 'product_count,description'})
+        self.assertNotIn('product_count', response.data)
+        self.assertEqual(response.data['name'], 'YTO')
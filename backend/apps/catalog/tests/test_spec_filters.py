@@ -0,0 +1,87 @@
+"""
+Tests for numeric specification range filters.
+"""
+
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from apps.catalog.models import Product, ProductSpecValue, Category, Brand, parse_spec_number
+
+
+class SpecRangeFilterTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        cls.brand = Brand.objects.create(name="YTO", slug="yto", country="Китай")
+        specs = {
+            'small': {'horsepower': {'value': 50, 'unit': 'л.с.'}, 'working_width': {'value': '2,5', 'unit': 'м'}},
+            'medium': {'horsepower': {'value': '120', 'unit': 'л.с.'}, 'engine_type': {'value': 'Дизель'}},
+            'large': {'horsepower': {'value': 240.5}, 'fuel_capacity': 400},
+            'none': {},
+        }
+        for slug, specifications in specs.items():
+            Product.objects.create(
+                sku=slug.upper(), slug=slug, name_ru=slug, specifications=specifications,
+                category=cls.category, brand=cls.brand, base_price_usd=1000,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def slugs(self, params):
+        response = self.client.get('/api/v1/products/', {**params, 'ordering': 'base_price_usd'})
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(p['slug'] for p in response.data['results'])
+
+    def test_numeric_specs_are_denormalized(self):
+        rows = ProductSpecValue.objects.order_by('product__slug', 'spec_key').values_list(
+            'product__slug', 'spec_key', 'numeric_value', 'unit'
+        )
+        self.assertEqual(list(rows), [
+            ('large', 'fuel_capacity', 400.0, ''),
+            ('large', 'horsepower', 240.5, ''),
+            ('medium', 'horsepower', 120.0, 'л.с.'),
+            ('small', 'horsepower', 50.0, 'л.с.'),
+            ('small', 'working_width', 2.5, 'м'),
+        ])
+
+    def test_parse_spec_number(self):
+        self.assertEqual(parse_spec_number('2,5'), 2.5)
+        self.assertEqual(parse_spec_number('1,200'), 1200.0)
+        self.assertEqual(parse_spec_number('12,500.75'), 12500.75)
+        self.assertEqual(parse_spec_number('1 200'), 1200.0)
+        self.assertEqual(parse_spec_number('1,2000'), 1.2)
+        self.assertEqual(parse_spec_number(7), 7.0)
+        for value in ('nan', 'inf', '-Infinity', float('nan'), 10 ** 400, True, 'Дизель', None):
+            self.assertIsNone(parse_spec_number(value), value)
+
+    def test_non_finite_specs_are_not_stored(self):
+        product = Product.objects.get(slug='none')
+        product.specifications = {'horsepower': {'value': 'NaN'}, 'fuel_capacity': 'inf', 'weight': '1,200'}
+        product.save()
+        self.assertEqual(
+            list(ProductSpecValue.objects.filter(product=product).values_list('spec_key', 'numeric_value')),
+            [('weight', 1200.0)],
+        )
+
+    def test_range_filters_on_any_spec(self):
+        self.assertEqual(self.slugs({'spec_horsepower_min': 100}), ['large', 'medium'])
+        self.assertEqual(self.slugs({'spec_horsepower_min': 100, 'spec_horsepower_max': 200}), ['medium'])
+        self.assertEqual(self.slugs({'spec_working_width_max': 3}), ['small'])
+        self.assertEqual(self.slugs({'spec_fuel_capacity_min': 300}), ['large'])
+        self.assertEqual(self.slugs({'spec_horsepower_max': 100, 'spec_fuel_capacity_min': 1}), [])
+        self.assertEqual(self.slugs({'spec_horsepower_min': ''}), ['large', 'medium', 'none', 'small'])
+
+    def test_invalid_value(self):
+        response = self.client.get('/api/v1/products/', {'spec_horsepower_min': 'много'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_kept_in_sync_on_save(self):
+        product = Product.objects.get(slug='none')
+        product.specifications = {'horsepower': {'value': 90}}
+        product.save(update_fields=['specifications'])
+        self.assertEqual(self.slugs({'spec_horsepower_min': 80, 'spec_horsepower_max': 100}), ['none'])
+
+        product.specifications = {}
+        product.save()
+        self.assertFalse(product.spec_values.exists())
@@ -0,0 +1,103 @@
+"""
+Tests for write-behind product view counts.
+"""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from apps.catalog.cache import get_version
+from apps.catalog import counters
+from apps.catalog.counters import flush_view_counts, record_view
+from apps.catalog.models import Product, Category, Brand
+
+
+class ViewCountTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        cls.brand = Brand.objects.create(name="YTO", slug="yto", country="Китай")
+        cls.products = [
+            Product.objects.create(
+                sku=f"P-{n}", slug=f"p-{n}", name_ru=f"Трактор {n}",
+                category=cls.category, brand=cls.brand, base_price_usd=1000, view_count=5,
+            )
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def view_counts(self):
+        return list(Product.objects.order_by('pk').values_list('view_count', flat=True))
+
+    def test_detail_view_is_write_free(self):
+        version = get_version('products')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/v1/products/p-0/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if not q['sql'].startswith('SELECT')])
+        self.assertEqual(get_version('products'), version)  # cached listings stay valid
+
+        self.assertEqual(self.view_counts(), [5, 5, 5])
+        flush_view_counts(grace=0)
+        self.assertEqual(self.view_counts(), [6, 5, 5])
+
+    def test_flush_batches_updates_by_count(self):
+        first, second, third = self.products
+        for _ in range(3):
+            record_view(first.pk)
+            record_view(second.pk)
+        record_view(third.pk)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(flush_view_counts(grace=0), 7)
+        self.assertEqual(len(ctx.captured_queries), 2)  # one UPDATE per distinct count
+        self.assertEqual(self.view_counts(), [8, 8, 6])
+
+        # Drained: nothing is written twice
+        self.assertEqual(flush_view_counts(grace=0), 0)
+        self.assertEqual(self.view_counts(), [8, 8, 6])
+
+    def test_views_between_flushes_go_to_the_next_one(self):
+        record_view(self.products[0].pk)
+        flush_view_counts(grace=0)
+        record_view(self.products[0].pk)
+        record_view(self.products[0].pk)
+        flush_view_counts(grace=0)
+        self.assertEqual(self.view_counts(), [8, 5, 5])
+
+    def test_failed_flush_never_counts_twice(self):
+        first, second, third = self.products
+        for pk in (first.pk, first.pk, second.pk, third.pk):
+            record_view(pk)
+        update, calls = QuerySet.update, []
+
+        def failing_update(queryset, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:  # the second UPDATE of the first batch
+                raise DatabaseError('connection lost')
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(counters, 'BATCH_SIZE', 2):
+            with mock.patch.object(QuerySet, 'update', failing_update), self.assertRaises(DatabaseError):
+                flush_view_counts(grace=0)
+            self.assertEqual(self.view_counts(), [7, 5, 5])
+            # The rest of the generation is written once; the failed count is lost
+            self.assertEqual(flush_view_counts(grace=0), 1)
+            self.assertEqual(flush_view_counts(grace=0), 0)
+        self.assertEqual(self.view_counts(), [7, 5, 6])
+
+    def test_command(self):
+        for product in self.products:
+            record_view(product.pk)
+        out = StringIO()
+        call_command('flush_view_counts', grace=0, stdout=out)
+        self.assertIn('3', out.getvalue())
+        self.assertEqual(self.view_counts(), [6, 6, 6])
@@ -0,0 +1,112 @@
+"""
+Category tree helpers.
+
+- build_category_tree(): loads all active categories and their active
+  product counts in a fixed number of queries and links them into a nested
+  structure, so serializing the category menu does not issue a query per node.
+- get_subtree_ids(): resolves category slugs to cached descendant id sets
+  for subtree filtering.
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .cache import make_key
+from .models import Category, Product
+
+SUBTREE_CACHE_TIMEOUT = 60 * 60
+
+
+def get_product_counts():
+    """
+    Get active product counts per category in one grouped query.
+    Returns {category_id: count}.
+    """
+    rows = (
+        Product.objects.filter(is_active=True)
+        .order_by()
+        .values_list('category_id')
+        .annotate(count=Count('id'))
+    )
+    return dict(rows)
+
+
+def build_category_tree(queryset=None):
+    """
+    Build the active category tree.
+
+    Costs two queries regardless of tree size: one fetch of all categories
+    and one grouped product count. Every returned category carries
+    `tree_children` (list of active child categories, in menu order) and
+    `tree_product_count` attributes, which `CategorySerializer` uses instead
+    of querying the database.
+
+    Returns the list of top-level categories.
+    """
+    if queryset is None:
+        queryset = Category.objects.filter(is_active=True)
+    categories = list(queryset.order_by('order', 'name_ru'))
+    counts = get_product_counts()
+
+    by_id = {}
+    for category in categories:
+        category.tree_children = []
+        category.tree_product_count = counts.get(category.id, 0)
+        by_id[category.id] = category
+
+    roots = []
+    for category in categories:
+        if category.parent_id is None:
+            roots.append(category)
+        elif category.parent_id in by_id:
+            by_id[category.parent_id].tree_children.append(category)
+
+    return roots
+
+
+def get_subtree_ids(slugs):
+    """
+    Resolve category slugs to the ids of the categories and all their
+    descendants.
+
+    Descendant sets are cached per slug in the 'categories' namespace, which
+    is invalidated on any category change. Cache misses cost at most two
+    queries (slug -> path, then one prefix scan over the path index) no
+    matter how deep the tree is. Unknown slugs resolve to nothing.
+    """
+    keys = {slug: make_key('categories', 'subtree', slug) for slug in slugs}
+    cached = cache.get_many(keys.values())
+
+    ids = set()
+    missing = []
+    for slug, key in keys.items():
+        if key in cached:
+            ids.update(cached[key])
+        else:
+            missing.append(slug)
+
+    if missing:
+        paths = dict(
+            Category.objects.filter(slug__in=missing).values_list('slug', 'path')
+        )
+        subtrees = {slug: [] for slug in missing}
+        prefixes = [path for path in paths.values() if path]
+        if prefixes:
+            rows = Category.objects.filter(
+                reduce(or_, (Q(path__startswith=prefix) for prefix in prefixes))
+            ).values_list('id', 'path')
+            for category_id, path in rows:
+                for slug, prefix in paths.items():
+                    if prefix and path.startswith(prefix):
+                        subtrees[slug].append(category_id)
+        cache.set_many(
+            {keys[slug]: subtree for slug, subtree in subtrees.items()},
+            SUBTREE_CACHE_TIMEOUT
+        )
+        for subtree in subtrees.values():
+            ids.update(subtree)
+
+    return sorted(ids)
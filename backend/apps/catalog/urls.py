@@ -10,6 +10,7 @@ from .views import (
     BrandViewSet,
     ProductViewSet,
     SearchView,
+    SuggestView,
 )
 
 router = DefaultRouter()
@@ -23,4 +24,5 @@ urlpatterns = [
     
     # Search
     path('search/', SearchView.as_view(), name='search'),
+    path('search/suggest/', SuggestView.as_view(), name='search-suggest'),
 ]
@@ -2,23 +2,75 @@
 Views for catalog app.
 """
 
+from dataclasses import asdict
+
 from rest_framework import viewsets, generics, status, throttling
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, BasePermission, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from django.conf import settings
+from django.core.cache import cache
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
 
-from .models import Category, Brand, Product
+from .models import Category, Brand, Product, ProductRecommendations
 from .serializers import (
     CategorySerializer, CategoryListSerializer,
     BrandSerializer, BrandListSerializer,
-    ProductListSerializer, ProductDetailSerializer
+    ProductListSerializer, ProductListRowSerializer, ProductDetailSerializer
+)
+from .cache import (
+    cache_catalog_response, conditional_catalog_response, get_pricing_visibility, get_query_cache_key,
+    get_request_language, get_versions,
 )
-from .filters import ProductFilter
+from .bulk_update import BulkUpdateError, apply_updates
+from .compare import build_spec_matrix
+from .counters import record_view
+from .export import CONTENT_TYPES, STREAMS, export_rows, write_xlsx
+from .facets import compute_facets
+from .featured import featured_brands, featured_products
+from .filters import ProductFilter, RelevanceOrderingFilter, is_search_truncated
+from .pagination import CachedCountPagination, ProductCursorPagination
+from .pricing import PricingContext
+from .search import get_search_backend, get_suggester
+from .tree import build_category_tree
+
+
+class ExportRateThrottle(throttling.UserRateThrottle):
+    scope = 'export'
+
+
+class CanChangeProducts(BasePermission):
+    """Staff with the `catalog.change_product` permission."""
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.has_perm('catalog.change_product'))
+
+
+class SparseFieldsQuerysetMixin:
+    """
+    Loads only the columns behind the fields selected with `?fields=` /
+    `?omit=` (see SparseFieldsMixin), and only the selected relations.
+    """
+    # Loaded regardless of the selection (e.g. read by keyset pagination)
+    always_load_fields = ()
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        get_only_fields = getattr(self.get_serializer_class(), 'get_only_fields', None)
+        only = get_only_fields(self.request) if get_only_fields and self.request else None
+        if only is None:
+            return queryset
+        related = [name for name in (queryset.query.select_related or {}) if name in only]
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only, *self.always_load_fields)
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(SparseFieldsQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for product categories.
     
@@ -37,7 +89,28 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
             return queryset.filter(parent__isnull=True).order_by('order')
         return queryset
     
+    @conditional_catalog_response('categories', 'products')
+    @cache_catalog_response('categories', 'products')
+    def list(self, request, *args, **kwargs):
+        """
+        List top-level categories with nested children.
+        The whole tree is assembled in memory from two queries.
+        """
+        roots = build_category_tree()
+        page = self.paginate_queryset(roots)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(roots, many=True)
+        return Response(serializer.data)
+    
+    @conditional_catalog_response('categories', 'products')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     @action(detail=False, methods=['get'])
+    @conditional_catalog_response('categories')
+    @cache_catalog_response('categories')
     def flat(self, request):
         """
         Get flat list of all categories (for filters).
@@ -48,7 +121,7 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class BrandViewSet(viewsets.ReadOnlyModelViewSet):
+class BrandViewSet(SparseFieldsQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for brands/manufacturers.
     
@@ -64,93 +137,257 @@ class BrandViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ['name', 'country']
     ordering = ['name']
     
+    @conditional_catalog_response('brands', 'products')
+    @cache_catalog_response('brands', 'products')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @conditional_catalog_response('brands', 'products')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     @action(detail=False, methods=['get'])
+    @conditional_catalog_response('brands')
     def featured(self, request):
         """
         Get featured brands.
         GET /api/v1/brands/featured/
+        
+        Served from the materialized payload (see apps.catalog.featured).
         """
-        brands = Brand.objects.filter(is_active=True, is_featured=True)
-        serializer = BrandListSerializer(brands, many=True, context={'request': request})
-        return Response(serializer.data)
+        return Response(featured_brands(request))
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(SparseFieldsQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for products.
     
     GET /api/v1/products/ - List products with filtering
+    GET /api/v1/products/?cursor= - Same, with cursor pagination (infinite scroll)
+    GET /api/v1/products/?fields=id,slug,name - Only these fields (or ?omit=pricing)
+    GET /api/v1/products/?search=... - By relevance; `search_truncated: true` when
+        the search backend capped the matches (the count is then a lower bound)
     GET /api/v1/products/{slug}/ - Product detail
     """
     queryset = Product.objects.filter(is_active=True).select_related('category', 'brand')
     permission_classes = [AllowAny]
     lookup_field = 'slug'
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # `search` is handled by ProductFilter through the search backend
+    filter_backends = [DjangoFilterBackend, RelevanceOrderingFilter]
     filterset_class = ProductFilter
-    search_fields = ['name_ru', 'name_en', 'sku', 'short_description_ru']
+    pagination_class = CachedCountPagination
     ordering_fields = ['base_price_usd', 'created_at', 'name_ru', 'view_count']
     ordering = ['-created_at']
+    always_load_fields = ordering_fields
+    
+    @property
+    def paginator(self):
+        """Switch to keyset pagination when the client sends `cursor`."""
+        if not hasattr(self, '_paginator'):
+            cursor_param = ProductCursorPagination.cursor_query_param
+            if self.request is not None and cursor_param in self.request.query_params:
+                self._paginator = ProductCursorPagination()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return ProductDetailSerializer
         return ProductListSerializer
     
+    @conditional_catalog_response('products', 'categories', 'brands')
+    @cache_catalog_response('products', 'categories', 'brands')
+    def list(self, request, *args, **kwargs):
+        response = self._list(request, *args, **kwargs)
+        if is_search_truncated(request):
+            # The search backend capped the matches: results and count are partial
+            response.data['search_truncated'] = True
+        return response
+    
+    def _list(self, request, *args, **kwargs):
+        if ProductListSerializer.get_only_fields(request) is not None:
+            return super().list(request, *args, **kwargs)
+        
+        # Every field selected: serialize value rows, not model instances
+        serializer = ProductListRowSerializer(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = serializer.get_rows(queryset, extra_columns=self.ordering_fields)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+    
+    @conditional_catalog_response('products', 'categories', 'brands')
     def retrieve(self, request, *args, **kwargs):
-        """Get product detail and increment view count."""
+        """Get product detail and count the view (revalidations are not counted)."""
         instance = self.get_object()
         
-        # Increment view count
-        instance.view_count += 1
-        instance.save(update_fields=['view_count'])
+        # Buffered in the cache; `manage.py flush_view_counts` writes it
+        record_view(instance.pk)
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @conditional_catalog_response('products', 'categories', 'brands')
     def featured(self, request):
         """
         Get featured products.
         GET /api/v1/products/featured/
+        
+        Served from the materialized payload (see apps.catalog.featured)
+        with the user's prices applied.
         """
-        products = self.get_queryset().filter(is_featured=True)[:12]
-        serializer = ProductListSerializer(products, many=True, context={'request': request})
-        return Response(serializer.data)
+        return Response(featured_products(request))
+    
+    @action(detail=False, methods=['get'])
+    @conditional_catalog_response('products', 'categories', 'brands')
+    def facets(self, request):
+        """
+        Facet counts for the filter sidebar, for the same filters as the list.
+        GET /api/v1/products/facets/?category=tractors&min_price=1000
+        
+        Cached per normalized filter set and language, for all users.
+        """
+        key = get_query_cache_key(
+            'facets', request, ('products', 'categories', 'brands'),
+            ignored=('page', 'page_size', 'cursor', 'ordering', 'fields', 'omit'),
+        )
+        data = cache.get(key)
+        if data is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            data = compute_facets(queryset, get_request_language(request))
+            cache.set(key, data, settings.CATALOG_CACHE_TIMEOUT)
+        return Response(data)
     
     @action(detail=True, methods=['get'])
+    @conditional_catalog_response('products', 'categories', 'brands')
     def related(self, request, slug=None):
         """
         Get related products (same category).
         GET /api/v1/products/{slug}/related/
+        
+        Precomputed by `manage.py build_recommendations`; products not built
+        yet fall back to the newest products of the category.
         """
-        product = self.get_object()
-        related = self.get_queryset().filter(
-            category=product.category
-        ).exclude(id=product.id)[:6]
+        related_ids = ProductRecommendations.objects.filter(
+            product__slug=slug, product__is_active=True
+        ).values_list('related_ids', flat=True).first()
+        if related_ids is not None:
+            products = self.get_queryset().in_bulk(related_ids[:6])
+            related = [products[pk] for pk in related_ids[:6] if pk in products]
+        else:
+            product = self.get_object()
+            related = self.get_queryset().filter(
+                category=product.category
+            ).exclude(id=product.id)[:6]
         serializer = ProductListSerializer(related, many=True, context={'request': request})
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @conditional_catalog_response('products', 'categories', 'brands')
     def compare(self, request):
         """
         Compare products by IDs.
         GET /api/v1/products/compare/?ids=1,2,3
+        
+        Returns the products in the requested order (listing payloads) and an
+        aligned spec matrix (see apps.catalog.compare), cached per host, id
+        set, language and pricing tier.
         """
         ids = request.query_params.get('ids', '')
         if not ids:
             return Response({'error': 'Укажите параметр ids'}, status=400)
         
         try:
-            product_ids = [int(id.strip()) for id in ids.split(',')]
+            product_ids = list(dict.fromkeys(int(id.strip()) for id in ids.split(',')))
         except ValueError:
             return Response({'error': 'Некорректный формат ids'}, status=400)
         
         if len(product_ids) > 4:
             return Response({'error': 'Максимум 4 товара для сравнения'}, status=400)
         
-        products = self.get_queryset().filter(id__in=product_ids)
-        serializer = ProductDetailSerializer(products, many=True, context={'request': request})
-        return Response(serializer.data)
+        lang = get_request_language(request)
+        # Payloads carry absolute image URLs: one entry per host, like the response cache
+        key = 'catalog:compare:{}:{}:{}:{}:{}'.format(
+            get_versions(('products', 'categories', 'brands')), request.get_host(),
+            '.'.join(map(str, sorted(product_ids))), lang, get_pricing_visibility(request),
+        )
+        data = cache.get(key)
+        if data is None:
+            # One query: listing columns plus specifications, no nested serializers
+            serializer = ProductListRowSerializer(request)
+            rows = serializer.get_rows(
+                Product.objects.filter(is_active=True, id__in=product_ids).order_by('pk'),
+                extra_columns=['specifications']
+            )
+            data = {
+                'products': serializer.serialize(rows),
+                'specs': build_spec_matrix([row.specifications for row in rows], lang),
+            }
+            cache.set(key, data, settings.CATALOG_CACHE_TIMEOUT)
+        
+        # Built in id order; answer in the requested one
+        order = {pk: index for index, pk in enumerate(product_ids)}
+        positions = sorted(range(len(data['products'])), key=lambda i: order[data['products'][i]['id']])
+        return Response({
+            'products': [data['products'][i] for i in positions],
+            'specs': [{**row, 'values': [row['values'][i] for i in positions]} for row in data['specs']],
+        })
+    
+    @action(
+        detail=False, methods=['get'], url_path=r'export/(?P<file_format>csv|ndjson|xlsx)',
+        permission_classes=[IsAuthenticated], throttle_classes=[ExportRateThrottle],
+    )
+    def export(self, request, file_format):
+        """
+        Full catalog for the same filters as the list, at the user's prices.
+        GET /api/v1/products/export/csv/?category=tractors  (or ndjson, xlsx)
+        
+        Streamed from a server-side cursor (see apps.catalog.export).
+        `X-Search-Truncated: true` when the search backend capped the matches.
+        """
+        rows = export_rows(
+            self.filter_queryset(self.get_queryset()).select_related(None),
+            PricingContext.for_request(request), get_request_language(request), request,
+        )
+        filename = f'uzagro-products.{file_format}'
+        if file_format == 'xlsx':
+            response = FileResponse(
+                write_xlsx(rows), as_attachment=True, filename=filename,
+                content_type=CONTENT_TYPES[file_format],
+            )
+        else:
+            response = StreamingHttpResponse(
+                STREAMS[file_format](rows), content_type=CONTENT_TYPES[file_format]
+            )
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        if is_search_truncated(request):
+            response['X-Search-Truncated'] = 'true'
+        return response
+    
+    @action(
+        detail=False, methods=['post'], url_path='bulk-update',
+        permission_classes=[CanChangeProducts], throttle_classes=[],
+    )
+    def bulk_update(self, request):
+        """
+        Update prices and stock of many products in one transaction.
+        POST /api/v1/products/bulk-update/
+        {"rows": [{"sku": "YTO-904", "base_price_usd": "9500", "stock_quantity": 3}], "dry_run": false}
+        
+        Nothing is written if a row is invalid (400 with per-row errors).
+        Returns the diff (see apps.catalog.bulk_update).
+        """
+        data = request.data if isinstance(request.data, dict) else {'rows': request.data}
+        try:
+            result = apply_updates(data.get('rows'), dry_run=bool(data.get('dry_run')))
+        except BulkUpdateError as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(asdict(result))
 
 
 class SearchView(generics.GenericAPIView):
@@ -158,8 +395,8 @@ class SearchView(generics.GenericAPIView):
     Global search endpoint.
     GET /api/v1/search/?q=traktor
     
-    NOTE: This is a simple implementation.
-    In production, use MeiliSearch for better results.
+    Products are matched and ranked by the configured search backend
+    (see apps.catalog.search).
     """
     permission_classes = [AllowAny]
     throttle_classes = [throttling.ScopedRateThrottle]
@@ -179,27 +416,23 @@ class SearchView(generics.GenericAPIView):
                 'brands': []
             })
         
-        # Search products
-        products = Product.objects.filter(
-            is_active=True
-        ).filter(
-            models.Q(name_ru__icontains=query) |
-            models.Q(name_en__icontains=query) |
-            models.Q(sku__icontains=query)
-        )[:10]
+        backend = get_search_backend()
+        
+        # Search products (ranked by relevance)
+        products = backend.search_products(
+            Product.objects.filter(is_active=True).select_related('category', 'brand'),
+            query, limit=10
+        )
         
         # Search categories
-        categories = Category.objects.filter(
-            is_active=True
-        ).filter(
-            models.Q(name_ru__icontains=query) |
-            models.Q(name_en__icontains=query)
-        )[:5]
+        categories = backend.search_categories(
+            Category.objects.filter(is_active=True), query, limit=5
+        )
         
         # Search brands
-        brands = Brand.objects.filter(
-            is_active=True
-        ).filter(name__icontains=query)[:5]
+        brands = backend.search_brands(
+            Brand.objects.filter(is_active=True), query, limit=5
+        )
         
         return Response({
             'products': ProductListSerializer(products, many=True, context={'request': request}).data,
@@ -208,5 +441,32 @@ class SearchView(generics.GenericAPIView):
         })
 
 
-# Import models for Q objects
-from django.db import models
+class SuggestView(generics.GenericAPIView):
+    """
+    Search-as-you-type suggestions.
+    GET /api/v1/search/suggest/?q=tra
+
+    Served from the in-memory prefix index (apps.catalog.search.suggest):
+    no database queries, small payload, cacheable by browsers and proxies.
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = [throttling.ScopedRateThrottle]
+    throttle_scope = 'suggest'
+    max_age = 60
+    max_limit = 20
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()[:100]
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.max_limit)
+        except ValueError:
+            limit = 10
+
+        results = []
+        if len(query) >= 2:
+            results = get_suggester().suggest(query, get_request_language(request), limit)
+
+        response = Response({'results': results})
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        patch_vary_headers(response, ['Accept-Language'])
+        return response
@@ -0,0 +1,14 @@
+"""
+Admin configuration for core app.
+"""
+
+from django.contrib import admin
+from .models import ExchangeRate
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ['currency', 'rate', 'date', 'source', 'created_at']
+    list_filter = ['currency', 'source']
+    date_hierarchy = 'date'
+    ordering = ['-date', '-created_at']
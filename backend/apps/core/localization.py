@@ -0,0 +1,84 @@
+"""
+Request language and translated model fields.
+
+The language is resolved once per request, the same way as Django's
+LocaleMiddleware (language cookie, then `Accept-Language` with q-values,
+then LANGUAGE_CODE), and reduced to one of settings.LANGUAGES:
+
+    lang = get_language(request)           # 'ru', 'uz' or 'en'
+    NAME = Translation('name')             # name_ru / name_uz / name_en
+    NAME.get(category, lang)               # falls back to name_ru if empty
+"""
+
+from operator import attrgetter
+
+from django.conf import settings
+from django.utils import translation
+
+LANGUAGE_CODES = tuple(code for code, _ in settings.LANGUAGES)
+DEFAULT_LANGUAGE = settings.LANGUAGE_CODE
+
+
+def normalize_language(code):
+    """Supported language code for a language tag ('en-us' -> 'en'), or the default."""
+    code = (code or '').lower()
+    if code in LANGUAGE_CODES:
+        return code
+    code = code.split('-')[0]
+    return code if code in LANGUAGE_CODES else DEFAULT_LANGUAGE
+
+
+def get_language(request=None):
+    """Language of a request, resolved once and memoized on it."""
+    if request is None:
+        return DEFAULT_LANGUAGE
+    # Store on the underlying HttpRequest so DRF views and serializers share it
+    http_request = getattr(request, '_request', request)
+    lang = getattr(http_request, 'language', None)
+    if lang is None:
+        code = getattr(http_request, 'LANGUAGE_CODE', None) or translation.get_language_from_request(http_request)
+        lang = http_request.language = normalize_language(code)
+    return lang
+
+
+class LocalizationMiddleware:
+    """
+    Sets `request.language` (see get_language). Goes after LocaleMiddleware,
+    whose choice it reuses.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        get_language(request)
+        return self.get_response(request)
+
+
+class Translation:
+    """
+    Accessors of a translated field (`name` -> `name_ru`, `name_uz`,
+    `name_en`), built once. Works on model instances and on named value
+    rows (`Translation('category__name')`).
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.fields = tuple(f'{field}_{lang}' for lang in LANGUAGE_CODES)
+        self.getters = {lang: attrgetter(name) for lang, name in zip(LANGUAGE_CODES, self.fields)}
+        self.default = self.getters[DEFAULT_LANGUAGE]
+
+    def __repr__(self):
+        return f'<Translation {self.field}>'
+
+    def getter(self, lang):
+        """obj -> value in `lang`, falling back to the default language if empty."""
+        default = self.default
+        get = self.getters.get(lang, default)
+        if get is default:
+            return default
+        return lambda obj: get(obj) or default(obj)
+
+    def get(self, obj, lang=DEFAULT_LANGUAGE):
+        value = self.getters.get(lang, self.default)(obj)
+        return value if value else self.default(obj)
@@ -0,0 +1,38 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.models import ExchangeRate
+from apps.core.utils.currency import get_rate_fetcher
+
+
+class Command(BaseCommand):
+    help = 'Fetches the current USD/UZS rate and stores it in the rate history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rate', help='Set the rate manually instead of fetching it')
+
+    def handle(self, *args, **options):
+        if options['rate']:
+            try:
+                rate = Decimal(options['rate'])
+            except InvalidOperation:
+                raise CommandError(f"Некорректный курс: {options['rate']}")
+            source = ExchangeRate.Source.MANUAL
+        else:
+            fetcher = get_rate_fetcher()
+            try:
+                rate = fetcher.fetch('USD')
+            except Exception as exc:
+                raise CommandError(f'Не удалось получить курс: {exc}')
+            source = fetcher.source
+
+        # Saving refreshes the shared rate cache (see apps.catalog.signals)
+        exchange_rate, created = ExchangeRate.objects.update_or_create(
+            currency='USD',
+            date=timezone.localdate(),
+            source=source,
+            defaults={'rate': rate}
+        )
+        self.stdout.write(self.style.SUCCESS(f'USD/UZS: {exchange_rate.rate} ({source})'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('currency', models.CharField(default='USD', max_length=3, verbose_name='Валюта')),
+                ('rate', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Курс (UZS)')),
+                ('date', models.DateField(db_index=True, verbose_name='Дата курса')),
+                ('source', models.CharField(choices=[('cbu', 'ЦБ Узбекистана'), ('manual', 'Вручную'), ('stub', 'Заглушка')], default='manual', max_length=20, verbose_name='Источник')),
+            ],
+            options={
+                'verbose_name': 'Курс валюты',
+                'verbose_name_plural': 'Курсы валют',
+                'db_table': 'exchange_rates',
+                'ordering': ['-date', '-created_at'],
+                'indexes': [models.Index(fields=['currency', '-date', '-created_at'], name='exchange_ra_currenc_f5700d_idx')],
+            },
+        ),
+    ]
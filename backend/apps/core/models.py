@@ -55,3 +55,37 @@ class ActiveMixin(models.Model):
     def get_active(cls):
         """Get only active items."""
         return cls.objects.filter(is_active=True)
+
+
+class ExchangeRate(TimestampedModel):
+    """
+    Currency exchange rate history (UZS per unit of currency).
+    The latest row per currency is the current rate.
+    """
+    
+    class Source(models.TextChoices):
+        CBU = 'cbu', 'ЦБ Узбекистана'
+        MANUAL = 'manual', 'Вручную'
+        STUB = 'stub', 'Заглушка'
+    
+    currency = models.CharField('Валюта', max_length=3, default='USD')
+    rate = models.DecimalField('Курс (UZS)', max_digits=12, decimal_places=2)
+    date = models.DateField('Дата курса', db_index=True)
+    source = models.CharField(
+        'Источник',
+        max_length=20,
+        choices=Source.choices,
+        default=Source.MANUAL
+    )
+    
+    class Meta:
+        db_table = 'exchange_rates'
+        verbose_name = 'Курс валюты'
+        verbose_name_plural = 'Курсы валют'
+        ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['currency', '-date', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.currency}/UZS {self.rate} ({self.date})"
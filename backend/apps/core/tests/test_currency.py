@@ -0,0 +1,87 @@
+"""
+Tests for the exchange rate service.
+"""
+
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from apps.catalog.models import Product, Category, Brand
+from apps.core.models import ExchangeRate
+from apps.core.utils.currency import CurrencyService, DEFAULT_USD_UZS_RATE
+
+
+class CurrencyServiceTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        CurrencyService.clear_local_cache()
+
+    def tearDown(self):
+        # The test database is rolled back; don't leak its rate into other tests
+        cache.clear()
+        CurrencyService.clear_local_cache()
+
+    def test_default_rate_without_history(self):
+        self.assertEqual(CurrencyService.get_usd_uzs_rate(), DEFAULT_USD_UZS_RATE)
+
+    def test_latest_rate_read_once_then_cached(self):
+        ExchangeRate.objects.create(rate=Decimal('12650.00'), date=datetime.date(2026, 1, 1))
+        ExchangeRate.objects.create(rate=Decimal('12700.00'), date=datetime.date(2026, 1, 2))
+        CurrencyService.clear_local_cache()
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(CurrencyService.get_usd_uzs_rate(), Decimal('12700.00'))
+        with self.assertNumQueries(0):
+            self.assertEqual(CurrencyService.get_usd_uzs_rate(), Decimal('12700.00'))
+
+        # Another worker: empty local cache, shared cache still warm
+        CurrencyService.clear_local_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(CurrencyService.get_usd_uzs_rate(), Decimal('12700.00'))
+
+    def test_new_rate_written_through(self):
+        self.assertEqual(CurrencyService.get_usd_uzs_rate(), DEFAULT_USD_UZS_RATE)
+        with self.assertNumQueries(2):  # insert + one read of the latest rate
+            ExchangeRate.objects.create(rate=Decimal('13000.00'), date=datetime.date(2026, 2, 1))
+        with self.assertNumQueries(0):
+            self.assertEqual(CurrencyService.get_usd_uzs_rate(), Decimal('13000.00'))
+
+    def test_other_workers_see_new_rate_at_once(self):
+        self.assertEqual(CurrencyService.get_usd_uzs_rate(), DEFAULT_USD_UZS_RATE)
+        stale = CurrencyService._local
+        ExchangeRate.objects.create(rate=Decimal('13100.00'), date=datetime.date(2026, 3, 1))
+        # Another worker still holds its in-process copy of the old rate
+        CurrencyService._local = stale
+        with self.assertNumQueries(0):
+            self.assertEqual(CurrencyService.get_usd_uzs_rate(), Decimal('13100.00'))
+
+    @override_settings(
+        CURRENCY_RATE_FETCHER='apps.core.utils.currency.StubRateFetcher',
+        CURRENCY_STUB_RATE='12950.5'
+    )
+    def test_update_command_with_stub_fetcher(self):
+        call_command('update_exchange_rate', stdout=StringIO())
+        rate = ExchangeRate.objects.get()
+        self.assertEqual(rate.rate, Decimal('12950.50'))
+        self.assertEqual(rate.source, 'stub')
+        self.assertEqual(self.client.get('/api/v1/exchange-rate/').data['rate'], 12950.5)
+
+    def test_listing_prices_follow_rate(self):
+        category = Category.objects.create(name_ru="Тракторы", slug="tractors")
+        brand = Brand.objects.create(name="YTO", slug="yto", country="China")
+        Product.objects.create(
+            sku="SKU-1", slug="product-1", name_ru="Трактор", category=category,
+            brand=brand, base_price_usd=Decimal('100.00'), show_price_to_guests=True,
+        )
+        response = self.client.get('/api/v1/products/')
+        self.assertEqual(response.data['results'][0]['pricing']['price_uzs'], 1280000)
+
+        call_command('update_exchange_rate', rate='13000', stdout=StringIO())
+        response = self.client.get('/api/v1/products/')
+        self.assertEqual(response.data['results'][0]['pricing']['price_uzs'], 1300000)
@@ -0,0 +1,57 @@
+"""
+Tests for request language resolution and translated fields.
+"""
+
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase
+from rest_framework.test import APITestCase
+from apps.catalog.models import Category
+from apps.core.localization import Translation, get_language, normalize_language
+
+
+class GetLanguageTests(SimpleTestCase):
+
+    def language(self, header):
+        return get_language(RequestFactory().get('/', HTTP_ACCEPT_LANGUAGE=header))
+
+    def test_accept_language_header(self):
+        self.assertEqual(self.language('en'), 'en')
+        self.assertEqual(self.language('en-US,en;q=0.9'), 'en')
+        self.assertEqual(self.language('de-DE,uz;q=0.8,ru;q=0.5'), 'uz')
+        self.assertEqual(self.language('de'), 'ru')
+        self.assertEqual(self.language(''), 'ru')
+        self.assertEqual(get_language(None), 'ru')
+
+    def test_normalize(self):
+        self.assertEqual(normalize_language('UZ'), 'uz')
+        self.assertEqual(normalize_language('en-gb'), 'en')
+        self.assertEqual(normalize_language('ruthenian'), 'ru')
+        self.assertEqual(normalize_language(None), 'ru')
+
+    def test_resolved_once(self):
+        request = RequestFactory().get('/', HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual(get_language(request), 'en')
+        request.META['HTTP_ACCEPT_LANGUAGE'] = 'uz'
+        self.assertEqual(get_language(request), 'en')
+
+    def test_translation_fallback(self):
+        name = Translation('name')
+        category = Category(name_ru="Тракторы", name_uz="", name_en="Tractors")
+        self.assertEqual(name.get(category, 'en'), "Tractors")
+        self.assertEqual(name.get(category, 'uz'), "Тракторы")
+        self.assertEqual(name.get(category, 'de'), "Тракторы")
+        self.assertEqual(name.getter('en')(category), "Tractors")
+        self.assertEqual(name.fields, ('name_ru', 'name_uz', 'name_en'))
+
+
+class LocalizedResponseTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        Category.objects.create(name_ru="Тракторы", name_en="Tractors", slug="tractors")
+
+    def test_browser_header(self):
+        response = self.client.get('/api/v1/categories/flat/', HTTP_ACCEPT_LANGUAGE='en-US,en;q=0.9')
+        self.assertEqual(response.data[0]['name'], "Tractors")
+        response = self.client.get('/api/v1/categories/flat/', HTTP_ACCEPT_LANGUAGE='fr-FR,fr;q=0.9')
+        self.assertEqual(response.data[0]['name'], "Тракторы")
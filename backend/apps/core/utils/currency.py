@@ -0,0 +1,114 @@
+"""
+USD/UZS exchange rate service.
+
+The current rate lives in the shared Django cache (Redis in production),
+refreshed write-through whenever an ExchangeRate row is saved, so request
+handling never hits the network and rarely the database. Every read checks
+the shared value (callers such as PricingContext read it once per request):
+a worker never prices with a rate another worker has already replaced,
+which would otherwise end up in catalog payloads cached under the new
+version. The in-process copy only saves re-parsing an unchanged value.
+
+Only when the shared cache is empty is the latest ExchangeRate row read; if
+there is none, DEFAULT_USD_UZS_RATE is used. New rates are fetched outside requests
+by `manage.py update_exchange_rate`, through the fetcher configured in
+settings.CURRENCY_RATE_FETCHER (the CBU API or a local stub).
+"""
+
+import json
+import threading
+import urllib.request
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+DEFAULT_USD_UZS_RATE = Decimal('12800')
+
+
+class CBURateFetcher:
+    """Fetch the official rate from the Central Bank of Uzbekistan API."""
+    
+    CBU_URL = 'https://cbu.uz/uz/arkhiv-kursov-valyut/json/'
+    TIMEOUT = 10
+    source = 'cbu'
+    
+    def fetch(self, currency='USD'):
+        with urllib.request.urlopen(self.CBU_URL, timeout=self.TIMEOUT) as response:
+            data = json.load(response)
+        for item in data:
+            if item.get('Ccy') == currency:
+                try:
+                    return Decimal(str(item['Rate']))
+                except (KeyError, InvalidOperation):
+                    break
+        raise ValueError(f'Курс {currency} не найден в ответе ЦБ')
+
+
+class StubRateFetcher:
+    """Local stand-in returning settings.CURRENCY_STUB_RATE."""
+    
+    source = 'stub'
+    
+    def fetch(self, currency='USD'):
+        return Decimal(str(getattr(settings, 'CURRENCY_STUB_RATE', DEFAULT_USD_UZS_RATE)))
+
+
+def get_rate_fetcher():
+    """Instantiate the fetcher configured in settings."""
+    return import_string(settings.CURRENCY_RATE_FETCHER)()
+
+
+class CurrencyService:
+    """Fetch and cache USD/UZS exchange rate"""
+    
+    CACHE_KEY = 'currency:usd_uzs_rate'
+    CACHE_TTL = 60 * 60 * 24
+    
+    _local = None  # (shared cache value, rate)
+    _lock = threading.Lock()
+    
+    @classmethod
+    def get_usd_uzs_rate(cls):
+        """Get current USD to UZS rate."""
+        cached = cache.get(cls.CACHE_KEY)
+        local = cls._local
+        if cached is not None and local is not None and local[0] == cached:
+            return local[1]
+        
+        if cached is not None:
+            rate = Decimal(cached)
+        else:
+            rate = cls._load_latest_rate()
+            cached = str(rate)
+            # add(): concurrent misses don't overwrite a fresher write-through value
+            cache.add(cls.CACHE_KEY, cached, cls.CACHE_TTL)
+        
+        with cls._lock:
+            cls._local = (cached, rate)
+        return rate
+    
+    @classmethod
+    def _load_latest_rate(cls):
+        from apps.core.models import ExchangeRate
+        rate = (
+            ExchangeRate.objects.filter(currency='USD')
+            .order_by('-date', '-created_at')
+            .values_list('rate', flat=True)
+            .first()
+        )
+        return rate if rate is not None else DEFAULT_USD_UZS_RATE
+    
+    @classmethod
+    def refresh(cls):
+        """Re-read the latest rate into the shared cache (write-through)."""
+        rate = cls._load_latest_rate()
+        cache.set(cls.CACHE_KEY, str(rate), cls.CACHE_TTL)
+        cls.clear_local_cache()
+        return rate
+    
+    @classmethod
+    def clear_local_cache(cls):
+        with cls._lock:
+            cls._local = None
@@ -0,0 +1,24 @@
+"""
+Views for core app.
+"""
+
+from rest_framework import generics
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .utils.currency import CurrencyService
+
+
+class ExchangeRateView(generics.GenericAPIView):
+    """
+    Current USD/UZS exchange rate.
+    GET /api/v1/exchange-rate/
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        rate = CurrencyService.get_usd_uzs_rate()
+        return Response({
+            'currency': 'USD',
+            'rate': float(rate),
+        })
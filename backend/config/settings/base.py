@@ -40,6 +40,7 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
+    'apps.core.localization.LocalizationMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -135,9 +136,29 @@ REST_FRAMEWORK = {
         'auth': '10/hour',
         'verification': '5/hour',
         'search': '20/minute',
+        'suggest': '300/minute',
+        'export': '30/hour',
     },
 }
 
+# Catalog response cache for anonymous listings (seconds)
+CATALOG_CACHE_TIMEOUT = int(os.environ.get('CATALOG_CACHE_TIMEOUT', 300))
+
+# Product search backend (dotted path). Empty = pick by database vendor:
+# PostgreSQL full-text + trigram, SQLite FTS5, else plain icontains.
+CATALOG_SEARCH_BACKEND = os.environ.get('CATALOG_SEARCH_BACKEND', '')
+
+# Embedded search engine: snapshot file (empty = build from the database on
+# start) and how often workers check for saves made by other workers (seconds)
+CATALOG_SEARCH_SNAPSHOT = os.environ.get('CATALOG_SEARCH_SNAPSHOT', '')
+CATALOG_SEARCH_SYNC_INTERVAL = int(os.environ.get('CATALOG_SEARCH_SYNC_INTERVAL', 5))
+
+# Exchange rate fetcher used by `manage.py update_exchange_rate`
+CURRENCY_RATE_FETCHER = os.environ.get(
+    'CURRENCY_RATE_FETCHER', 'apps.core.utils.currency.CBURateFetcher'
+)
+CURRENCY_STUB_RATE = os.environ.get('CURRENCY_STUB_RATE', '12800')
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -25,6 +25,9 @@ CACHES = {
     }
 }
 
+# Exchange rate - local stub instead of the CBU API
+CURRENCY_RATE_FETCHER = 'apps.core.utils.currency.StubRateFetcher'
+
 # Email - Console backend for development
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
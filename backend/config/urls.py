@@ -16,6 +16,7 @@ urlpatterns = [
     path('api/v1/', include([
         path('', include('apps.catalog.urls')),
         path('', include('apps.accounts.urls')),
+        path('', include('apps.core.urls')),
     ])),
     
     # API Documentation
@@ -60,13 +60,21 @@ export const catalogApi = {
     // Products
     getProducts: (params?: ProductsParams) =>
         apiFetch<PaginatedResponse<Product>>('/products/', { params }),
+    getProductFacets: (params?: ProductsParams) =>
+        apiFetch<ProductFacets>('/products/facets/', { params }),
     getProduct: (slug: string) => apiFetch<ProductDetail>(`/products/${slug}/`),
     getFeaturedProducts: () => apiFetch<Product[]>('/products/featured/'),
     getRelatedProducts: (slug: string) => apiFetch<Product[]>(`/products/${slug}/related/`),
+    compareProducts: (ids: number[]) =>
+        apiFetch<ProductComparison>('/products/compare/', { params: { ids: ids.join(',') } }),
 
     // Search
     search: (query: string) =>
         apiFetch<SearchResults>('/search/', { params: { q: query } }),
+
+    // Search-as-you-type suggestions (cheap, cacheable)
+    suggest: (query: string, limit?: number) =>
+        apiFetch<{ results: Suggestion[] }>('/search/suggest/', { params: { q: query, limit } }),
 };
 
 /**
@@ -142,6 +150,7 @@ export interface PaginatedResponse<T> {
     next: string | null;
     previous: string | null;
     results: T[];
+    search_truncated?: boolean;  // search matches were capped; count is a lower bound
 }
 
 export interface ProductsParams {
@@ -162,3 +171,48 @@ export interface SearchResults {
     categories: Category[];
     brands: Brand[];
 }
+
+export interface FacetCount {
+    slug: string;
+    name: string;
+    count: number;
+}
+
+export interface ChoiceCount {
+    value: string;
+    label: string;
+    count: number;
+}
+
+export interface ProductFacets {
+    count: number;
+    brands: FacetCount[];
+    categories: FacetCount[];
+    product_types: ChoiceCount[];
+    stock_statuses: ChoiceCount[];
+    price: {
+        min: number | null;
+        max: number | null;
+        histogram: { from: number; to: number; count: number }[];
+    };
+    specs: { key: string; min: number; max: number; unit: string; count: number }[];
+}
+
+export interface ProductComparison {
+    products: Product[];
+    // One row per spec key; `values` follow `products` (null = not specified)
+    specs: {
+        key: string;
+        label: string;
+        unit: string;
+        values: (number | string | null)[];
+        differs: boolean;
+    }[];
+}
+
+export interface Suggestion {
+    id: number;
+    label: string;
+    type: 'product' | 'category' | 'brand';
+    slug: string;
+}
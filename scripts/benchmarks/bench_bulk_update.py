@@ -0,0 +1,74 @@
+"""
+Benchmark: daily price/stock update, per-product save() vs one batch.
+
+Applies the same supplier update (new prices and stock for every product)
+with a loop of `product.save()` calls, which fires the cache and search
+signals per row, and with apps.catalog.bulk_update.apply_updates().
+
+Usage:
+    python scripts/benchmarks/bench_bulk_update.py [rows]
+"""
+
+import random
+import sys
+import time
+
+from common import setup_database
+
+from apps.catalog.bulk_update import apply_updates
+from apps.catalog.models import Brand, Category, Product
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+
+def make_rows(seed):
+    rng = random.Random(seed)
+    return [
+        {
+            'sku': f'X{n:06d}', 'base_price_usd': str(rng.randint(100, 50000)),
+            'retail_price_usd': str(rng.randint(100, 60000)), 'stock_quantity': rng.randint(0, 50),
+            'stock_status': rng.choice(['in_stock', 'out_of_stock']),
+        }
+        for n in range(ROWS)
+    ]
+
+
+def per_row(rows):
+    for row in rows:
+        product = Product.objects.get(sku=row['sku'])
+        for name, value in row.items():
+            setattr(product, name, value)
+        product.save()
+
+
+def batch(rows):
+    apply_updates(rows)
+
+
+def main():
+    teardown = setup_database()
+    try:
+        category = Category.objects.create(name_ru='Тракторы', slug='tractors')
+        brand = Brand.objects.create(name='YTO', slug='yto', country='Китай')
+        Product.objects.bulk_create(
+            (
+                Product(sku=f'X{n:06d}', slug=f'product-{n}', name_ru=f'Трактор {n}',
+                        category=category, brand=brand, base_price_usd=1000)
+                for n in range(ROWS)
+            ),
+            batch_size=1000,
+        )
+
+        print(f"\n{'Price/stock update':<24}{'rows':>8}{'time, s':>10}{'rows/s':>10}")
+        for seed, (label, func) in enumerate((('save() per product', per_row), ('batch (UPDATE ... FROM)', batch))):
+            rows = make_rows(seed)
+            start = time.perf_counter()
+            func(rows)
+            elapsed = time.perf_counter() - start
+            print(f'{label:<24}{ROWS:>8}{elapsed:>10.2f}{ROWS / elapsed:>10.0f}')
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
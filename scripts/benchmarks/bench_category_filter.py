@@ -0,0 +1,99 @@
+"""
+Benchmark: subtree-aware category filter on 100k products, 4-level tree.
+
+Compares the cached descendant-set filter (`ProductFilter.category`) with
+resolving the subtree recursively one level per query, for a root, a
+mid-level and a leaf category.
+
+Usage:
+    python scripts/benchmarks/bench_category_filter.py [product_count]
+"""
+
+import random
+import sys
+
+from common import setup_database, measure, report
+
+from apps.catalog.filters import ProductFilter
+from apps.catalog.models import Brand, Category, Product
+
+PRODUCT_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+FANOUT = [6, 5, 5, 4]  # 6 roots, 4 levels deep -> 786 categories
+
+
+def seed():
+    print(f"🌱 Создание дерева категорий {FANOUT} и {PRODUCT_COUNT} товаров...")
+    brand = Brand.objects.create(name='YTO', slug='yto', country='Китай')
+
+    level = [None]
+    all_levels = []
+    for depth, fanout in enumerate(FANOUT):
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                suffix = f'{parent.slug}-{i}' if parent else f'c{i}'
+                next_level.append(Category.objects.create(
+                    name_ru=f'Категория {suffix}', slug=suffix, parent=parent
+                ))
+        all_levels.append(next_level)
+        level = next_level
+
+    rng = random.Random(42)
+    leaves = all_levels[-1]
+    batch = []
+    for n in range(PRODUCT_COUNT):
+        batch.append(Product(
+            sku=f'SKU-{n}', slug=f'product-{n}', name_ru=f'Товар {n}',
+            category=rng.choice(leaves), brand=brand,
+            base_price_usd=rng.randint(100, 50000),
+        ))
+        if len(batch) == 5000:
+            Product.objects.bulk_create(batch)
+            batch = []
+    Product.objects.bulk_create(batch)
+    return all_levels
+
+
+def recursive_subtree_ids(slug):
+    """Baseline: walk the tree one level (one query) at a time."""
+    frontier = list(Category.objects.filter(slug=slug).values_list('id', flat=True))
+    ids = list(frontier)
+    while frontier:
+        frontier = list(Category.objects.filter(parent_id__in=frontier).values_list('id', flat=True))
+        ids.extend(frontier)
+    return ids
+
+
+def main():
+    teardown = setup_database()
+    try:
+        levels = seed()
+        base = Product.objects.filter(is_active=True)
+        cases = {
+            'root': levels[0][0].slug,
+            'level 2': levels[1][0].slug,
+            'leaf': levels[-1][0].slug,
+        }
+
+        results = {}
+        for label, slug in cases.items():
+            def cached_filter():
+                qs = ProductFilter({'category': slug}, queryset=base).qs
+                qs.count()
+                list(qs[:24])
+
+            def recursive_filter():
+                qs = base.filter(category_id__in=recursive_subtree_ids(slug))
+                qs.count()
+                list(qs[:24])
+
+            results[f'{label}: cached subtree IN (...)'] = measure(cached_filter)
+            results[f'{label}: recursive per-level lookup'] = measure(recursive_filter)
+
+        report(f'Category filter, {PRODUCT_COUNT} products (count + first page)', results)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
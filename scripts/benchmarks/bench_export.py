@@ -0,0 +1,98 @@
+"""
+Benchmark: catalog export, page-by-page API scraping vs the streaming export.
+
+Fetches the whole catalog as dealers did (`/api/v1/products/?page=N`, 24
+items per page) and with one streamed `/api/v1/products/export/csv/`,
+and prints the time and the peak Python memory (tracemalloc) of each for
+two catalog sizes: the export's peak should not grow with the catalog.
+
+Usage:
+    python scripts/benchmarks/bench_export.py [rows]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from common import setup_database
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Brand, Category, Product
+from apps.catalog.views import ProductViewSet
+from apps.core.utils.currency import CurrencyService
+
+User = get_user_model()
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def seed(start, count):
+    rng = random.Random(start)
+    categories = list(Category.objects.all())
+    brands = list(Brand.objects.all())
+    Product.objects.bulk_create(
+        (
+            Product(
+                sku=f'X{n:07d}', slug=f'product-{n}', name_ru=f'Трактор {n}', name_en=f'Tractor {n}',
+                category=rng.choice(categories), brand=rng.choice(brands),
+                base_price_usd=rng.randint(100, 50000), retail_price_usd=rng.choice([None, 60000]),
+            )
+            for n in range(start, start + count)
+        ),
+        batch_size=1000,
+    )
+
+
+def profile(func):
+    cache.clear()
+    CurrencyService.get_usd_uzs_rate()
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    teardown = setup_database()
+    try:
+        for i in range(10):
+            Category.objects.create(name_ru=f'Категория {i}', slug=f'c{i}')
+        for i in range(20):
+            Brand.objects.create(name=f'Brand {i}', slug=f'b{i}', country='Китай')
+        ProductViewSet.throttle_classes = []  # the scraper would hit the daily user limit
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='dealer', password='bench-password'))
+
+        def scrape():
+            page = 1
+            while True:
+                data = client.get('/api/v1/products/', {'page': page}).json()
+                if not data['next']:
+                    break
+                page += 1
+
+        def stream():
+            for _ in client.get('/api/v1/products/export/csv/').streaming_content:
+                pass
+
+        print(f"\n{'Catalog export':<24}{'rows':>8}{'time, s':>10}{'peak, MB':>10}")
+        seeded = 0
+        for size in (ROWS // 4, ROWS):
+            seed(seeded, size - seeded)
+            seeded = size
+            for label, func in (('API pages (24/page)', scrape), ('streamed CSV', stream)):
+                elapsed, peak = profile(func)
+                print(f'{label:<24}{size:>8}{elapsed:>10.2f}{peak:>10.1f}')
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
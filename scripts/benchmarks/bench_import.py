@@ -0,0 +1,76 @@
+"""
+Benchmark: product import, per-row ORM saves vs chunked upserts.
+
+Imports the same CSV (new products, then a price update of all of them)
+with a naive loop of `update_or_create()` calls and with the chunked
+importer (apps.catalog.importer), and prints rows per second.
+
+Usage:
+    python scripts/benchmarks/bench_import.py [rows]
+"""
+
+import csv
+import io
+import sys
+import time
+
+from common import setup_database
+
+from apps.catalog.importer import import_products, read_rows
+from apps.catalog.models import Brand, Category, Product
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+
+def make_csv(prefix, price):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['sku', 'name_ru', 'short_description_ru', 'base_price_usd', 'category', 'brand', 'stock_quantity'])
+    for n in range(ROWS):
+        writer.writerow([f'{prefix}{n:06d}', f'Трактор {n}', 'Описание товара', price + n % 100, f'c{n % 10}', f'b{n % 20}', n % 50])
+    return out.getvalue().encode()
+
+
+def naive_import(data):
+    categories = dict(Category.objects.values_list('slug', 'pk'))
+    brands = dict(Brand.objects.values_list('slug', 'pk'))
+    for _, row in read_rows(io.BytesIO(data), 'csv'):
+        Product.objects.update_or_create(sku=row['sku'], defaults={
+            'slug': row['sku'].lower(), 'name_ru': row['name_ru'],
+            'short_description_ru': row['short_description_ru'], 'base_price_usd': row['base_price_usd'],
+            'category_id': categories[row['category']], 'brand_id': brands[row['brand']],
+            'stock_quantity': row['stock_quantity'],
+        })
+
+
+def chunked_import(data):
+    result = import_products(read_rows(io.BytesIO(data), 'csv'))
+    assert not result.errors, result.errors[:5]
+
+
+def timed(func, data):
+    start = time.perf_counter()
+    func(data)
+    return time.perf_counter() - start
+
+
+def main():
+    teardown = setup_database()
+    try:
+        for i in range(10):
+            Category.objects.create(name_ru=f'Категория {i}', slug=f'c{i}')
+        for i in range(20):
+            Brand.objects.create(name=f'Brand {i}', slug=f'b{i}', country='Китай')
+
+        print(f'\nProduct import ({ROWS} rows, rows/s)')
+        print(f"{'':<28}{'create':>12}{'update':>12}")
+        for label, func, prefix in (('update_or_create() per row', naive_import, 'N'), ('chunked upsert', chunked_import, 'C')):
+            create = timed(func, make_csv(prefix, 1000))
+            update = timed(func, make_csv(prefix, 2000))
+            print(f'{label:<28}{ROWS / create:>12.0f}{ROWS / update:>12.0f}')
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: product listing serialization, model serializer vs value rows.
+
+Serializes the same page of products (query included) with
+ProductListSerializer over model instances and with
+ProductListRowSerializer over `values_list()` rows, for a guest and for a
+wholesale user, and checks that both produce the same JSON.
+
+Usage:
+    python scripts/benchmarks/bench_list_serializer.py [page_size]
+"""
+
+import json
+import random
+import sys
+
+from common import setup_database, measure, report
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.catalog.models import Brand, Category, Product
+from apps.catalog.serializers import ProductListRowSerializer, ProductListSerializer
+from apps.core.utils.currency import CurrencyService
+
+User = get_user_model()
+
+PAGE_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+
+def seed():
+    print(f"🌱 Создание {PAGE_SIZE} товаров...")
+    rng = random.Random(42)
+    categories = [
+        Category.objects.create(name_ru=f'Категория {i}', name_en=f'Category {i}', slug=f'c{i}', image=f'categories/{i}.png')
+        for i in range(10)
+    ]
+    brands = [Brand.objects.create(name=f'Brand {i}', slug=f'brand-{i}', country='Китай') for i in range(20)]
+    Product.objects.bulk_create(
+        Product(
+            sku=f'X{n:06d}', slug=f'product-{n}', name_ru=f'Трактор {n}', name_en=f'Tractor {n}',
+            short_description_ru='Описание товара', main_image=f'products/{n}.jpg',
+            category=rng.choice(categories), brand=rng.choice(brands),
+            base_price_usd=rng.randint(100, 50000), retail_price_usd=rng.choice([None, 60000]),
+            wholesale_price_usd=rng.choice([None, 90]), show_price_to_guests=rng.random() < 0.8,
+        )
+        for n in range(PAGE_SIZE)
+    )
+
+
+def main():
+    teardown = setup_database()
+    try:
+        seed()
+        CurrencyService.get_usd_uzs_rate()  # warm the rate cache
+        user = User.objects.create_user(username='bench', password='bench-password')
+
+        factory = APIRequestFactory()
+        queryset = Product.objects.filter(is_active=True).select_related('category', 'brand').order_by('-created_at')
+
+        def make_request(lang, user=None):
+            request = Request(factory.get('/api/v1/products/', HTTP_ACCEPT_LANGUAGE=lang))
+            request.user = user or AnonymousUser()
+            return request
+
+        def model_serializer(request):
+            return ProductListSerializer(queryset[:PAGE_SIZE], many=True, context={'request': request}).data
+
+        def row_serializer(request):
+            serializer = ProductListRowSerializer(request)
+            return serializer.serialize(serializer.get_rows(queryset)[:PAGE_SIZE])
+
+        results = {}
+        for label, request in (('guest ru', make_request('ru')), ('member en', make_request('en', user))):
+            assert json.dumps(model_serializer(request)) == json.dumps(row_serializer(request))
+            results[f'{label:<10} model serializer'] = measure(lambda: model_serializer(request), repeat=20)
+            results[f'{label:<10} value rows'] = measure(lambda: row_serializer(request), repeat=20)
+
+        report(f'Listing serialization ({PAGE_SIZE} rows)', results)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: product list pricing for guest, retail, wholesale and VIP users.
+
+Prices 24, 100 and 1,000 products with the request-scoped PricingContext
+and with the previous per-row pricing (business profile check + Decimal
+conversions on every product), and times the full `ProductListSerializer`
+for reference.
+
+Usage:
+    python scripts/benchmarks/bench_pricing.py
+"""
+
+import random
+from decimal import Decimal
+
+from common import setup_database, measure, report
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.accounts.models import BusinessProfile
+from apps.catalog.models import Brand, Category, Product
+from apps.catalog.pricing import PricingContext
+from apps.catalog.serializers import ProductListSerializer
+
+User = get_user_model()
+SIZES = [24, 100, 1000]
+
+
+def legacy_pricing(obj, user):
+    """Pricing as computed per row before PricingContext."""
+    if user is None or not user.is_authenticated:
+        price_usd, can_see = (
+            (obj.retail_price_usd or obj.base_price_usd, True)
+            if obj.show_price_to_guests else (None, False)
+        )
+    elif hasattr(user, 'business_profile') and user.business_profile.is_verified:
+        tier = user.business_profile.pricing_tier
+        if tier == 'vip':
+            price_usd, can_see = (obj.wholesale_price_usd or obj.base_price_usd, True)
+        elif tier == 'wholesale':
+            price_usd, can_see = (obj.wholesale_price_usd or obj.retail_price_usd or obj.base_price_usd, True)
+        else:
+            price_usd, can_see = (obj.retail_price_usd or obj.base_price_usd, True)
+    else:
+        price_usd, can_see = (obj.retail_price_usd or obj.base_price_usd, True)
+    return {
+        'show_to_guests': obj.show_price_to_guests,
+        'can_see_price': can_see,
+        'price_usd': float(price_usd) if price_usd else None,
+        'price_uzs': int(float(price_usd) * 12800) if price_usd else None,
+    }
+
+
+def seed():
+    print(f"🌱 Создание {max(SIZES)} товаров и пользователей...")
+    rng = random.Random(42)
+    category = Category.objects.create(name_ru='Тракторы', slug='tractors')
+    brand = Brand.objects.create(name='YTO', slug='yto', country='Китай')
+    Product.objects.bulk_create([
+        Product(
+            sku=f'SKU-{n}', slug=f'product-{n}', name_ru=f'Трактор {n}',
+            category=category, brand=brand,
+            base_price_usd=Decimal(rng.randint(1000, 50000)),
+            retail_price_usd=Decimal(rng.randint(1000, 50000)),
+            wholesale_price_usd=Decimal(rng.randint(1000, 50000)) if n % 2 else None,
+            show_price_to_guests=bool(n % 3),
+        )
+        for n in range(max(SIZES))
+    ])
+
+    users = {'guest': None, 'retail': User.objects.create_user(username='retail', password='x')}
+    for tier in ('wholesale', 'vip'):
+        user = User.objects.create_user(username=tier, password='x')
+        BusinessProfile.objects.create(
+            user=user, inn=str(100000000 + user.pk), company_name=tier,
+            legal_address='Ташкент', pricing_tier=tier, verified_at=timezone.now(),
+        )
+        users[tier] = user
+    return users
+
+
+def make_request(user):
+    """A fresh request per iteration, as in production."""
+    request = Request(APIRequestFactory().get('/api/v1/products/'))
+    request.user = User.objects.get(pk=user.pk) if user else AnonymousUser()
+    return request
+
+
+def main():
+    teardown = setup_database()
+    try:
+        users = seed()
+        products = list(Product.objects.select_related('category', 'brand').order_by('id'))
+
+        results = {}
+        for size in SIZES:
+            page = products[:size]
+            for tier, user in users.items():
+                def legacy():
+                    request = make_request(user)
+                    for product in page:
+                        legacy_pricing(product, request.user)
+
+                def context():
+                    PricingContext.for_request(make_request(user)).price_page(page)
+
+                def serializer():
+                    ProductListSerializer(page, many=True, context={'request': make_request(user)}).data
+
+                results[f'{size:>4} {tier:<9} legacy per-row pricing'] = measure(legacy, repeat=20)
+                results[f'{size:>4} {tier:<9} PricingContext.price_page'] = measure(context, repeat=20)
+                results[f'{size:>4} {tier:<9} full ProductListSerializer'] = measure(serializer, repeat=20)
+
+        report('Listing pricing (includes user load per request)', results)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
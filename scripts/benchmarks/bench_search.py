@@ -0,0 +1,81 @@
+"""
+Benchmark: product search on 100k products.
+
+Compares the previous OR'd `icontains` search with the database search
+backend (PostgreSQL tsvector + trigram, or SQLite FTS5 in development) for
+a common word, a rare word, a prefix and a SKU fragment. Each case fetches
+the first listing page, as the API does.
+
+Usage:
+    python scripts/benchmarks/bench_search.py [product_count]
+"""
+
+import random
+import sys
+
+from common import setup_database, measure, report
+
+from apps.catalog.models import Brand, Category, Product
+from apps.catalog.search import SimpleSearchBackend, get_search_backend
+
+PRODUCT_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+PAGE_SIZE = 24
+
+NOUNS = ['Трактор', 'Сеялка', 'Культиватор', 'Опрыскиватель', 'Борона', 'Насос', 'Косилка', 'Плуг']
+ADJECTIVES = ['колёсный', 'навесной', 'прицепной', 'дисковый', 'садовый', 'мощный']
+QUERIES = {
+    'common word': 'трактор',
+    'rare word': 'бороны',
+    'prefix': 'культив',
+    'sku fragment': 'X4821',
+}
+
+
+def seed():
+    print(f"🌱 Создание {PRODUCT_COUNT} товаров...")
+    rng = random.Random(42)
+    category = Category.objects.create(name_ru='Техника', slug='machinery')
+    brand = Brand.objects.create(name='YTO', slug='yto', country='Китай')
+    batch = []
+    for n in range(PRODUCT_COUNT):
+        noun = NOUNS[n % len(NOUNS)] if n % 500 else 'Бороны'
+        product = Product(
+            sku=f'X{n:05d}', slug=f'product-{n}',
+            name_ru=f'{noun} {rng.choice(ADJECTIVES)} {n}',
+            short_description_ru=f'{rng.choice(ADJECTIVES).capitalize()} агрегат для хозяйства',
+            category=category, brand=brand, base_price_usd=rng.randint(100, 50000),
+        )
+        product.update_search_keys()  # bulk_create skips save()
+        batch.append(product)
+        if len(batch) == 5000:
+            Product.objects.bulk_create(batch)
+            batch = []
+    Product.objects.bulk_create(batch)
+
+
+def main():
+    teardown = setup_database()
+    try:
+        seed()
+        backends = {
+            'icontains': SimpleSearchBackend(),
+            type(get_search_backend()).__name__.replace('SearchBackend', '').lower(): get_search_backend(),
+        }
+        queryset = Product.objects.filter(is_active=True).select_related('category', 'brand')
+
+        results = {}
+        for case, query in QUERIES.items():
+            for name, backend in backends.items():
+                def run():
+                    list(backend.search_products(queryset, query)[:PAGE_SIZE])
+                    backend.search_products(queryset, query).count()
+
+                results[f'{case:<13} {name}'] = measure(run, repeat=10, warmup=1)
+
+        report(f'Search, first page + count ({PRODUCT_COUNT} products)', results)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
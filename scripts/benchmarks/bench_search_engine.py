@@ -0,0 +1,118 @@
+"""
+Benchmark: embedded search engine on 200k products.
+
+Times the index build, snapshot write and load, then `/api/v1/search/?q=`
+(SearchView, throttling off, response cache bypassed) with the embedded
+engine and with the database backend, over a mix of common words,
+prefixes, typos, multi-word queries and SKU fragments. The index lookup
+alone is timed as well; the rest of a request is ORM and serializer work.
+
+Usage:
+    python scripts/benchmarks/bench_search_engine.py [product_count]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from common import setup_database, measure, report
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from apps.catalog.models import Brand, Category, Product
+from apps.catalog.search import reset_engine
+from apps.catalog.search.engine import SearchEngine, get_engine
+from apps.catalog.views import SearchView
+
+PRODUCT_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+NOUNS = ['Трактор', 'Сеялка', 'Культиватор', 'Опрыскиватель', 'Борона', 'Насос', 'Косилка', 'Плуг']
+ADJECTIVES = ['колёсный', 'навесной', 'прицепной', 'дисковый', 'садовый', 'мощный', 'пневматический']
+QUERIES = {
+    'common word': 'трактор',
+    'prefix': 'культ',
+    'typo': 'опрыскивтель',
+    'two words': 'сеялка пневматическая',
+    'sku fragment': 'X148',
+    'no match': 'экскаватор',
+}
+
+
+def seed():
+    print(f"🌱 Создание {PRODUCT_COUNT} товаров...")
+    rng = random.Random(42)
+    categories = [Category.objects.create(name_ru=noun + 'ы', slug=f'c{i}') for i, noun in enumerate(NOUNS)]
+    brands = [Brand.objects.create(name=f'Brand {i}', slug=f'brand-{i}', country='Китай') for i in range(20)]
+    batch = []
+    for n in range(PRODUCT_COUNT):
+        noun = rng.choice(NOUNS)
+        product = Product(
+            sku=f'X{n:06d}', slug=f'product-{n}',
+            name_ru=f'{noun} {rng.choice(ADJECTIVES)} {rng.randint(100, 9999)}',
+            name_en=f'Machine model {rng.randint(100, 9999)}',
+            short_description_ru=f'{rng.choice(ADJECTIVES).capitalize()} агрегат для хозяйства',
+            category=rng.choice(categories), brand=rng.choice(brands),
+            base_price_usd=rng.randint(100, 50000),
+        )
+        product.update_search_keys()  # bulk_create skips save()
+        batch.append(product)
+        if len(batch) == 5000:
+            Product.objects.bulk_create(batch)
+            batch = []
+    Product.objects.bulk_create(batch)
+
+
+def time_once(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    teardown = setup_database()
+    try:
+        seed()
+
+        engine = SearchEngine()
+        print(f"\n⏱  Построение индекса: {time_once(engine.build):.0f} ms")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'search.snapshot')
+            print(f"⏱  Запись снимка: {time_once(lambda: engine.save_snapshot(path)):.0f} ms, "
+                  f"{os.path.getsize(path) / 1024 / 1024:.1f} MB")
+            loaded = SearchEngine(snapshot_path=path)
+            print(f"⏱  Загрузка снимка + синхронизация: {time_once(loaded.ensure_fresh):.0f} ms")
+
+        view = SearchView.as_view(throttle_classes=[])
+        factory = APIRequestFactory()
+
+        def search_view(query):
+            request = factory.get('/api/v1/search/', {'q': query})
+            request.user = AnonymousUser()
+            response = view(request)
+            response.render()
+
+        results = {}
+        for backend in ('', 'apps.catalog.search.EmbeddedSearchBackend'):
+            name = 'embedded' if backend else 'database'
+            with override_settings(CATALOG_SEARCH_BACKEND=backend):
+                reset_engine()
+                if backend:
+                    get_engine().ensure_fresh()
+                for case, query in QUERIES.items():
+                    results[f'{case:<13} {name}'] = measure(lambda: search_view(query), repeat=200, warmup=5)
+
+        index = get_engine().indexes['products']
+        for case, query in QUERIES.items():
+            results[f'{case:<13} engine lookup only'] = measure(lambda: index.search(query, 10), repeat=200)
+
+        report(f'/api/v1/search/?q= ({PRODUCT_COUNT} products)', results)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: search-as-you-type suggestions vs the global search endpoint.
+
+Times `/api/v1/search/suggest/?q=` (prefix index in memory) and
+`/api/v1/search/?q=` (database backend, full serializers) for the prefixes
+a user types on the way to a query. Throttling is off, so only the work of
+the views is measured.
+
+Usage:
+    python scripts/benchmarks/bench_suggest.py [product_count]
+"""
+
+import random
+import sys
+import time
+
+from common import setup_database, measure, report
+
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.test import APIRequestFactory
+
+from apps.catalog.models import Brand, Category, Product
+from apps.catalog.search import get_suggester
+from apps.catalog.views import SearchView, SuggestView
+
+PRODUCT_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+NOUNS = ['Трактор', 'Сеялка', 'Культиватор', 'Опрыскиватель', 'Борона', 'Насос', 'Косилка', 'Плуг']
+ADJECTIVES = ['колёсный', 'навесной', 'прицепной', 'дисковый', 'садовый', 'мощный', 'пневматический']
+KEYSTROKES = ['тр', 'тра', 'трак', 'трактор', 'трактор к', 'x12', 'x1234', 'kult']
+
+
+def seed():
+    print(f"🌱 Создание {PRODUCT_COUNT} товаров...")
+    rng = random.Random(42)
+    categories = [Category.objects.create(name_ru=noun + 'ы', slug=f'c{i}') for i, noun in enumerate(NOUNS)]
+    brands = [Brand.objects.create(name=f'Brand {i}', slug=f'brand-{i}', country='Китай') for i in range(20)]
+    batch = []
+    for n in range(PRODUCT_COUNT):
+        product = Product(
+            sku=f'X{n:06d}', slug=f'product-{n}',
+            name_ru=f'{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {rng.randint(100, 9999)}',
+            category=rng.choice(categories), brand=rng.choice(brands),
+            base_price_usd=rng.randint(100, 50000),
+        )
+        product.update_search_keys()  # bulk_create skips save()
+        batch.append(product)
+        if len(batch) == 5000:
+            Product.objects.bulk_create(batch)
+            batch = []
+    Product.objects.bulk_create(batch)
+
+
+def main():
+    teardown = setup_database()
+    try:
+        seed()
+
+        start = time.perf_counter()
+        get_suggester().ensure_fresh()
+        print(f"\n⏱  Построение индекса подсказок: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        factory = APIRequestFactory()
+        views = {
+            'suggest': ('/api/v1/search/suggest/', SuggestView.as_view(throttle_classes=[])),
+            'search': ('/api/v1/search/', SearchView.as_view(throttle_classes=[])),
+        }
+
+        def call(name, query):
+            path, view = views[name]
+            request = factory.get(path, {'q': query})
+            request.user = AnonymousUser()
+            view(request).render()
+
+        results = {}
+        for query in KEYSTROKES:
+            for name in views:
+                results[f'{query:<12} {name}'] = measure(lambda: call(name, query), repeat=100)
+
+        report(f'Keystroke lookups ({PRODUCT_COUNT} products)', results)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Shared helpers for UzAgro benchmark scripts.
+
+Every benchmark runs against a throwaway test database created from the
+configured settings (SQLite in development, PostgreSQL when
+DJANGO_SETTINGS_MODULE / DATABASE_URL point at production settings), so it
+never touches real data.
+
+Usage:
+    python scripts/benchmarks/bench_<name>.py
+"""
+
+import os
+import statistics
+import sys
+import time
+
+# Setup Django
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+
+# Query logging in DEBUG mode would dominate memory and timings
+settings.DEBUG = False
+
+
+def setup_database():
+    """Create the test database. Returns a teardown callable."""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    return teardown
+
+
+def measure(func, repeat=50, warmup=3):
+    """Run func repeatedly, return timing stats in milliseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'median': statistics.median(samples),
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'p99': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        'max': samples[-1],
+    }
+
+
+def report(title, results):
+    """Print a small table of {label: stats} results."""
+    print(f"\n📊 {title}")
+    print(f"   {'case':<40} {'median ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for label, stats in results.items():
+        print(
+            f"   {label:<40} {stats['median']:>10.2f} {stats['p95']:>10.2f}"
+            f" {stats['p99']:>10.2f} {stats['max']:>10.2f}"
+        )